@@ -0,0 +1,211 @@
+"""Bildirim ve servis durumu olaylarının bağlı istemcilere iletilmesi.
+
+Olaylar kullanıcıya özel (``user_channel``) veya herkese açık
+(``BROADCAST_CHANNEL``) kanallara yayınlanır. ``NOTIFICATION_EVENTS_REDIS_URL``
+ayarlıysa Redis pub/sub kullanılır (birden fazla süreç/sunucu arasında);
+değilse olaylar sadece aynı süreçteki dinleyicilere bellekte iletilir:
+Celery görevlerinin veya diğer worker'ların yayınladıkları kaybolur
+(bu durumda ilk kullanımda uyarı loglanır).
+
+Yayınlama senkron koddan (görevler, serializer'lar) yapılır; dinleme
+ASGI tarafındaki olay akışı görünümünde asenkron çalışır.
+"""
+import asyncio
+import json
+import logging
+import secrets
+import threading
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_CHANNEL = 'events:broadcast'
+
+# Bu süre içinde olay gelmezse istemciye canlılık (heartbeat) gönderilir
+HEARTBEAT_INTERVAL = 15
+
+# Akış bileti bu süre içinde ve yalnızca bir kez kullanılabilir
+STREAM_TICKET_TIMEOUT = 30
+
+
+def user_channel(user_id):
+    return f'events:user:{user_id}'
+
+
+class MemorySubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+        self.entry = (asyncio.get_running_loop(), asyncio.Queue())
+
+    async def get(self, timeout=HEARTBEAT_INTERVAL):
+        """Sıradaki mesaj; ``timeout`` içinde gelmezse None."""
+        try:
+            return await asyncio.wait_for(self.entry[1].get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.broker.remove(self)
+
+
+class MemoryBroker:
+    """Tek süreç içinde çalışan kanal katmanı (geliştirme ve testler için)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            # Dinleyici başka bir thread'in olay döngüsünde çalışıyor olabilir
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def subscribe(self, channels):
+        subscription = MemorySubscription(self, channels)
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(subscription.entry)
+        return subscription
+
+    def remove(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers.get(channel, set()).discard(subscription.entry)
+
+
+class RedisSubscription:
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def get(self, timeout=HEARTBEAT_INTERVAL):
+        """Sıradaki mesaj; ``timeout`` içinde gelmezse None."""
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        data = message['data']
+        return data.decode('utf-8') if isinstance(data, bytes) else data
+
+    async def close(self):
+        await self.pubsub.unsubscribe()
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisBroker:
+    """Redis pub/sub üzerinden çalışan kanal katmanı."""
+
+    def __init__(self, url):
+        self.url = url
+        self._client = None
+
+    def publish(self, channel, message):
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(channel, message)
+
+    async def subscribe(self, channels):
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(*channels)
+        return RedisSubscription(client, pubsub)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        url = getattr(settings, 'NOTIFICATION_EVENTS_REDIS_URL', None)
+        if url:
+            _broker = RedisBroker(url)
+        else:
+            # setup_test_environment mail.outbox'ı tanımlar; testlerde uyarı verilmez
+            if getattr(mail, 'outbox', None) is None:
+                logger.warning(
+                    "NOTIFICATION_EVENTS_REDIS_URL ayarlı değil: olaylar sadece bu süreçteki "
+                    "dinleyicilere iletilir, Celery ve diğer worker'ların olayları kaybolur"
+                )
+            _broker = MemoryBroker()
+    return _broker
+
+
+def publish(channel, event, data):
+    """Olayı kanala yayınlar; yayın hatası isteği/görevi bozmaz."""
+    message = json.dumps({'event': event, 'data': data}, ensure_ascii=False, default=str)
+    try:
+        get_broker().publish(channel, message)
+    except Exception:
+        logger.exception("Olay yayınlanamadı: %s", channel)
+
+
+def publish_to_users(user_ids, event, data):
+    for user_id in user_ids:
+        publish(user_channel(user_id), event, data)
+
+
+def broadcast(event, data):
+    publish(BROADCAST_CHANNEL, event, data)
+
+
+def broadcast_status_changes(changes):
+    """Servis kaydı durum değişikliklerini işlem onaylandıktan sonra tek olayla yayınlar.
+
+    ``changes``: ``[(kayıt_id, eski_durum, yeni_durum), ...]``
+    """
+    data = [
+        {'id': record_id, 'previous': previous, 'status': status}
+        for record_id, previous, status in changes
+    ]
+    if data:
+        transaction.on_commit(lambda: broadcast('status', data))
+
+
+async def subscribe(user_id):
+    """Kullanıcının kendi kanalına ve genel kanala abone olur.
+
+    Dönen aboneliğin ``get()`` metodu sıradaki mesajı (JSON metni) veya
+    ``HEARTBEAT_INTERVAL`` boyunca mesaj gelmezse None döner; iş bitince
+    ``close()`` çağrılmalıdır.
+    """
+    return await get_broker().subscribe([user_channel(user_id), BROADCAST_CHANNEL])
+
+
+def stream_ticket_key(ticket):
+    return f'events:ticket:{ticket}'
+
+
+def issue_stream_ticket(user_id):
+    """Olay akışını açmak için kısa ömürlü, tek kullanımlık bilet.
+
+    EventSource başlık gönderemez; erişim token'ı URL'de taşınırsa proxy
+    ve sunucu loglarına yazılır. Bilet ise ``STREAM_TICKET_TIMEOUT`` sonra
+    veya ilk kullanımda geçersiz olur.
+    """
+    ticket = secrets.token_urlsafe(32)
+    cache.set(stream_ticket_key(ticket), user_id, STREAM_TICKET_TIMEOUT)
+    return ticket
+
+
+def redeem_stream_ticket(ticket):
+    """Bileti tüketir; geçerliyse kullanıcı id'sini, değilse None döner."""
+    if not ticket:
+        return None
+    key = stream_ticket_key(ticket)
+    user_id = cache.get(key)
+    # Aynı bileti eşzamanlı kullananlardan sadece silmeyi başaran kabul edilir
+    if user_id is None or not cache.delete(key):
+        return None
+    return user_id
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:42
+
+from django.db import migrations
+from django.db.models import Max
+
+
+def deduplicate_notifications(apps, schema_editor):
+    # Her (kullanıcı, kayıt) çifti için sadece en yeni bildirim kalır
+    Notification = apps.get_model('accounts', 'Notification')
+    newest = Notification.objects.values('user', 'service_record').annotate(newest_id=Max('id'))
+    Notification.objects.exclude(id__in=newest.values('newest_id')).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_notifications, migrations.RunPython.noop),
+    ]
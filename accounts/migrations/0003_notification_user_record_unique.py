@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_deduplicate_notifications'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('user', 'service_record'), name='notification_user_record_unique'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:44
+
+from django.db import migrations
+from django.db.models import Max
+
+
+def merge_notifications(apps, schema_editor):
+    # Kayıt başına en yeni bildirim kalır; eski kullanıcı satırları okundu
+    # bilgisiyle birlikte alındı kaydına dönüşür
+    Notification = apps.get_model('accounts', 'Notification')
+    NotificationReceipt = apps.get_model('accounts', 'NotificationReceipt')
+
+    newest = Notification.objects.values('service_record').annotate(newest_id=Max('id'))
+    newest_ids = dict(newest.values_list('service_record', 'newest_id'))
+
+    batch = []
+    rows = Notification.objects.values('service_record_id', 'user_id', 'is_read')
+    for row in rows.iterator(chunk_size=1000):
+        batch.append(NotificationReceipt(
+            notification_id=newest_ids[row['service_record_id']],
+            user_id=row['user_id'],
+            is_read=row['is_read'],
+        ))
+        if len(batch) >= 1000:
+            NotificationReceipt.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        NotificationReceipt.objects.bulk_create(batch, ignore_conflicts=True)
+
+    Notification.objects.exclude(id__in=newest.values('newest_id')).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_notificationreceipt'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_notifications, migrations.RunPython.noop),
+    ]
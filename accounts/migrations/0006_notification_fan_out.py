@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_notification_receipts_from_rows'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='notification',
+            name='notification_user_record_unique',
+        ),
+        migrations.RemoveField(
+            model_name='notification',
+            name='is_read',
+        ),
+        migrations.RemoveField(
+            model_name='notification',
+            name='user',
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='recipients',
+            field=models.ManyToManyField(related_name='notifications', through='accounts.NotificationReceipt', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('service_record',), name='notification_record_unique'),
+        ),
+    ]
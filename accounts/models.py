@@ -8,9 +8,31 @@ User = get_user_model()
 
 
 class Notification(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    """Bir servis kaydı için tek bildirim; alıcılar NotificationReceipt ile bağlanır."""
     service_record = models.ForeignKey(ServiceRecord, on_delete=models.CASCADE, related_name='notifications')
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    overdue_days = models.PositiveIntegerField(default=0)
+    recipients = models.ManyToManyField(User, through='NotificationReceipt', related_name='notifications')
+
+    class Meta:
+        constraints = [
+            # Her kayıt için tek bildirim; günlük görev gecikme gününü günceller
+            models.UniqueConstraint(fields=['service_record'], name='notification_record_unique'),
+        ]
+
+
+class NotificationReceipt(models.Model):
+    """Bildirimin bir kullanıcıya ulaştığını ve okunma durumunu tutar."""
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_receipts')
     is_read = models.BooleanField(default=False)
-    overdue_days = models.PositiveIntegerField(default=0)
\ No newline at end of file
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'user'], name='notification_receipt_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'is_read'], name='notif_receipt_unread_idx'),
+        ]
@@ -0,0 +1,171 @@
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from . import events
+from .models import Notification, NotificationReceipt
+
+User = get_user_model()
+
+NOTIFICATION_BATCH_SIZE = 1000
+
+# Okunmamış sayaçları bu süre sonunda veritabanından yeniden hesaplanır
+UNREAD_COUNT_TIMEOUT = 60 * 60
+
+# Varsayılan hedefleme: kaydı oluşturan kullanıcı ve personel (is_staff)
+DEFAULT_NOTIFICATION_TARGETS = ('creator', 'staff')
+
+
+def notification_targets():
+    """``NOTIFICATION_TARGETS`` ayarı: 'creator', 'staff' ve/veya 'all'"""
+    return tuple(getattr(settings, 'NOTIFICATION_TARGETS', DEFAULT_NOTIFICATION_TARGETS))
+
+
+def resolve_recipients(records, targets=None):
+    """Her kayıt için bildirimi alacak kullanıcı id'leri: ``{kayıt_id: {kullanıcı_id}}``
+
+    ``records`` içinde ``id`` ve ``created_user_id`` anahtarları beklenir.
+    Hedef kurallarından kimse çıkmazsa bildirim tüm aktif kullanıcılara gider.
+    """
+    targets = notification_targets() if targets is None else targets
+    active_users = User.objects.filter(is_active=True)
+
+    everyone = None
+    if 'all' in targets or not records:
+        everyone = set(active_users.values_list('id', flat=True))
+
+    shared = set()
+    if 'all' in targets:
+        shared |= everyone
+    if 'staff' in targets:
+        shared |= set(active_users.filter(is_staff=True).values_list('id', flat=True))
+
+    creators = set()
+    if 'creator' in targets:
+        creator_ids = {record['created_user_id'] for record in records} - {None}
+        creators = set(active_users.filter(id__in=creator_ids).values_list('id', flat=True))
+
+    recipients = {}
+    for record in records:
+        users = set(shared)
+        if record['created_user_id'] in creators:
+            users.add(record['created_user_id'])
+        if not users:
+            if everyone is None:
+                everyone = set(active_users.values_list('id', flat=True))
+            users = everyone
+        recipients[record['id']] = users
+    return recipients
+
+
+def publish_notifications(notifications_by_record, recipients):
+    """Kayıt başına tek bildirimi yazar ve alıcılara bağlar.
+
+    ``notifications_by_record``: ``{kayıt_id: {'message': .., 'overdue_days': ..}}``.
+    Var olan bildirimin mesajı ve gecikme günü güncellenir; daha önce
+    bağlanmış alıcıların okundu bilgisi korunur. Yeni alındı kayıtlarını döner.
+    """
+    Notification.objects.bulk_create(
+        [
+            Notification(service_record_id=record_id, **fields)
+            for record_id, fields in notifications_by_record.items()
+        ],
+        batch_size=NOTIFICATION_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['service_record'],
+        update_fields=['message', 'overdue_days'],
+    )
+    notification_ids = dict(
+        Notification.objects.filter(
+            service_record_id__in=notifications_by_record
+        ).values_list('service_record_id', 'id')
+    )
+
+    receipts = [
+        NotificationReceipt(notification_id=notification_ids[record_id], user_id=user_id)
+        for record_id in notifications_by_record
+        for user_id in recipients.get(record_id, ())
+    ]
+    existing = set(
+        NotificationReceipt.objects.filter(
+            notification_id__in=notification_ids.values()
+        ).values_list('notification_id', 'user_id')
+    )
+    new_receipts = [
+        receipt for receipt in receipts
+        if (receipt.notification_id, receipt.user_id) not in existing
+    ]
+    NotificationReceipt.objects.bulk_create(
+        new_receipts, batch_size=NOTIFICATION_BATCH_SIZE, ignore_conflicts=True
+    )
+    for user_id, count in Counter(receipt.user_id for receipt in new_receipts).items():
+        adjust_unread_count(user_id, count)
+    push_new_notifications(new_receipts)
+    return new_receipts
+
+
+def push_new_notifications(receipts):
+    """Yeni alındı kayıtlarını bağlı istemcilere kullanıcı başına tek olayla iletir."""
+    if not receipts:
+        return
+    from .serializers import NotificationSerializer
+
+    notifications = Notification.objects.filter(
+        id__in={receipt.notification_id for receipt in receipts}
+    ).select_related('service_record__customer', 'service_record__brand')
+    payloads = {}
+    for notification in notifications:
+        notification.is_read = False
+        payloads[notification.id] = NotificationSerializer(notification).data
+
+    by_user = {}
+    for receipt in receipts:
+        by_user.setdefault(receipt.user_id, []).append(payloads[receipt.notification_id])
+    for user_id, items in by_user.items():
+        events.publish_to_users([user_id], 'notifications', items)
+
+
+def unread_count_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user_id):
+    """Kullanıcının okunmamış bildirim sayısı; önbellekte yoksa bir kez sayılır."""
+    key = unread_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = count_unread(user_id)
+        # Arada başka süreç sayacı yazdıysa onun değeri korunur
+        if not cache.add(key, count, UNREAD_COUNT_TIMEOUT):
+            count = cache.get(key, count)
+    return count
+
+
+def count_unread(user_id):
+    return NotificationReceipt.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def refresh_unread_count(user_id):
+    """Sayacı veritabanından yeniden hesaplayıp yazar ve istemcilere iletir.
+
+    Okundu işaretleme commit sonrasında bunu çağırır; artır/azalt yerine
+    kesin sayı yazıldığından eşzamanlı istekler sayacı kaydıramaz.
+    """
+    count = count_unread(user_id)
+    cache.set(unread_count_key(user_id), count, UNREAD_COUNT_TIMEOUT)
+    events.publish_to_users([user_id], 'unread', {'unread_count': count})
+
+
+def adjust_unread_count(user_id, delta):
+    """Önbellekteki sayacı artırır/azaltır.
+
+    Sayaç henüz yoksa dokunulmaz; ilk okumada veritabanından hesaplanır.
+    Güncel sayı kullanıcının bağlı istemcilerine de iletilir.
+    """
+    try:
+        count = cache.incr(unread_count_key(user_id), delta)
+    except ValueError:
+        return
+    events.publish_to_users([user_id], 'unread', {'unread_count': count})
@@ -1,8 +1,10 @@
 ﻿from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
-from .models import Notification
-from service.serializers import ServiceRecordSerializer
+from django.utils import timezone
+from .models import Notification, NotificationReceipt
+from django.db import transaction
+from .notifications import refresh_unread_count
 
 # Kullanıcı kayıt serializer
 class RegisterSerializer(serializers.ModelSerializer):
@@ -58,12 +60,41 @@ class UserCreateSerializer(serializers.ModelSerializer):
 
 
 class NotificationSerializer(serializers.ModelSerializer):
-    service_record = ServiceRecordSerializer(read_only=True)
-    user = UserSerializer(read_only=True)
+    """Bildirim listesi için hafif gösterim; servis kaydından sadece özet alanlar."""
+    service_record = serializers.IntegerField(source='service_record_id', read_only=True)
+    customer_name = serializers.CharField(source='service_record.customer.company_name', read_only=True, default=None)
+    brand_name = serializers.CharField(source='service_record.brand.name', read_only=True, default=None)
+    model = serializers.CharField(source='service_record.model', read_only=True)
+    # Sorguda kullanıcının alındı kaydından eklenir
+    is_read = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Notification
-        fields = ['id', 'user', 'service_record', 'message', 
-                 'created_at', 'is_read', 'overdue_days']
+        fields = ['id', 'service_record', 'customer_name', 'brand_name', 'model',
+                  'message', 'created_at', 'is_read', 'overdue_days']
         read_only_fields = ['created_at']
-        ref_name = "AccountsNotificationSerializer"
\ No newline at end of file
+        ref_name = "AccountsNotificationSerializer"
+
+
+class NotificationReceiptSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='notification_id', read_only=True)
+
+    class Meta:
+        model = NotificationReceipt
+        fields = ['id', 'is_read', 'read_at']
+        read_only_fields = ['read_at']
+        ref_name = "AccountsNotificationReceiptSerializer"
+
+    def update(self, instance, validated_data):
+        is_read = validated_data.get('is_read', instance.is_read)
+        read_at = timezone.now() if is_read else None
+        # Okundu bilgisi koşullu UPDATE ile değişir: aynı anda gelen iki istekten
+        # sadece biri satırı değiştirir ve sayacı günceller
+        changed = NotificationReceipt.objects.filter(
+            pk=instance.pk
+        ).exclude(is_read=is_read).update(is_read=is_read, read_at=read_at)
+        if changed:
+            user_id = instance.user_id
+            transaction.on_commit(lambda: refresh_unread_count(user_id))
+        instance.refresh_from_db(fields=['is_read', 'read_at'])
+        return instance
@@ -3,7 +3,7 @@ from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth import get_user_model
 from service.models import ServiceRecord as ServisKayit
-from accounts.models import Notification
+from accounts.notifications import NOTIFICATION_BATCH_SIZE, publish_notifications, resolve_recipients
 import time
 
 User = get_user_model()
@@ -29,38 +29,63 @@ def gunluk_rapor_gorevi():
     print(f"[{timezone.now()}] ✓ Rapor gönderildi")
     return "Rapor başarılı"
 
+def stale_service_records(now=None):
+    """Teslim edilmemiş ve bir haftadır güncellenmemiş kayıtlar (tek sorgu)."""
+    now = now or timezone.now()
+    return ServisKayit.objects.exclude(
+        status=ServisKayit.STATUS_DELIVERED
+    ).filter(
+        updated_at__lt=now - timedelta(days=7)
+    ).values(
+        'id', 'updated_at', 'model', 'created_user_id',
+        'customer__company_name', 'brand__name',
+    ).order_by('id')
+
+
+def stale_notification_message(record, overdue_days):
+    return (
+        f"{record['customer__company_name']}'nin {record['brand__name']} {record['model']} "
+        f"cihazı {overdue_days} gündür güncellenmedi."
+    )
+
+
 @shared_task
 def check_service_updates():
     print(f"[{timezone.now()}] 🔍 Servis güncellemelerini kontrol etme görevi başladı")
-    
-    # Bir hafta önceki tarihi hesapla
-    one_week_ago = timezone.now() - timedelta(days=7)
-    
-    # Tamamlanmamış (teslim edilmemiş) ve bir haftadır güncellenmemiş kayıtları bul
-    stale_services = ServisKayit.objects.exclude(
-        status=ServisKayit.STATUS_TESLIM_EDILDI
-    ).filter(
-        updated_at__lt=one_week_ago
-    )
-    
-    if stale_services.exists():
-        # Tüm aktif kullanıcıları al
-        users = User.objects.filter(is_active=True)
-        
-        for service in stale_services:
-            days_since_update = (timezone.now().date() - service.updated_at.date()).days
-            
-            for user in users:
-                # Her kullanıcı için bildirim oluştur
-                Notification.objects.create(
-                    user=user,
-                    service_record=service,
-                    message=f"{service.musteri_adi}'nin {service.marka} {service.model} cihazı {days_since_update} gündür güncellenmedi.",
-                    overdue_days=days_since_update
-                )
-        
-        print(f"[{timezone.now()}] ✓ {stale_services.count()} servis kaydı için bildirimler oluşturuldu")
+
+    today = timezone.localdate()
+
+    # Kayıt başına tek bildirim; alıcılar hedefleme kurallarına göre bağlanır
+    record_count = 0
+    receipt_count = 0
+    batch = []
+
+    def flush():
+        recipients = resolve_recipients(batch)
+        notifications = {}
+        for record in batch:
+            overdue_days = (today - timezone.localdate(record['updated_at'])).days
+            notifications[record['id']] = {
+                'message': stale_notification_message(record, overdue_days),
+                'overdue_days': overdue_days,
+            }
+        return len(publish_notifications(notifications, recipients))
+
+    for record in stale_service_records().iterator(chunk_size=NOTIFICATION_BATCH_SIZE):
+        record_count += 1
+        batch.append(record)
+        if len(batch) >= NOTIFICATION_BATCH_SIZE:
+            receipt_count += flush()
+            batch = []
+    if batch:
+        receipt_count += flush()
+
+    if record_count:
+        print(
+            f"[{timezone.now()}] ✓ {record_count} servis kaydı için bildirimler güncellendi "
+            f"({receipt_count} yeni alıcı)"
+        )
     else:
         print(f"[{timezone.now()}] ✓ Güncellenmesi gereken servis kaydı bulunamadı")
-    
-    return "Kontrol tamamlandı"
\ No newline at end of file
+
+    return "Kontrol tamamlandı"
@@ -1,3 +1,197 @@
+import asyncio
+import contextlib
+import io
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import Brand, Customer
+from service.models import ServiceRecord
+from . import events
+from .models import Notification, NotificationReceipt
+from .notifications import unread_count
+from .tasks import check_service_updates
 
 # Create your tests here.
+
+
+class EventBrokerTests(TestCase):
+    async def test_memory_broker_delivers_user_and_broadcast_events(self):
+        broker = events.MemoryBroker()
+        subscription = await broker.subscribe([events.user_channel(1), events.BROADCAST_CHANNEL])
+        try:
+            broker.publish(events.user_channel(1), 'user')
+            broker.publish(events.user_channel(2), 'other user')
+            broker.publish(events.BROADCAST_CHANNEL, 'broadcast')
+            self.assertEqual(await subscription.get(timeout=1), 'user')
+            self.assertEqual(await subscription.get(timeout=1), 'broadcast')
+            self.assertIsNone(await subscription.get(timeout=0.05))
+        finally:
+            await subscription.close()
+        broker.publish(events.user_channel(1), 'after close')
+        self.assertEqual(broker._subscribers[events.user_channel(1)], set())
+
+    def test_sse_message_format(self):
+        self.assertEqual(
+            events_sse('unread', {'unread_count': 3}),
+            'event: unread\ndata: {"unread_count": 3}\n\n',
+        )
+
+
+def events_sse(event, data):
+    from .views import sse_message
+
+    return sse_message(event, data)
+
+
+class NotificationStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('notification-stream')
+
+    def ticket(self):
+        token = AccessToken.for_user(self.user)
+        response = self.client.post(reverse('notification-stream-ticket'), headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['ticket']
+
+    def test_missing_invalid_or_empty_credentials_are_rejected(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.client.get(self.url, {'ticket': ''}).status_code, 401)
+        self.assertEqual(self.client.get(self.url, {'ticket': 'yok'}).status_code, 401)
+        self.assertEqual(self.client.get(self.url, headers={'Authorization': 'Bearer '}).status_code, 401)
+        self.assertEqual(self.client.get(self.url, headers={'Authorization': 'Bearer bozuk'}).status_code, 401)
+        # Erişim token'ı URL'de kabul edilmez
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.client.get(self.url, {'token': str(token)}).status_code, 401)
+
+    def test_ticket_is_single_use_and_wsgi_gets_a_snapshot(self):
+        ticket = self.ticket()
+        response = self.client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content.decode(), 'event: unread\ndata: {"unread_count": 0}\n\n')
+        self.assertEqual(self.client.get(self.url, {'ticket': ticket}).status_code, 401)
+
+    async def test_asgi_stream_sends_unread_then_published_events(self):
+        ticket = await sync_to_async(self.ticket)()
+        response = await self.async_client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        chunks = aiter(response.streaming_content)
+        first = await asyncio.wait_for(anext(chunks), 5)
+        self.assertEqual(first, b'event: unread\ndata: {"unread_count": 0}\n\n')
+
+        events.publish(events.user_channel(self.user.id), 'unread', {'unread_count': 2})
+        message = await asyncio.wait_for(anext(chunks), 5)
+        self.assertEqual(message, b'event: unread\ndata: {"unread_count": 2}\n\n')
+        await chunks.aclose()
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='secret', is_staff=True)
+        cls.creator = User.objects.create_user('creator', password='secret')
+        cls.other = User.objects.create_user('other', password='secret')
+        customer = Customer.objects.create(company_code='C1', company_name='Müşteri')
+        brand = Brand.objects.create(name='Acer')
+        cls.stale = ServiceRecord.objects.create(
+            customer=customer, brand=brand, model='M1',
+            arrival_date=timezone.localdate(), created_user=cls.creator,
+        )
+        ServiceRecord.objects.create(
+            customer=customer, brand=brand, model='M2',
+            arrival_date=timezone.localdate(), created_user=cls.creator,
+        )
+        ServiceRecord.objects.filter(id=cls.stale.id).update(updated_at=timezone.now() - timedelta(days=10))
+
+    def setUp(self):
+        cache.clear()
+
+    def run_check(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            check_service_updates()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_check_service_updates_is_idempotent(self):
+        self.run_check()
+        notification = Notification.objects.get()
+        self.assertEqual(notification.service_record_id, self.stale.id)
+        self.assertEqual(notification.overdue_days, 10)
+        self.assertEqual(
+            set(notification.receipts.values_list('user_id', flat=True)),
+            {self.staff.id, self.creator.id},
+        )
+
+        NotificationReceipt.objects.filter(user=self.staff).update(is_read=True)
+        self.run_check()
+        self.run_check()
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(NotificationReceipt.objects.count(), 2)
+        # Tekrar çalışma okundu bilgisini sıfırlamaz
+        self.assertTrue(NotificationReceipt.objects.get(user=self.staff).is_read)
+
+    def test_read_state_is_per_user(self):
+        self.run_check()
+        notification = Notification.objects.get()
+        self.client_for(self.staff).patch(
+            reverse('notification-update', args=[notification.id]), {'is_read': True}, format='json'
+        )
+
+        staff_list = self.client_for(self.staff).get(reverse('notification_list')).data
+        creator_list = self.client_for(self.creator).get(reverse('notification_list')).data
+        other_list = self.client_for(self.other).get(reverse('notification_list')).data
+        self.assertEqual([(item['id'], item['is_read']) for item in staff_list['results']], [(notification.id, True)])
+        self.assertEqual([(item['id'], item['is_read']) for item in creator_list['results']], [(notification.id, False)])
+        self.assertEqual(other_list['results'], [])
+
+    def test_read_receipt_patch_updates_unread_count_once(self):
+        self.run_check()
+        notification = Notification.objects.get()
+        url = reverse('notification-update', args=[notification.id])
+        client = self.client_for(self.creator)
+        self.assertEqual(unread_count(self.creator.id), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(url, {'is_read': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], notification.id)
+        self.assertTrue(response.data['is_read'])
+        self.assertIsNotNone(response.data['read_at'])
+        self.assertEqual(unread_count(self.creator.id), 0)
+
+        # Aynı isteğin tekrarı sayacı bir daha azaltmaz
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            client.patch(url, {'is_read': True}, format='json')
+        self.assertEqual(callbacks, [])
+        self.assertEqual(unread_count(self.creator.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(url, {'is_read': False}, format='json')
+        self.assertIsNone(response.data['read_at'])
+        self.assertEqual(unread_count(self.creator.id), 1)
+        self.assertEqual(unread_count(self.staff.id), 1)
+
+    def test_read_receipt_patch_is_limited_to_own_receipts(self):
+        self.run_check()
+        notification = Notification.objects.get()
+        response = self.client_for(self.other).patch(
+            reverse('notification-update', args=[notification.id]), {'is_read': True}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(NotificationReceipt.objects.filter(is_read=True).exists())
@@ -2,8 +2,19 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from .serializers import RegisterSerializer
-from .models import Notification
-from .serializers import NotificationSerializer
+from .models import Notification, NotificationReceipt
+from .serializers import NotificationReceiptSerializer, NotificationSerializer
+from django.db.models import F
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from .notifications import unread_count
+from . import events
+import json
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 from django.shortcuts import render
 from rest_framework import generics, permissions
 from django.contrib.auth.models import User
@@ -11,6 +22,7 @@ from .serializers import UserSerializer, UserCreateSerializer
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from service.pagination import CursorPaginationOptInMixin, NotificationCursorPagination
 
 # Kullanıcı kayıt (register)
 class RegisterView(generics.CreateAPIView):
@@ -46,24 +58,109 @@ def current_user(request):
 
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(CursorPaginationOptInMixin, generics.ListAPIView):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_pagination_class = NotificationCursorPagination
 
     def get_queryset(self):
-        # Sadece giriş yapmış kullanıcının bildirimlerini döndür
-        return self.queryset.filter(user=self.request.user).order_by('-created_at')
-    
-    
+        # Sadece giriş yapmış kullanıcıya ulaşan bildirimler; okundu bilgisi alındı kaydından
+        return self.queryset.filter(
+            receipts__user=self.request.user
+        ).select_related(
+            'service_record__customer', 'service_record__brand'
+        ).annotate(
+            is_read=F('receipts__is_read')
+        ).order_by('-created_at', '-id')
+
+
 class NotificationUpdateView(generics.UpdateAPIView):
-    queryset = Notification.objects.all()
-    serializer_class = NotificationSerializer
+    queryset = NotificationReceipt.objects.all()
+    serializer_class = NotificationReceiptSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # URL'deki pk bildirim id'sidir; güncellenen kullanıcının alındı kaydıdır
+    lookup_field = 'notification_id'
+    lookup_url_kwarg = 'pk'
 
     def get_queryset(self):
         # Kullanıcı sadece kendi bildirimlerini güncelleyebilir
         return self.queryset.filter(user=self.request.user)
-    
-    
-    
+
+
+class NotificationUnreadCountView(generics.GenericAPIView):
+    """Okunmamış bildirim sayısı; önbellekten okunur, veritabanına gitmez."""
+    # Kullanıcı token'dan çözülür (kullanıcı tablosu sorgulanmaz)
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response({'unread_count': unread_count(request.user.id)})
+
+
+class NotificationStreamTicketView(generics.GenericAPIView):
+    """Olay akışı için tek kullanımlık bilet (bkz. ``events.issue_stream_ticket``)."""
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        return Response({
+            'ticket': events.issue_stream_ticket(request.user.id),
+            'expires_in': events.STREAM_TICKET_TIMEOUT,
+        })
+
+
+async def notification_stream(request):
+    """Bildirim ve durum olaylarını server-sent events ile iletir.
+
+    EventSource başlık gönderemediği için kimlik ``?ticket=`` ile verilen
+    tek kullanımlık biletle (bkz. ``NotificationStreamTicketView``), diğer
+    istemcilerde ``Authorization: Bearer`` başlığıyla doğrulanır. Bağlantı
+    açılınca güncel okunmamış sayısı gönderilir.
+
+    Sonsuz akış yalnızca ASGI altında açılır; WSGI (``runserver``) her
+    bağlantıda bir worker'ı kilitleyeceğinden sadece anlık okunmamış
+    sayısı gönderilip bağlantı kapatılır, istemci belirli aralıklarla
+    yeniden bağlanır.
+    """
+    user_id = await sync_to_async(events.redeem_stream_ticket)(request.GET.get('ticket'))
+    header = request.headers.get('Authorization', '')
+    if user_id is None and header.startswith('Bearer '):
+        try:
+            user_id = AccessToken(header[len('Bearer '):])[api_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            pass
+    if user_id is None:
+        return JsonResponse({'detail': 'Geçersiz veya eksik kimlik bilgisi.'}, status=401)
+
+    count = await sync_to_async(unread_count)(user_id)
+    if not isinstance(request, ASGIRequest):
+        response = HttpResponse(sse_message('unread', {'unread_count': count}), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    # Abonelik ilk mesajdan önce açılır; arada yayınlanan olaylar kaçmaz
+    subscription = await events.subscribe(user_id)
+
+    async def stream():
+        try:
+            yield sse_message('unread', {'unread_count': count})
+            while True:
+                message = await subscription.get()
+                if message is None:
+                    # Proxy'lerin bağlantıyı boşta sayıp kapatmaması için
+                    yield ': ping\n\n'
+                    continue
+                payload = json.loads(message)
+                yield sse_message(payload['event'], payload['data'])
+        finally:
+            await subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def sse_message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Brand, Customer
+from .models import Brand, Customer, ImportJob
 # Register your models here.
 admin.site.register(Customer)
-admin.site.register(Brand)
\ No newline at end of file
+admin.site.register(Brand)
+admin.site.register(ImportJob)
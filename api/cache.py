@@ -0,0 +1,76 @@
+"""Referans verileri (marka, servis firması, müşteri) için okuma önbelleği.
+
+Liste yanıtları model sürümü + istek yolu (sorgu ve sayfa dahil) ile
+anahtarlanır. Model kaydedilince/silinince sürüm artar; eski anahtarlar
+okunmaz olur ve zaman aşımıyla düşer. Böylece silme için anahtar taraması
+gerekmez.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+
+REFERENCE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def reference_version_key(label):
+    return f'refcache:version:{label}'
+
+
+def reference_version(label):
+    """Modelin (``api.brand`` gibi) güncel önbellek sürümü."""
+    key = reference_version_key(label)
+    version = cache.get(key)
+    if version is None:
+        # Sürüm anahtarı düşerse eski girişlerle çakışmasın diye zamandan başlatılır
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def increment_reference_version(label):
+    """Sürümü hemen artırır; modeldeki eski önbellek girişleri okunmaz olur."""
+    try:
+        cache.incr(reference_version_key(label))
+    except ValueError:
+        reference_version(label)
+
+
+def bump_reference_version(label):
+    """Sürümü commit sonrasında artırır; commit öncesi okuyan eski veriyi yeni sürüme yazamaz."""
+    transaction.on_commit(lambda: increment_reference_version(label))
+
+
+class ReferenceCacheMixin:
+    """Liste yanıtını (veri + ETag) model sürümüyle anahtarlanmış olarak önbelleğe alır.
+
+    Önbellekte varsa veritabanına hiç gidilmez; ``If-None-Match``
+    eşleşirse 304 döner. ``ConditionalGetMixin`` ile birlikte, ondan önce
+    kullanılır.
+    """
+
+    def reference_cache_key(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        source = f"{self.request.get_full_path()}|{getattr(renderer, 'format', '') or ''}"
+        label = self.get_queryset().model._meta.label_lower
+        digest = hashlib.md5(source.encode()).hexdigest()
+        return f'refcache:{label}:{reference_version(label)}:{digest}'
+
+    def list(self, request, *args, **kwargs):
+        key = self.reference_cache_key()
+        cached = cache.get(key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, {'data': response.data, 'etag': response.get('ETag')}, REFERENCE_CACHE_TIMEOUT)
+            return response
+
+        etag = cached['etag']
+        response = get_conditional_response(request, etag=etag) or Response(cached['data'])
+        if etag:
+            response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
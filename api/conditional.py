@@ -0,0 +1,88 @@
+"""Liste ve detay GET'leri için koşullu istek (ETag / Last-Modified) desteği.
+
+Doğrulayıcı, filtrelenmiş queryset üzerinde JOIN'siz tek bir toplama
+sorgusuyla hesaplanır: satır sayısı, en büyük ``id`` (silme + ekleme
+çiftlerini yakalamak için) ve mikro saniyeli en büyük ``updated_at``.
+Gömülü ilişkilerin değişikliği bu modellerin önbellek sürümünden
+(bkz. ``api.cache.reference_version``) okunur, veritabanına gidilmez.
+İstemcinin ``If-None-Match`` başlığı eşleşirse sorgu ve serileştirme
+yapılmadan 304 döner.
+
+304 kararını sadece ETag verir: ``Last-Modified`` saniye çözünürlüklü
+olduğundan aynı saniyedeki ikinci yazma ``If-Modified-Since`` ile
+görülmezdi; başlık detay yanıtlarında bilgi amaçlı gönderilir.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import reference_version
+
+
+class ConditionalGetMixin:
+    """``list`` ve ``retrieve`` için ETag ile 304 desteği.
+
+    ``conditional_related`` çıktıda gömülü gelen ilişkilerdir; ilişkili
+    modelin önbellek sürümü ETag'e katılır (ör. müşteri adı değişince
+    kayıt listesi de değişmiş sayılır).
+    """
+    conditional_related = ()
+
+    def get_conditional_queryset(self):
+        """Doğrulayıcının hesaplandığı queryset; ``select_related``/``annotate`` gerekmez."""
+        return self.get_queryset()
+
+    def conditional_state(self, queryset):
+        """``{'row_count', 'max_id', 'latest'}`` tek sorguda, JOIN olmadan."""
+        return queryset.order_by().aggregate(row_count=Count('pk'), max_id=Max('pk'), latest=Max('updated_at'))
+
+    def related_versions(self, queryset):
+        model = queryset.model
+        return [
+            str(reference_version(model._meta.get_field(name).related_model._meta.label_lower))
+            for name in self.conditional_related
+        ]
+
+    def conditional_etag(self, state, queryset):
+        # Yol sorgu parametrelerini (filtre, sayfa, arama) da içerir
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        latest = state['latest']
+        source = '|'.join([
+            self.request.get_full_path(),
+            getattr(renderer, 'format', '') or '',
+            str(state['row_count']),
+            str(state['max_id'] or ''),
+            latest.isoformat() if latest else '',
+            *self.related_versions(queryset),
+        ])
+        return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+    def conditional_response(self, request, handler, queryset, detail, *args, **kwargs):
+        state = self.conditional_state(queryset)
+        if detail and not state['row_count']:
+            # 404 normal akışta üretilsin
+            return handler(request, *args, **kwargs)
+
+        etag = self.conditional_etag(state, queryset)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        if detail and state['latest']:
+            response['Last-Modified'] = http_date(state['latest'].timestamp())
+        response['ETag'] = etag
+        # Tarayıcı her seferinde doğrulasın, eşleşirse önbellekteki gövdeyi kullansın
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_conditional_queryset())
+        return self.conditional_response(request, super().list, queryset, False, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_conditional_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        return self.conditional_response(request, super().retrieve, queryset, True, *args, **kwargs)
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customers', 'Müşteriler'), ('brands', 'Markalar'), ('services', 'Servisler')], max_length=20, verbose_name='Import Type')),
+                ('file', models.FileField(upload_to='imports/', verbose_name='File')),
+                ('sheet_name', models.CharField(blank=True, max_length=100, verbose_name='Sheet Name')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('running', 'Çalışıyor'), ('completed', 'Tamamlandı'), ('failed', 'Hatalı')], default='pending', max_length=20, verbose_name='Status')),
+                ('total_chunks', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total Chunks')),
+                ('processed_chunks', models.PositiveIntegerField(default=0, verbose_name='Processed Chunks')),
+                ('success_count', models.PositiveIntegerField(default=0, verbose_name='Imported Rows')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Failed Rows')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Errors')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created Date')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started Date')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished Date')),
+                ('created_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+            ],
+            options={
+                'verbose_name': 'Import Job',
+                'verbose_name_plural': 'Import Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='unchanged_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Unchanged Rows'),
+        ),
+        migrations.CreateModel(
+            name='ImportFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customers', 'Müşteriler'), ('brands', 'Markalar'), ('services', 'Servisler')], max_length=20, verbose_name='Import Type')),
+                ('key', models.CharField(max_length=255, verbose_name='Key')),
+                ('digest', models.CharField(max_length=32, verbose_name='Digest')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated Date')),
+            ],
+            options={
+                'verbose_name': 'Import Fingerprint',
+                'verbose_name_plural': 'Import Fingerprints',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='import_fingerprint_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+from api.text import fold_text
+
+SEARCH_SOURCE_FIELDS = ('company_name', 'company_long_name', 'company_code', 'tax_number')
+
+
+def populate_search_document(apps, schema_editor):
+    Customer = apps.get_model('api', 'Customer')
+    batch = []
+    for customer in Customer.objects.iterator(chunk_size=500):
+        parts = [getattr(customer, name) for name in SEARCH_SOURCE_FIELDS]
+        customer.search_document = ' '.join(fold_text(part) for part in parts if part)
+        batch.append(customer)
+        if len(batch) >= 500:
+            Customer.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        Customer.objects.bulk_update(batch, ['search_document'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # Trigram indeksi yalnızca PostgreSQL'de; SQLite düz LIKE taramasıyla çalışır
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS customer_search_trgm '
+        'ON api_customer USING gin (search_document gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS customer_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_importfingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_document, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['search_document'], name='customer_search_prefix_idx', opclasses=['text_pattern_ops']),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_customer_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='failed_chunks',
+            field=models.PositiveIntegerField(default=0, verbose_name='Failed Chunks'),
+        ),
+    ]
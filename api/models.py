@@ -1,4 +1,10 @@
+from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_reference_version
+from .text import fold_text
 
 # Create your models here.
 
@@ -58,15 +64,44 @@ class Customer(models.Model):
         auto_now=True,
         verbose_name="Updated Date"
     )
+    # Otomatik tamamlama için katlanmış (bkz. api.text.fold_text) arama metni
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    # search_document bu alanlardan bu sırayla üretilir; ad başta olduğundan
+    # ad öneki aynı zamanda metnin önekidir
+    SEARCH_SOURCE_FIELDS = ('company_name', 'company_long_name', 'company_code', 'tax_number')
 
     class Meta:
         verbose_name = "Customer"
         verbose_name_plural = "Customers"
         ordering = ['company_name']
+        indexes = [
+            # LIKE 'önek%' sorguları için; trigram indeksi migration'da (PostgreSQL)
+            models.Index(
+                fields=['search_document'],
+                name='customer_search_prefix_idx',
+                opclasses=['text_pattern_ops'],
+            ),
+        ]
 
     def __str__(self):
         return f"{self.company_name} ({self.company_code})"
 
+    @staticmethod
+    def search_document_for(*parts):
+        return ' '.join(fold_text(part) for part in parts if part)
+
+    def build_search_document(self):
+        return self.search_document_for(*(getattr(self, name) for name in self.SEARCH_SOURCE_FIELDS))
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.SEARCH_SOURCE_FIELDS):
+            self.search_document = self.build_search_document()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_document'}
+        super().save(*args, **kwargs)
+
 
 
 
@@ -84,5 +119,107 @@ class Brand(models.Model):
 
     def __str__(self):
         return self.name
-    
-    
+
+
+class ImportJob(models.Model):
+    """Arka planda (Celery) çalışan Excel içe aktarma işi ve ilerleme durumu."""
+    KIND_CUSTOMERS = 'customers'
+    KIND_BRANDS = 'brands'
+    KIND_SERVICES = 'services'
+    KIND_CHOICES = [
+        (KIND_CUSTOMERS, 'Müşteriler'),
+        (KIND_BRANDS, 'Markalar'),
+        (KIND_SERVICES, 'Servisler'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Bekliyor'),
+        (STATUS_RUNNING, 'Çalışıyor'),
+        (STATUS_COMPLETED, 'Tamamlandı'),
+        (STATUS_FAILED, 'Hatalı'),
+    ]
+
+    # errors alanında en fazla bu kadar satır hatası saklanır
+    MAX_RECORDED_ERRORS = 100
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Import Type")
+    file = models.FileField(upload_to='imports/', verbose_name="File")
+    sheet_name = models.CharField(max_length=100, blank=True, verbose_name="Sheet Name")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Status")
+    total_chunks = models.PositiveIntegerField(null=True, blank=True, verbose_name="Total Chunks")
+    processed_chunks = models.PositiveIntegerField(default=0, verbose_name="Processed Chunks")
+    success_count = models.PositiveIntegerField(default=0, verbose_name="Imported Rows")
+    unchanged_count = models.PositiveIntegerField(default=0, verbose_name="Unchanged Rows")
+    error_count = models.PositiveIntegerField(default=0, verbose_name="Failed Rows")
+    # Beklenmeyen hatayla işlenemeyen parçalar; varsa iş sonunda 'failed' olur
+    failed_chunks = models.PositiveIntegerField(default=0, verbose_name="Failed Chunks")
+    errors = models.JSONField(default=list, blank=True, verbose_name="Errors")
+    created_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='import_jobs', verbose_name="Created By"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created Date")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Started Date")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finished Date")
+
+    class Meta:
+        verbose_name = "Import Job"
+        verbose_name_plural = "Import Jobs"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+
+class ImportFingerprint(models.Model):
+    """Son içe aktarılan satırın içerik özeti; değişmeyen satırlar tekrar yazılmaz."""
+    kind = models.CharField(max_length=20, choices=ImportJob.KIND_CHOICES, verbose_name="Import Type")
+    key = models.CharField(max_length=255, verbose_name="Key")
+    digest = models.CharField(max_length=32, verbose_name="Digest")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated Date")
+
+    class Meta:
+        verbose_name = "Import Fingerprint"
+        verbose_name_plural = "Import Fingerprints"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='import_fingerprint_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.key}"
+
+
+# İçe aktarılan modeller: etiket -> (içe aktarma türü, anahtar alanı)
+IMPORT_TARGETS = {
+    'api.customer': (ImportJob.KIND_CUSTOMERS, 'company_code'),
+    'api.brand': (ImportJob.KIND_BRANDS, 'name'),
+    'service.service': (ImportJob.KIND_SERVICES, 'name'),
+}
+
+
+# Kayıt uygulamadan değiştirilir veya silinirse özet geçersiz olur;
+# sonraki içe aktarmada satır tekrar yazılır
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender='service.Service')
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender='service.Service')
+def forget_import_fingerprint(sender, instance, **kwargs):
+    kind, key_field = IMPORT_TARGETS[sender._meta.label_lower]
+    ImportFingerprint.objects.filter(kind=kind, key=getattr(instance, key_field)).delete()
+
+
+# Referans listelerinin önbelleği model sürümüyle anahtarlanır (bkz. api/cache.py)
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender='service.Service')
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender='service.Service')
+def bump_reference_cache(sender, instance, **kwargs):
+    bump_reference_version(sender._meta.label_lower)
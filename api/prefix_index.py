@@ -0,0 +1,84 @@
+"""Marka ve servis firması adları için süreç içi önek indeksi.
+
+Her worker küçük ve nadiren değişen bu tabloları ilk kullanımda belleğe
+alır: adın ve her kelimesinin katlanmış (bkz. ``api.text.fold_text``)
+hali sıralı bir dizide tutulur, öneriler ``bisect`` ile bulunur. Model
+değişince artan önbellek sürümü (bkz. ``api.cache.reference_version``)
+her aramada okunur; sürüm değişmişse indeks yeniden kurulur. Böylece
+tüm worker'lar ortak önbellek (production'da Redis) üzerinden
+geçersizlenir ve öneriler veritabanına gitmeden döner.
+"""
+from bisect import bisect_left
+
+from .cache import reference_version
+from .text import fold_text
+
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+
+
+def parse_limit(value, default=SUGGEST_LIMIT, maximum=SUGGEST_MAX_LIMIT):
+    """``?limit=`` değerini 1..maximum aralığına sığdırır; geçersizse varsayılan."""
+    try:
+        limit = int(value) if value is not None else default
+    except ValueError:
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+class PrefixIndex:
+    """``(id, ad)`` satırları üzerinde Türkçe katlamalı önek araması."""
+
+    def __init__(self, rows):
+        self.names = {}
+        entries = []
+        for pk, name in rows:
+            self.names[pk] = name
+            folded = ' '.join(fold_text(name).split())
+            words = folded.split(' ')
+            # (anahtar, sıra, katlanmış ad, id): sıra 0 = adın başı, 1 = sonraki bir kelime
+            for position in range(len(words)):
+                entries.append((' '.join(words[position:]), min(position, 1), folded, pk))
+        entries.sort()
+        self.entries = entries
+        self.keys = [entry[0] for entry in entries]
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, term, limit=SUGGEST_LIMIT):
+        """Önce adı terimle başlayanlar, sonra bir kelimesi terimle başlayanlar (ada göre sıralı)."""
+        term = ' '.join(fold_text(term).split())
+        if not term:
+            return []
+
+        best = {}
+        start = bisect_left(self.keys, term)
+        for key, rank, folded, pk in self.entries[start:]:
+            if not key.startswith(term):
+                break
+            if pk not in best or rank < best[pk][0]:
+                best[pk] = (rank, folded)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], item[0]))[:limit]
+        return [{'id': pk, 'name': self.names[pk]} for pk, _ in ranked]
+
+
+# model etiketi -> (sürüm, indeks); her worker sürecinde ayrı tutulur
+_indexes = {}
+
+
+def get_prefix_index(model):
+    """Modelin güncel indeksini döner; sürüm değiştiyse yeniden kurar."""
+    label = model._meta.label_lower
+    version = reference_version(label)
+    current = _indexes.get(label)
+    if current is None or current[0] != version:
+        # Sürüm satırlardan önce okunur; arada gelen değişiklik bir sonraki aramada yakalanır
+        current = (version, PrefixIndex(model.objects.values_list('id', 'name').iterator()))
+        _indexes[label] = current
+    return current[1]
+
+
+def suggest(model, term, limit=SUGGEST_LIMIT):
+    return get_prefix_index(model).search(term, limit)
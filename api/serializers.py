@@ -2,7 +2,9 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 
-from api.models import Brand, Customer
+import os
+
+from api.models import Brand, Customer, ImportJob
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -49,4 +51,41 @@ class CustomerSerializer(serializers.ModelSerializer):
             'email', 'tax_number', 'tax_office', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
-        ref_name = "ApiCustomerSerializer"
\ No newline at end of file
+        ref_name = "ApiCustomerSerializer"
+
+
+class CustomerAutocompleteSerializer(serializers.ModelSerializer):
+    """Otomatik tamamlama önerisi: sadece seçim için gereken alanlar"""
+    class Meta:
+        model = Customer
+        fields = ['id', 'company_code', 'company_name']
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'file', 'sheet_name', 'status', 'progress',
+            'total_chunks', 'processed_chunks', 'failed_chunks', 'success_count', 'unchanged_count', 'error_count',
+            'errors', 'created_user', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [
+            'status', 'total_chunks', 'processed_chunks', 'failed_chunks', 'success_count', 'unchanged_count', 'error_count',
+            'errors', 'created_user', 'created_at', 'started_at', 'finished_at',
+        ]
+        ref_name = "ApiImportJobSerializer"
+
+    def get_progress(self, obj):
+        """Yüzde olarak ilerleme; parça sayısı henüz bilinmiyorsa None"""
+        if obj.status == ImportJob.STATUS_COMPLETED:
+            return 100
+        if not obj.total_chunks:
+            return None
+        return int(obj.processed_chunks * 100 / obj.total_chunks)
+
+    def validate_file(self, value):
+        if os.path.splitext(value.name)[1].lower() not in ('.xls', '.xlsx', '.xlsm'):
+            raise serializers.ValidationError("Sadece Excel dosyaları (.xls, .xlsx) yüklenebilir.")
+        return value
@@ -0,0 +1,125 @@
+import pandas as pd
+from celery import shared_task
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from seeder.seedClass import seederClass
+from .models import ImportJob
+
+
+def record_chunk_result(job_id, success=0, errors=(), unchanged=0, failed=False):
+    """Parça sonucunu işe yazar; hata listesi ``MAX_RECORDED_ERRORS`` ile sınırlıdır."""
+    with transaction.atomic():
+        job = ImportJob.objects.select_for_update().get(pk=job_id)
+        job.processed_chunks += 1
+        job.failed_chunks += int(failed)
+        job.success_count += success
+        job.unchanged_count += unchanged
+        job.error_count += sum(error.get('count', 1) for error in errors)
+        room = ImportJob.MAX_RECORDED_ERRORS - len(job.errors)
+        if room > 0:
+            job.errors = job.errors + list(errors)[:room]
+        job.save(update_fields=[
+            'processed_chunks', 'failed_chunks', 'success_count', 'unchanged_count', 'error_count', 'errors',
+        ])
+
+
+def finish_if_done(job_id):
+    """Tüm parçalar işlendiyse işi tamamlar; işlenemeyen parça varsa 'failed' yapar.
+
+    Koşullu tek UPDATE olduğu için son parça ile okuma görevi aynı anda
+    çağırsa da iş yalnızca bir kez tamamlanır.
+    """
+    ImportJob.objects.filter(
+        pk=job_id,
+        status=ImportJob.STATUS_RUNNING,
+        total_chunks__isnull=False,
+        processed_chunks__gte=F('total_chunks'),
+    ).update(
+        status=Case(
+            When(failed_chunks__gt=0, then=Value(ImportJob.STATUS_FAILED)),
+            default=Value(ImportJob.STATUS_COMPLETED),
+        ),
+        finished_at=timezone.now(),
+    )
+
+
+@shared_task
+def run_import_job(job_id):
+    """Dosyayı parça parça okur, normalize eder ve her parçayı ayrı göreve dağıtır."""
+    updated = ImportJob.objects.filter(pk=job_id, status=ImportJob.STATUS_PENDING).update(
+        status=ImportJob.STATUS_RUNNING, started_at=timezone.now()
+    )
+    if not updated:
+        return
+    job = ImportJob.objects.get(pk=job_id)
+    seeder = seederClass(job.file.path)
+    _, unique_field, normalize, default_sheet = seeder.kind_config(job.kind)
+
+    total_chunks = 0
+    first_row = 2  # 1. satır başlık
+    try:
+        for chunk in seeder.iter_excel_chunks(job.file.path, job.sheet_name or default_sheet):
+            df = normalize(chunk)
+            if df is None:
+                raise ValueError(f"Sayfada beklenen kolonlar bulunamadı: {chunk.columns.tolist()}")
+            df.index = range(first_row, first_row + len(df))
+            first_row += len(df)
+
+            missing = df[unique_field] == ''
+            errors = [
+                {'row': int(row), 'error': f"{unique_field} boş"}
+                for row in df.index[missing]
+            ]
+            df = df[~missing].astype(object).where(df[~missing].notna(), None)
+            rows = [int(row) for row in df.index]
+            import_chunk.delay(job_id, rows, df.to_dict('records'), errors)
+            total_chunks += 1
+    except Exception as e:
+        ImportJob.objects.filter(pk=job_id).update(
+            status=ImportJob.STATUS_FAILED,
+            finished_at=timezone.now(),
+            errors=[{'error': f"Dosya okunamadı: {e}"}],
+        )
+        return
+
+    ImportJob.objects.filter(pk=job_id).update(total_chunks=total_chunks)
+    finish_if_done(job_id)
+
+
+@shared_task
+def import_chunk(job_id, rows, records, errors=()):
+    """Tek parçayı kendi transaction'ı içinde yazar ve işin ilerlemesini günceller."""
+    kind = ImportJob.objects.values_list('kind', flat=True).get(pk=job_id)
+    seeder = seederClass(None)
+    model, unique_field, _, _ = seeder.kind_config(kind)
+
+    errors = list(errors)
+    success = 0
+    unchanged = 0
+    failed = False
+    if records:
+        chunk_rows = rows
+        try:
+            df = pd.DataFrame.from_records(records, index=rows)
+            invalid = seeder.invalid_rows(model, df)
+            errors += [
+                {'row': int(row), 'error': "Alan uzunluğu sınırı aşıldı"}
+                for row in df.index[invalid]
+            ]
+            chunk_rows = [int(row) for row in df.index[~invalid]]
+            with transaction.atomic():
+                result = seeder.upsert_chunk(model, df, unique_field, kind)
+            success, unchanged = result['written'], result['unchanged']
+        except Exception as e:
+            # Parça yine de işlenmiş sayılır; iş 'running' durumunda kalmaz, sonunda 'failed' olur
+            failed = True
+            errors.append({
+                'rows': [min(chunk_rows), max(chunk_rows)] if chunk_rows else [],
+                'count': len(chunk_rows),
+                'error': str(e),
+            })
+
+    record_chunk_result(job_id, success, errors, unchanged, failed)
+    finish_if_done(job_id)
@@ -1,3 +1,245 @@
-from django.test import TestCase
+import contextlib
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from functools import partial
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+
+from backend.celery import app as celery_app
+from seeder.seedClass import seederClass
+from .models import Brand, Customer, ImportFingerprint, ImportJob
+
+TESTDATA_DIR = Path(__file__).resolve().parent / 'testdata'
 
 # Create your tests here.
+
+
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Brand.objects.create(name='Acer')
+
+    def test_brand_list_is_served_from_cache_until_a_brand_changes(self):
+        url = reverse('brand-list')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual([brand['name'] for brand in response.json()['results']], ['Acer'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Brand.objects.create(name='HP')
+        response = self.client.get(url)
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class CustomerAutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Customer.objects.create(company_code='C1', company_name='Ege Bilgisayar')
+        Customer.objects.create(company_code='C2', company_name='BİLGİ İşlem', tax_number='1234567890')
+        Customer.objects.create(company_code='C3', company_name='Mobilya Evi')
+
+    def test_prefix_matches_rank_first_and_tax_number_is_searched(self):
+        url = reverse('customer-autocomplete')
+        response = self.client.get(url, {'q': 'bilgi'})
+        self.assertEqual([row['company_name'] for row in response.json()], ['BİLGİ İşlem', 'Ege Bilgisayar'])
+        self.assertEqual(set(response.json()[0]), {'id', 'company_code', 'company_name'})
+
+        response = self.client.get(url, {'q': '4567'})
+        self.assertEqual([row['company_code'] for row in response.json()], ['C2'])
+
+
+class BrandSuggestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Brand.objects.create(name='Işık Bilişim')
+        Brand.objects.create(name='Bilgi Teknik')
+
+    def test_suggestions_come_from_memory_and_follow_changes(self):
+        url = reverse('brand-suggest')
+        response = self.client.get(url, {'q': 'BİL'})
+        self.assertEqual([row['name'] for row in response.json()], ['Bilgi Teknik', 'Işık Bilişim'])
+
+        with self.assertNumQueries(0):
+            self.client.get(url, {'q': 'isik'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Brand.objects.create(name='Bilsa')
+        response = self.client.get(url, {'q': 'bil', 'limit': 2})
+        self.assertEqual([row['name'] for row in response.json()], ['Bilgi Teknik', 'Bilsa'])
+
+
+def excel_file(sheet_name, rows):
+    """Bellekte tek sayfalı .xlsx; ilk satır başlık."""
+    book = Workbook()
+    sheet = book.active
+    sheet.title = sheet_name
+    for row in rows:
+        sheet.append(row)
+    content = io.BytesIO()
+    book.save(content)
+    content.seek(0)
+    return content
+
+
+class SeederTests(TestCase):
+    def seed_brands(self, names, dry_run=False, chunk_size=2):
+        seeder = seederClass(excel_file('Sayfa1', [['Markalar'], *[[name] for name in names]]), chunk_size)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), self.captureOnCommitCallbacks(execute=True):
+            result = seeder.seed_kind('brands', 'Sayfa1', dry_run)
+        return result, output.getvalue()
+
+    def test_reimport_skips_unchanged_rows_by_fingerprint(self):
+        result, _ = self.seed_brands(['Acer', 'HP', 'Asus', ' ', 'Acer'])
+        self.assertEqual(result['written'], 3)
+        self.assertEqual(sorted(Brand.objects.values_list('name', flat=True)), ['Acer', 'Asus', 'HP'])
+        self.assertEqual(ImportFingerprint.objects.filter(kind='brands').count(), 3)
+
+        with CaptureQueriesContext(connection) as context:
+            result, _ = self.seed_brands(['Acer', 'HP', 'Asus'])
+        # Parça başına tek özet sorgusu; yazma yok
+        statements = [q['sql'].split()[0] for q in context.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(statements, ['SELECT', 'SELECT'])
+        self.assertEqual((result['written'], result['unchanged']), (0, 3))
+
+        result, _ = self.seed_brands(['Acer', 'HP', 'Asus', 'Lenovo'])
+        self.assertEqual((result['written'], result['unchanged'], result['new']), (1, 3, ['Lenovo']))
+        self.assertEqual(Brand.objects.count(), 4)
+
+    def test_dry_run_reports_without_writing(self):
+        self.seed_brands(['Acer'])
+        result, output = self.seed_brands(['Acer', 'HP'], dry_run=True)
+        self.assertEqual((result['written'], result['new'], result['unchanged']), (0, ['HP'], 1))
+        self.assertIn('[dry-run] Yeni: 1, Değişen: 0, Değişmeyen: 1', output)
+        self.assertIn('+ HP', output)
+        self.assertFalse(Brand.objects.filter(name='HP').exists())
+        self.assertFalse(ImportFingerprint.objects.filter(key='HP').exists())
+
+    def test_changed_rows_are_rewritten(self):
+        seeder = seederClass(excel_file('cariler', [
+            ['Firma Adı', 'Telefon'], ['Ege Ofis', '111'], ['Işık Bilgisayar', '222'],
+        ]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            seeder.seed_kind('customers', 'cariler')
+            seeder = seederClass(excel_file('cariler', [
+                ['Firma Adı', 'Telefon'], ['Ege Ofis', '111'], ['Işık Bilgisayar', '333'],
+            ]))
+            result = seeder.seed_kind('customers', 'cariler')
+        self.assertEqual((result['written'], result['changed'], result['unchanged']), (1, ['Işık Bilgisayar'], 1))
+        customer = Customer.objects.get(company_code='Işık Bilgisayar')
+        self.assertEqual(customer.phone, '333')
+        self.assertEqual(customer.search_document, 'isik bilgisayar isik bilgisayar')
+
+    def test_xls_numbers_keep_their_text(self):
+        # xlrd sayıları float okur; tam sayılar '.0' almadan yazılmalı
+        seeder = seederClass(str(TESTDATA_DIR / 'cariler_sayisal.xls'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = seeder.seed_kind('customers', 'cariler')
+        self.assertEqual(result['written'], 3)
+        rows = {
+            row[0]: row[1:]
+            for row in Customer.objects.values_list('company_code', 'tax_number', 'phone', 'tax_office')
+        }
+        self.assertEqual(rows, {
+            'Ege Ofis': ('1234567890', '2125550101', 'Kadıköy'),
+            'Işık Bilgisayar': ('9876543210', '', 'Bornova'),
+            'Anadolu Yazılım': ('0012345678', '3125550000.5', ''),
+        })
+
+        # Aynı dosya tekrar okununca özetler tutar, satırlar değişmemiş sayılır
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = seeder.seed_kind('customers', 'cariler')
+        self.assertEqual((result['written'], result['unchanged']), (0, 3))
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class ImportJobTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        # Celery ayarları uygulama yüklenirken okunur; eager mod burada da açılır
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', celery_app.conf.task_always_eager)
+        celery_app.conf.task_always_eager = True
+        # Birden fazla parça oluşsun
+        self.enterContext(mock.patch('api.tasks.seederClass', partial(seederClass, chunk_size=2)))
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', password='secret', is_staff=True))
+
+    def upload(self, content, kind='brands', name='markalar.xlsx'):
+        with contextlib.redirect_stdout(io.StringIO()), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('import-job-list-create'), {
+                'kind': kind,
+                'sheet_name': 'Sayfa1',
+                'file': SimpleUploadedFile(name, content),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        return self.client.get(reverse('import-job-detail', args=[response.data['id']])).data
+
+    def test_chunks_are_counted_and_job_completes(self):
+        rows = [['Markalar'], ['Acer'], [''], ['HP'], ['X' * 101], ['Asus']]
+        job = self.upload(excel_file('Sayfa1', rows).getvalue())
+
+        self.assertEqual(job['status'], ImportJob.STATUS_COMPLETED)
+        self.assertEqual(job['progress'], 100)
+        self.assertEqual((job['total_chunks'], job['processed_chunks']), (3, 3))
+        self.assertEqual((job['success_count'], job['error_count']), (3, 2))
+        # Satır numaraları Excel'deki satırlardır (1. satır başlık)
+        self.assertEqual(sorted(error['row'] for error in job['errors']), [3, 5])
+        self.assertIsNotNone(job['finished_at'])
+        self.assertEqual(sorted(Brand.objects.values_list('name', flat=True)), ['Acer', 'Asus', 'HP'])
+
+        # Aynı dosya tekrar yüklenince satırlar değişmemiş sayılır
+        job = self.upload(excel_file('Sayfa1', rows).getvalue())
+        self.assertEqual((job['success_count'], job['unchanged_count']), (0, 3))
+
+    def test_crashed_chunk_is_counted_and_fails_the_job(self):
+        rows = [['Markalar'], ['Acer'], ['HP'], ['Asus']]
+        upsert_chunk = seederClass.upsert_chunk
+
+        def crash_on_asus(seeder, model, df, *args, **kwargs):
+            if 'Asus' in df['name'].tolist():
+                raise ValueError("beklenmeyen hata")
+            return upsert_chunk(seeder, model, df, *args, **kwargs)
+
+        with mock.patch.object(seederClass, 'upsert_chunk', crash_on_asus):
+            job = self.upload(excel_file('Sayfa1', rows).getvalue())
+
+        # Çöken parça da sayılır; iş 'running' durumunda kalmaz
+        self.assertEqual(job['status'], ImportJob.STATUS_FAILED)
+        self.assertEqual((job['total_chunks'], job['processed_chunks'], job['failed_chunks']), (2, 2, 1))
+        self.assertEqual((job['success_count'], job['error_count']), (2, 1))
+        self.assertEqual(job['errors'], [{'rows': [4, 4], 'count': 1, 'error': "beklenmeyen hata"}])
+        self.assertIsNotNone(job['finished_at'])
+        self.assertEqual(sorted(Brand.objects.values_list('name', flat=True)), ['Acer', 'HP'])
+
+    def test_unreadable_file_fails_the_job(self):
+        job = self.upload(b'excel degil')
+        self.assertEqual(job['status'], ImportJob.STATUS_FAILED)
+        self.assertIsNotNone(job['finished_at'])
+        self.assertIn('Dosya okunamadı', job['errors'][0]['error'])
+
+    def test_missing_columns_fail_the_job(self):
+        job = self.upload(excel_file('Sayfa1', [['Başka'], ['Acer']]).getvalue())
+        self.assertEqual(job['status'], ImportJob.STATUS_FAILED)
+        self.assertFalse(Brand.objects.exists())
+
+    def test_only_excel_files_are_accepted(self):
+        response = self.client.post(reverse('import-job-list-create'), {
+            'kind': 'brands', 'file': SimpleUploadedFile('markalar.csv', b'Markalar\nAcer'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.data)
@@ -0,0 +1,20 @@
+import unicodedata
+
+# Türkçe büyük/küçük harf dönüşümü: İ -> i, I -> ı
+_TURKISH_LOWER = str.maketrans({'İ': 'i', 'I': 'ı'})
+# Aksansız yazımları da eşleştirmek için Türkçe karakterleri sadeleştir
+_TURKISH_ASCII = str.maketrans('ıçğöşü', 'icgosu')
+
+
+def fold_text(value):
+    """Arama ve karşılaştırma için metni Türkçe kurallarına göre katlar.
+
+    "İSTANBUL", "istanbul" ve "Istanbul" aynı değere ("istanbul") dönüşür;
+    aksanlar atılır, böylece "Işık" ile "isik" eşleşir.
+    """
+    if value is None:
+        return ''
+    text = str(value).translate(_TURKISH_LOWER).lower()
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return text.translate(_TURKISH_ASCII)
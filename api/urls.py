@@ -8,10 +8,16 @@ urlpatterns = [
     
     # Customer routes
     path('customers/', views.CustomerListCreateView.as_view(), name='customer-list-create'),
+    path('customers/autocomplete/', views.CustomerAutocompleteView.as_view(), name='customer-autocomplete'),
     path('customers/<int:pk>/', views.CustomerDetailView.as_view(), name='customer-detail'),
     
     # Brand routes
     path('brands/', views.BrandListView.as_view(), name='brand-list'),
+    path('brands/suggest/', views.brand_suggest, name='brand-suggest'),
     path('brands/create/', views.BrandCreateView.as_view(), name='brand-create'),
     path('brands/<int:pk>/', views.BrandDetailView.as_view(), name='brand-detail'),
+
+    # Excel import jobs
+    path('imports/', views.ImportJobListCreateView.as_view(), name='import-job-list-create'),
+    path('imports/<int:pk>/', views.ImportJobDetailView.as_view(), name='import-job-detail'),
 ]    
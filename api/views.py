@@ -7,8 +7,16 @@ from .serializers import UserSerializer, UserCreateSerializer
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from .models import Customer, Brand
-from .serializers import CustomerSerializer, BrandSerializer
+from django.db import transaction
+from django.db.models import Case, IntegerField, When
+from rest_framework.parsers import FormParser, MultiPartParser
+from .cache import ReferenceCacheMixin
+from .conditional import ConditionalGetMixin
+from .models import Customer, Brand, ImportJob
+from .prefix_index import parse_limit, suggest
+from .text import fold_text
+from .serializers import CustomerSerializer, CustomerAutocompleteSerializer, BrandSerializer, ImportJobSerializer
+from .tasks import run_import_job
 
 # 🔹 Tüm kullanıcıları listele (sadece admin görebilsin)
 class UserListView(generics.ListAPIView):
@@ -33,25 +41,72 @@ def current_user(request):
 
 from rest_framework import filters
 
-class CustomerListCreateView(generics.ListCreateAPIView):
+class CustomerListCreateView(ReferenceCacheMixin, ConditionalGetMixin, generics.ListCreateAPIView):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = []
     filter_backends = [filters.SearchFilter]
     search_fields = ['company_name']  # modelindeki uygun alanlara göre değiştir
 
+class CustomerAutocompleteView(ReferenceCacheMixin, generics.ListAPIView):
+    """Müşteri kutusu için en iyi ``limit`` öneri (``?q=terim&limit=10``).
+
+    Ad, uzun ad, kod ve vergi no ``Customer.search_document`` içinde
+    katlanmış olarak aranır. Adı terimle başlayanlar önce, sonra bir kelimesi
+    terimle başlayanlar, en son terimi içerenler gelir. 3 karakterden kısa
+    terimler trigram indeksini kullanamadığından sadece ad önekiyle aranır.
+    Sayfalama (COUNT) yapılmaz.
+    """
+    serializer_class = CustomerAutocompleteSerializer
+    permission_classes = []
+    filter_backends = []
+    pagination_class = None
+    default_limit = 10
+    max_limit = 50
+    min_trigram_length = 3
+
+    def get_limit(self):
+        return parse_limit(self.request.query_params.get('limit'), self.default_limit, self.max_limit)
+
+    def get_queryset(self):
+        term = ' '.join(fold_text(self.request.query_params.get('q', '')).split())
+        queryset = Customer.objects.only('id', 'company_code', 'company_name')
+        if not term:
+            return queryset.none()
+
+        if len(term) < self.min_trigram_length:
+            queryset = queryset.filter(search_document__startswith=term)
+        else:
+            for word in term.split():
+                queryset = queryset.filter(search_document__contains=word)
+
+        rank = Case(
+            When(search_document__startswith=term, then=0),
+            When(search_document__contains=f' {term}', then=1),
+            default=2,
+            output_field=IntegerField(),
+        )
+        return queryset.annotate(match_rank=rank).order_by('match_rank', 'company_name', 'id')[:self.get_limit()]
+
 class CustomerDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = []
 
-class BrandListView(generics.ListAPIView):
+class BrandListView(ReferenceCacheMixin, ConditionalGetMixin, generics.ListAPIView):
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
+# 🔹 Marka önerileri (?q=terim&limit=10); süreç içi önek indeksinden, veritabanına gitmeden
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def brand_suggest(request):
+    params = request.query_params
+    return Response(suggest(Brand, params.get('q', ''), parse_limit(params.get('limit'))))
+
 class BrandCreateView(generics.CreateAPIView):
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
@@ -63,4 +118,21 @@ class BrandDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = []
 
 
+class ImportJobListCreateView(generics.ListCreateAPIView):
+    """Excel dosyası yükleyip arka planda içe aktarma başlatır."""
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def perform_create(self, serializer):
+        job = serializer.save(created_user=self.request.user)
+        # Görev, iş kaydı veritabanına yazıldıktan sonra kuyruğa alınır
+        transaction.on_commit(lambda: run_import_job.delay(job.id))
+
 
+class ImportJobDetailView(generics.RetrieveAPIView):
+    """İçe aktarma işinin durumu ve ilerlemesi"""
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = [permissions.IsAdminUser]
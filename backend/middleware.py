@@ -0,0 +1,143 @@
+"""İstek başına SQL ölçümü.
+
+Örneklenen isteklerde tüm veritabanı bağlantılarına ``execute_wrapper``
+takılır; sorgu sayısı ve toplam veritabanı süresi ``Server-Timing``
+başlığında döner ve istek başına tek satır JSON log yazılır. Aynı SQL
+metni (parametreler hariç) eşik kadar tekrarlanırsa N+1 şüphesi olarak
+işaretlenir ve log WARNING seviyesine çıkar.
+
+Ayarlar:
+
+- ``SQL_INSTRUMENTATION_SAMPLE_RATE``: ölçülecek istek oranı (0-1, varsayılan 0 = kapalı)
+- ``SQL_N_PLUS_ONE_THRESHOLD``: N+1 şüphesi için tekrar sayısı
+- ``SQL_SERVER_TIMING_HEADER``: ``Server-Timing`` başlığı yanıta eklensin mi
+  (varsayılan kapalı; sorgu sayısı ve süreleri istemciye açılmaz)
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('backend.sql')
+
+DEFAULT_SAMPLE_RATE = 0
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+# Logda SQL metninin en fazla uzunluğu
+LOGGED_SQL_LENGTH = 300
+
+
+class QueryStats:
+    """``execute_wrapper`` olarak sorgu sayısını, süresini ve tekrarları toplar."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def repeated(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+class SQLInstrumentationMiddleware:
+    """Sorgu sayısı/süresini loga ve (açıksa) ``Server-Timing`` başlığına yazar.
+
+    ``execute_wrapper`` bağlantıya, bağlantı da iş parçacığına bağlıdır.
+    ASGI altında isteğin senkron kodu (view'lar, ORM) aynı
+    ``thread_sensitive`` iş parçacığında çalışır; sarmalayıcılar bu yüzden
+    ``sync_to_async`` ile o iş parçacığında takılıp çıkarılır. Akış
+    yanıtlarında (CSV dışa aktarma, SSE) gövde üretilirken yapılan
+    sorgular ölçüme girmez.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample_rate = self.sample_rate()
+        if not sample_rate:
+            return self.get_response(request)
+
+        stats = QueryStats()
+        start = time.perf_counter()
+        with self.instrument(stats):
+            response = self.get_response(request)
+        self.report(request, response, stats, start, sample_rate)
+        return response
+
+    async def __acall__(self, request):
+        sample_rate = self.sample_rate()
+        if not sample_rate:
+            return await self.get_response(request)
+
+        stats = QueryStats()
+        start = time.perf_counter()
+        stack = await sync_to_async(self.instrument)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.report(request, response, stats, start, sample_rate)
+        return response
+
+    def sample_rate(self):
+        """Bu istek ölçülecekse örnekleme oranı, değilse 0."""
+        sample_rate = getattr(settings, 'SQL_INSTRUMENTATION_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return 0
+        return sample_rate
+
+    def instrument(self, stats):
+        """Çağıran iş parçacığındaki tüm bağlantılara ``stats``'ı takar."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        return stack
+
+    def report(self, request, response, stats, start, sample_rate):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = stats.duration * 1000
+        if getattr(settings, 'SQL_SERVER_TIMING_HEADER', False):
+            timing = f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+            if response.has_header('Server-Timing'):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response['Server-Timing'] = timing
+
+        threshold = getattr(settings, 'SQL_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)
+        suspects = stats.repeated(threshold)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'sample_rate': sample_rate,
+        }
+        if response.streaming:
+            record['streaming'] = True
+        if suspects:
+            record['n_plus_one'] = [
+                {'sql': sql[:LOGGED_SQL_LENGTH], 'count': count} for sql, count in suspects
+            ]
+        logger.log(logging.WARNING if suspects else logging.INFO, json.dumps(record, ensure_ascii=False))
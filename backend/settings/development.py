@@ -36,4 +36,8 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Her istekte SQL ölçümü; sorgu sayısı/süresi Server-Timing başlığında da döner (bkz. backend/middleware.py)
+SQL_INSTRUMENTATION_SAMPLE_RATE = 1.0
+SQL_SERVER_TIMING_HEADER = True
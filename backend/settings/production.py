@@ -39,6 +39,14 @@ REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
 
+# Bildirim ve durum olayları (SSE akışı) Redis pub/sub üzerinden dağıtılır
+NOTIFICATION_EVENTS_REDIS_URL = REDIS_URL
+
+# İsteklerin bu kadarında SQL ölçümü yapılır (bkz. backend/middleware.py)
+SQL_INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('SQL_INSTRUMENTATION_SAMPLE_RATE', '0'))
+# Sonuçlar sadece loga yazılır; başlık açıkça istenirse eklenir
+SQL_SERVER_TIMING_HEADER = os.getenv('SQL_SERVER_TIMING_HEADER', 'False').lower() == 'true'
+
 # Cache configuration
 CACHES = {
     'default': {
@@ -71,4 +71,53 @@ API.interceptors.response.use(
   }
 );
 
+// Bildirim akışı (server-sent events). EventSource başlık gönderemediği için
+// önce JWT ile tek kullanımlık bilet alınır, akış bu biletle açılır.
+// Bağlantı koparsa (veya sunucu WSGI altında anlık veriyi gönderip kapatırsa)
+// tarayıcının otomatik yeniden bağlanması kullanılmaz; bu süre sonra yeni biletle tekrar bağlanılır
+const STREAM_RECONNECT_DELAY = 15000;
+
+export const openNotificationStream = (
+  handlers: Record<string, (data: any) => void>
+): { close: () => void } | null => {
+  if (!localStorage.getItem('access_token')) return null;
+  let source: EventSource | null = null;
+  let timer: ReturnType<typeof setTimeout> | null = null;
+  let closed = false;
+
+  const reconnect = () => {
+    if (!closed) timer = setTimeout(connect, STREAM_RECONNECT_DELAY);
+  };
+
+  const connect = async () => {
+    try {
+      // Erişim token'ı URL'ye (ve sunucu loglarına) yazılmasın diye tek kullanımlık bilet
+      const response = await API.post('auth/notifications/stream/ticket/');
+      if (closed) return;
+      source = new EventSource(
+        `${API.defaults.baseURL}auth/notifications/stream/?ticket=${encodeURIComponent(response.data.ticket)}`
+      );
+      Object.entries(handlers).forEach(([event, handler]) => {
+        source!.addEventListener(event, (e) => handler(JSON.parse((e as MessageEvent).data)));
+      });
+      // Bilet tek kullanımlık; tarayıcının aynı URL ile yeniden bağlanması yerine yeni bilet alınır
+      source.onerror = () => {
+        source?.close();
+        reconnect();
+      };
+    } catch {
+      reconnect();
+    }
+  };
+
+  connect();
+  return {
+    close: () => {
+      closed = true;
+      if (timer) clearTimeout(timer);
+      source?.close();
+    },
+  };
+};
+
 export default API;
@@ -1,4 +1,4 @@
-import React, { useContext } from "react";
+import React, { useContext, useEffect, useState } from "react";
 import {
   Drawer,
   Toolbar,
@@ -10,6 +10,7 @@ import {
   ListItemText,
   Divider,
   Typography,
+  Badge,
 } from "@mui/material";
 import { useNavigate } from "react-router-dom";
 import DashboardIcon from "@mui/icons-material/Dashboard";
@@ -19,6 +20,7 @@ import LogoutIcon from "@mui/icons-material/Logout";
 import RequestQuoteIcon from "@mui/icons-material/RequestQuote";
 import { AuthContext } from "../context/AuthContext";
 import { Notifications } from "@mui/icons-material";
+import { openNotificationStream } from "../api";
 
 interface SidebarProps {
   mobileOpen: boolean;
@@ -34,12 +36,29 @@ const NewSidebar: React.FC<SidebarProps> = ({
   onLogout,
 }) => {
   const navigate = useNavigate();
+  const [unreadCount, setUnreadCount] = useState(0);
+
+  useEffect(() => {
+    // Okunmamış sayısı bağlantı açılınca ve her değişiklikte sunucudan gelir
+    const source = openNotificationStream({
+      unread: (data) => setUnreadCount(data.unread_count),
+    });
+    return () => source?.close();
+  }, []);
 
   const menuItems = [
     { text: "Dashboard", icon: <DashboardIcon />, path: "/dashboard" },
     { text: "Servis Kayıtları", icon: <BuildIcon />, path: "/services" },
     { text: "Kullanıcılar", icon: <PeopleIcon />, path: "/users" },
-    { text: "Bildirimler", icon: <Notifications />, path: "/notifications" },
+    {
+      text: "Bildirimler",
+      icon: (
+        <Badge badgeContent={unreadCount} color="error">
+          <Notifications />
+        </Badge>
+      ),
+      path: "/notifications",
+    },
     { text: "Teklifler", icon: <RequestQuoteIcon />, path: "/quote" },
 
     // { text: "Ayarlar", icon: <SettingsIcon />, path: "/settings" },
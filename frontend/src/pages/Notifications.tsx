@@ -24,61 +24,14 @@ import {
   Build as BuildIcon,
   AccessTime as AccessTimeIcon,
 } from '@mui/icons-material';
-import API from '../api';
-
-interface User {
-  id: number;
-  username: string;
-  email: string;
-  first_name?: string;
-  last_name?: string;
-}
-interface Customer {
-  id: number;
-  company_code: string;
-  company_name: string;
-  address: string;
-  email: string;
-  tax_number: string;
-  tax_office: string;
-  is_active: boolean;
-  created_at: string;
-  updated_at: string;
-}
-
-interface Brand {
-  id: number;
-  name: string;
-  description: string;
-  is_active: boolean;
-  created_at: string;
-  updated_at: string;
-}
-
-interface ServisKayit {
-  id: number;
-  customer: Customer;
-  brand: Brand;
-  model: string;
-  serial_number: string;
-  accessories: string;
-  arrival_date: string;
-  issue: string;
-  service_name: string;
-  service_send_date: string | null;
-  service_operation: string | null;
-  service_return_date: string | null;
-  delivery_date: string | null;
-  created_user: number | null;
-  status: string;
-  updated_at: string;
-  logs: any[];
-}
+import API, { openNotificationStream } from '../api';
 
 interface Notification {
   id: number;
-  user: User;
-  service_record: ServisKayit;
+  service_record: number;
+  customer_name: string | null;
+  brand_name: string | null;
+  model: string;
   message: string;
   created_at: string;
   is_read: boolean;
@@ -92,6 +45,15 @@ const Notifications = () => {
 
   useEffect(() => {
     fetchNotifications();
+    // Yeni bildirimler sunucudan itilir; liste tekrar sorgulanmaz
+    const source = openNotificationStream({
+      notifications: (items: Notification[]) =>
+        setNotifications(prev => {
+          const ids = new Set(items.map(n => n.id));
+          return [...items, ...prev.filter(n => !ids.has(n.id))];
+        }),
+    });
+    return () => source?.close();
   }, []);
 
   const fetchNotifications = async () => {
@@ -208,10 +170,10 @@ const Notifications = () => {
                   <Box flex={1}>
                     <Box display="flex" alignItems="center" gap={1} mb={2}>
                       <Avatar sx={{ width: 32, height: 32, bgcolor: 'primary.main' }}>
-                        {notification.user.username.charAt(0).toUpperCase()}
+                        {(notification.customer_name || '?').charAt(0).toUpperCase()}
                       </Avatar>
                       <Typography variant="subtitle2" color="textSecondary">
-                        {notification.user.username}
+                        {notification.customer_name}
                       </Typography>
                       {!notification.is_read && (
                         <Chip 
@@ -234,20 +196,15 @@ const Notifications = () => {
                           <Box display="flex" alignItems="center" gap={1}>
                             <BusinessIcon fontSize="small" color="action" />
                             <Typography variant="body2" color="textSecondary">
-                              <strong>Müşteri:</strong> {notification.service_record.customer.company_name}
+                              <strong>Müşteri:</strong> {notification.customer_name}
                             </Typography>
                           </Box>
                           <Box display="flex" alignItems="center" gap={1}>
                             <BuildIcon fontSize="small" color="action" />
                             <Typography variant="body2" color="textSecondary">
-                              <strong>Marka/Model:</strong> {notification.service_record.brand.name} - {notification.service_record.model}
+                              <strong>Marka/Model:</strong> {notification.brand_name} - {notification.model}
                             </Typography>
                           </Box>
-                          {notification.service_record.issue && (
-                            <Typography variant="body2" color="textSecondary">
-                              <strong>Arıza:</strong> {notification.service_record.issue}
-                            </Typography>
-                          )}
                         </Stack>
                       </Box>
                     )}
@@ -185,8 +185,12 @@ const ServiceDetailPage: React.FC = () => {
   const fetchService = async () => {
     setLoading(true);
     try {
-      const response = await API.get(`Services/${id}/`);
-      const data: ServiceDetail = response.data.data || response.data;
+      const [response, timeline] = await Promise.all([
+        API.get(`Services/${id}/`),
+        // Geçmiş kayıt detayına gömülmez; son değişiklikler ayrı uçtan gelir
+        API.get(`Services/${id}/timeline/`, { params: { last: 50 } }),
+      ]);
+      const data: ServiceDetail = { ...(response.data.data || response.data), logs: timeline.data };
       console.log("Gelen servis verisi:", response);
       setService(data);
 
@@ -214,8 +218,8 @@ const ServiceDetailPage: React.FC = () => {
 
   const searchCustomers = async (searchTerm: string) => {
     try {
-      const response = await API.get(`customers/?search=${searchTerm}`);
-      setCustomers(response.data.results);
+      const response = await API.get("customers/autocomplete/", { params: { q: searchTerm } });
+      setCustomers(response.data);
     } catch (err) {
       console.error(err);
     }
@@ -223,8 +227,8 @@ const ServiceDetailPage: React.FC = () => {
 
   const searchBrands = async (searchTerm: string) => {
     try {
-      const response = await API.get(`brands/?search=${searchTerm}`);
-      setBrands(response.data.results);
+      const response = await API.get("brands/suggest/", { params: { q: searchTerm } });
+      setBrands(response.data);
     } catch (err) {
       console.error(err);
     }
@@ -232,8 +236,8 @@ const ServiceDetailPage: React.FC = () => {
 
   const searchServiceCompanies = async (searchTerm: string) => {
     try {
-      const response = await API.get(`ServiceCompanies/?search=${searchTerm}`);
-      setServiceCompanies(response.data.results);
+      const response = await API.get("ServiceCompanies/suggest/", { params: { q: searchTerm } });
+      setServiceCompanies(response.data);
     } catch (err) {
       console.error(err);
     }
@@ -531,6 +535,8 @@ const ServiceDetailPage: React.FC = () => {
                             </span>
                           );
                         }
+                        // İlişkili kayıtlar {id, str} olarak gelir
+                        if (value.str !== undefined) return value.str;
                         return JSON.stringify(value);
                       }
                       
@@ -15,20 +15,11 @@ interface Customer {
   id: number;
   company_code: string;
   company_name: string;
-  address: string;
-  email: string;
-  tax_number: string;
-  tax_office: string;
-  is_active: boolean;
 }
 
 interface Brand {
   id: number;
   name: string;
-  description: string;
-  is_active: boolean;
-  created_at: string;
-  updated_at: string;
 }
 
 interface ServiceCompany {
@@ -93,8 +84,8 @@ const ServiceNew: React.FC = () => {
   const searchCustomers = async (searchTerm: string) => {
     setLoading(true);
     try {
-      const response = await API.get(`customers/?search=${searchTerm}`);
-      setCustomers(response.data.results);
+      const response = await API.get("customers/autocomplete/", { params: { q: searchTerm } });
+      setCustomers(response.data);
     } catch (error) {
       console.error("Error fetching customers:", error);
     } finally {
@@ -105,8 +96,8 @@ const ServiceNew: React.FC = () => {
   const searchBrands = async (searchTerm: string) => {
     setLoading(true);
     try {
-      const response = await API.get(`brands/?search=${searchTerm}`);
-      setBrands(response.data.results);
+      const response = await API.get("brands/suggest/", { params: { q: searchTerm } });
+      setBrands(response.data);
     } catch (error) {
       console.error("Error fetching brands:", error);
     } finally {
@@ -117,8 +108,8 @@ const ServiceNew: React.FC = () => {
   const searchServiceCompanies = async (searchTerm: string) => {
     setLoading(true);
     try {
-      const response = await API.get(`ServiceCompanies/?search=${searchTerm}`);
-      setServiceCompanies(response.data.results);
+      const response = await API.get("ServiceCompanies/suggest/", { params: { q: searchTerm } });
+      setServiceCompanies(response.data);
     } catch (error) {
       console.error("Error fetching service companies:", error);
     } finally {
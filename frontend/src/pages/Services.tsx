@@ -81,13 +81,17 @@ const Services = () => {
   const navigate = useNavigate();
 
   useEffect(() => {
-    fetchRecords();
-  }, []);
+    // Arama sunucu tarafında yapılır; her tuşta istek atmamak için bekle
+    const timer = setTimeout(() => fetchRecords(search), 300);
+    return () => clearTimeout(timer);
+  }, [search]);
 
-  const fetchRecords = async () => {
+  const fetchRecords = async (searchTerm: string) => {
     try {
       setError(null);
-      const response = await API.get("Services/");
+      const response = await API.get("Services/", {
+        params: searchTerm ? { search: searchTerm } : {},
+      });
       console.log(response.data.results);
       setRecords(response.data.results || []);
     } catch (err: any) {
@@ -108,15 +112,24 @@ const Services = () => {
     navigate("/services/new"); // Yeni kayıt sayfasına yönlendirme
   };
 
-  const filteredRecords = records.filter((record) => {
-    const searchLower = search.toLowerCase();
-    return (
-      record.customer.company_name.toLowerCase().includes(searchLower) ||
-      `${record.brand.name} ${record.model}`.toLowerCase().includes(searchLower) ||
-      (record.serial_number?.toLowerCase() || "").includes(searchLower) ||
-      (record.service?.name?.toLowerCase() || "").includes(searchLower)
-    );
-  });
+  const handleExport = async () => {
+    try {
+      // Sunucu aynı arama ile tüm kayıtları Excel dosyası olarak döner
+      const response = await API.get("Services/export/", {
+        params: { ...(search ? { search } : {}), export_format: "xlsx" },
+        responseType: "blob",
+      });
+      const url = URL.createObjectURL(response.data);
+      const link = document.createElement("a");
+      link.href = url;
+      link.download = "servis_kayitlari.xlsx";
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (err) {
+      console.error("Dışa aktarma hatası:", err);
+      setError("Kayıtlar dışa aktarılırken hata oluştu");
+    }
+  };
 
   if (loading) {
     return (
@@ -141,7 +154,7 @@ const Services = () => {
         </Typography>
         <Button 
           variant="contained" 
-          onClick={fetchRecords}
+          onClick={() => fetchRecords(search)}
           sx={{ mr: 2 }}
         >
           Tekrar Dene
@@ -196,14 +209,23 @@ const Services = () => {
             },
           }}
         />
-        <Button
-          variant="contained"
-          color="primary"
-          onClick={handleNewRecord}
-          sx={{ height: 36 }}
-        >
-          Yeni Kayıt Ekle
-        </Button>
+        <Box sx={{ display: "flex", gap: 1 }}>
+          <Button
+            variant="outlined"
+            onClick={handleExport}
+            sx={{ height: 36 }}
+          >
+            Excel'e Aktar
+          </Button>
+          <Button
+            variant="contained"
+            color="primary"
+            onClick={handleNewRecord}
+            sx={{ height: 36 }}
+          >
+            Yeni Kayıt Ekle
+          </Button>
+        </Box>
       </Box>
 
       <TableContainer component={Paper} sx={{ maxHeight: "75vh" }}>
@@ -222,7 +244,7 @@ const Services = () => {
             </TableRow>
           </TableHead>
           <TableBody>
-            {filteredRecords.length === 0 ? (
+            {records.length === 0 ? (
               <TableRow>
                 <TableCell colSpan={9} sx={{ textAlign: 'center', py: 4 }}>
                   <Typography variant="body1" color="textSecondary">
@@ -240,7 +262,7 @@ const Services = () => {
                 </TableCell>
               </TableRow>
             ) : (
-              filteredRecords.map((record) => {
+              records.map((record) => {
               let durumColor = "warning.main";
               let durumText = "";
               
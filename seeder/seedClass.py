@@ -1,12 +1,18 @@
 ﻿
 import os
 import pandas as pd
-from api.models import Customer, Brand
-from django.db import transaction
-import pdb
+from api.cache import bump_reference_version
+from api.models import Customer, Brand, ImportFingerprint
+from django.db import DatabaseError, transaction
+
+# Excel satırları bu büyüklükte parçalar halinde okunup yazılır
+CHUNK_SIZE = 2000
+
+
 class seederClass:
-    def __init__(self, excel_file_path):
+    def __init__(self, excel_file_path, chunk_size=CHUNK_SIZE):
         self.excel_file_path = excel_file_path
+        self.chunk_size = chunk_size
     
     def read_excel_file(self, file_path=None, sheet_name=None):
         if file_path is None:
@@ -17,168 +23,328 @@ class seederClass:
             print(f"Excel dosyası okunurken hata oluştu: {e}")
             return None
 
-    @transaction.atomic
-    def seed_customers(self, sheet_name="cariler"):
-        """Müşteri verilerini içe aktar"""
-        df = self.read_excel_file(self.excel_file_path, sheet_name)
-        if df is None:
-            return False
+    def iter_excel_chunks(self, file_path=None, sheet_name=None):
+        """Sayfayı ``chunk_size`` satırlık DataFrame parçaları halinde okur.
+
+        .xls dosyaları xlrd ile, diğerleri openpyxl read-only modunda satır
+        satır okunur; tüm sayfa belleğe alınmaz. İlk satır başlık kabul edilir.
+        """
+        if file_path is None:
+            file_path = self.excel_file_path
+
+        if os.path.splitext(str(file_path))[1].lower() == '.xls':
+            import xlrd
+
+            book = xlrd.open_workbook(file_path, on_demand=True)
+            sheet = book.sheet_by_name(sheet_name) if sheet_name else book.sheet_by_index(0)
+            rows = (
+                [self.xls_cell_value(cell, book.datemode) for cell in sheet.row(index)]
+                for index in range(sheet.nrows)
+            )
+            close = book.release_resources
+        else:
+            from openpyxl import load_workbook
+
+            book = load_workbook(file_path, read_only=True, data_only=True)
+            sheet = book[sheet_name] if sheet_name else book.worksheets[0]
+            rows = sheet.iter_rows(values_only=True)
+            close = book.close
+
+        try:
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(column).strip() if column is not None else '' for column in header]
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    yield pd.DataFrame(chunk, columns=columns)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=columns)
+        finally:
+            close()
+
+    @staticmethod
+    def xls_cell_value(cell, datemode):
+        """xlrd hücresini pd.read_excel'in vereceği değere çevirir.
+
+        xlrd her sayıyı float döner; tam sayılar int'e çevrilir ki vergi no
+        ve telefon '1234567890.0' olarak yazılmasın. Tarihler datetime,
+        boş hücreler None olur.
+        """
+        import xlrd
+
+        if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+            return None
+        if cell.ctype == xlrd.XL_CELL_NUMBER and cell.value.is_integer():
+            return int(cell.value)
+        if cell.ctype == xlrd.XL_CELL_DATE:
+            return xlrd.xldate_as_datetime(cell.value, datemode)
+        if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+            return bool(cell.value)
+        return cell.value
+
+    @staticmethod
+    def cell_text(value):
+        """Hücre değerini metne çevirir; tam sayı float'lar ``.0`` almaz (boş/NaN -> '')."""
+        if value is None or pd.isna(value):
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value).strip()
+
+    @classmethod
+    def text_column(cls, df, *names):
+        """İlk bulunan kolonu temizlenmiş metin olarak döner (boş/NaN -> '').
+
+        Boş hücre yüzünden float olmuş kolonlardaki tam sayılar da korunur.
+        """
+        for name in names:
+            if name in df.columns:
+                return df[name].map(cls.cell_text).astype('string')
+        return pd.Series('', index=df.index, dtype='string')
+
+    def upsert_chunk(self, model, df, unique_field, kind=None, dry_run=False):
+        """Normalize edilmiş parçayı tek ``INSERT ... ON CONFLICT`` ile yazar.
+
+        Alan uzunluğunu aşan satırlar hatalı sayılıp atlanır; parça içinde
+        tekrar eden anahtarlarda son satır geçerlidir. ``kind`` verilirse
+        içerik özeti saklanan özetle aynı olan satırlar yazılmaz. ``dry_run``
+        ise hiçbir şey yazılmaz, sadece fark raporlanır.
+
+        Dönen sözlük: ``written``, ``errors``, ``unchanged`` sayıları ile
+        ``new`` ve ``changed`` anahtar listeleri.
+        """
+        invalid = self.invalid_rows(model, df)
+        result = {'written': 0, 'errors': int(invalid.sum()), 'unchanged': 0, 'new': [], 'changed': []}
+
+        df = df[~invalid].drop_duplicates(subset=unique_field, keep='last')
+        digests = None
+        if kind is not None and not df.empty:
+            df, digests, result['new'], result['changed'], result['unchanged'] = (
+                self.diff_chunk(kind, df, unique_field)
+            )
+        elif dry_run:
+            result['changed'] = df[unique_field].tolist()
+        if df.empty or dry_run:
+            return result
+
+        df = df.astype(object).where(df.notna(), None)
+        update_fields = [name for name in df.columns if name != unique_field] + ['updated_at']
+        model.objects.bulk_create(
+            [model(**values) for values in df.to_dict('records')],
+            update_conflicts=True,
+            unique_fields=[unique_field],
+            update_fields=update_fields,
+        )
+        # Toplu yazma sinyal tetiklemez; referans önbelleği burada geçersiz kılınır
+        bump_reference_version(model._meta.label_lower)
+        if digests is not None:
+            ImportFingerprint.objects.bulk_create(
+                [ImportFingerprint(kind=kind, key=key, digest=digest) for key, digest in digests.items()],
+                update_conflicts=True,
+                unique_fields=['kind', 'key'],
+                update_fields=['digest', 'updated_at'],
+            )
+        self.refresh_related_search_documents(model, unique_field, df[unique_field].tolist())
+        result['written'] = len(df)
+        return result
+
+    @staticmethod
+    def row_digests(df, unique_field):
+        """Satır başına içerik özeti: ``{anahtar: özet}``
+
+        Değerler metne çevrilip (boş/None -> '') pandas ile vektörel olarak
+        hash'lenir; aynı içerik her zaman aynı özeti verir.
+        """
+        normalized = df.astype('string').fillna('')
+        hashes = pd.util.hash_pandas_object(normalized, index=False)
+        return dict(zip(df[unique_field], (format(value, '016x') for value in hashes)))
 
-        success_count = 0
-        error_count = 0
+    def diff_chunk(self, kind, df, unique_field):
+        """Parçayı saklanan özetlerle tek sorguda karşılaştırır.
 
-        for _, row in df.iterrows():
+        ``(yazılacak satırlar, yazılacak özetler, yeni anahtarlar,
+        değişen anahtarlar, değişmeyen satır sayısı)`` döner.
+        """
+        digests = self.row_digests(df, unique_field)
+        stored = dict(
+            ImportFingerprint.objects.filter(kind=kind, key__in=list(digests)).values_list('key', 'digest')
+        )
+        new = [key for key in digests if key not in stored]
+        changed = [key for key in digests if key in stored and stored[key] != digests[key]]
+        pending = set(new) | set(changed)
+        df = df[df[unique_field].isin(pending)]
+        return df, {key: digests[key] for key in pending}, new, changed, len(digests) - len(pending)
+
+    @staticmethod
+    def invalid_rows(model, df):
+        """Model alanının ``max_length`` değerini aşan satırlar (boolean Series)."""
+        invalid = pd.Series(False, index=df.index)
+        for field in model._meta.concrete_fields:
+            if field.name in df.columns and getattr(field, 'max_length', None):
+                invalid |= df[field.name].fillna('').astype('string').str.len() > field.max_length
+        return invalid
+
+    @staticmethod
+    def refresh_related_search_documents(model, unique_field, keys):
+        """Toplu yazma sinyal tetiklemez; var olan servis kayıtlarının arama metnini yenile."""
+        from service.models import Service, ServiceRecord, refresh_search_documents
+
+        lookup = {Customer: 'customer', Brand: 'brand', Service: 'service'}[model]
+        refresh_search_documents(
+            ServiceRecord.objects.filter(**{f'{lookup}__{unique_field}__in': keys})
+        )
+
+    def seed_chunks(self, model, sheet_name, unique_field, normalize, kind=None, dry_run=False):
+        """Sayfayı parça parça yazar; her parça kendi transaction'ında commit edilir.
+
+        Büyük dosyada kilitler ve geri alma kaydı parça boyunda kalır; yarıda
+        kesilen içe aktarma tekrar çalıştırılınca yazılmış parçalar özetlerle atlanır.
+        """
+        totals = {'written': 0, 'errors': 0, 'unchanged': 0, 'new': [], 'changed': []}
+        for chunk in self.iter_excel_chunks(self.excel_file_path, sheet_name):
+            df = normalize(chunk)
+            if df is None:
+                return None
+            skipped = df[unique_field] == ''
+            if skipped.any():
+                print(f"Atlanıyor: {int(skipped.sum())} satırda {unique_field} boş")
             try:
-                
-
-                # Excel sütun isimlerini modele uygun şekilde eşleştir
-                customer_data = {
-                    'company_code': str(row.get('Firma Adı', '')).strip(),
-                    'company_name': str(row.get('Firma Adı', '')).strip(),
-                    'company_long_name': str(row.get('Ünvan', '')).strip(),
-                    'address': str(row.get('Adres', '')).strip(),
-                    'phone': str(row.get('Telefon', '')).strip(),
-                    'email': str(row.get('E-Mail', '')).strip(),
-                    'tax_number': str(row.get('Vergi No', '')).strip(),
-                    'tax_office': str(row.get('Vergi Dairesi', '')).strip(),
-                    'is_active': True
-                }
-
-                # Boş company_code veya company_name kontrolü
-                if not customer_data['company_code'] or not customer_data['company_name']:
-                    print(f"Atlanıyor: Firma Kodu veya Firma Adı boş olan kayıt")
-                    continue
-
-                # Var olan müşteriyi güncelle veya yeni müşteri oluştur
-                customer, created = Customer.objects.update_or_create(
-                    company_code=customer_data['company_code'],
-                    defaults=customer_data
-                )
-                success_count += 1
-                if created:
-                    print(f"Yeni müşteri eklendi: {customer_data['company_name']}")
-                else:
-                    print(f"Müşteri güncellendi: {customer_data['company_name']}")
-
-            except Exception as e:
-                print(f"Müşteri verisi eklenirken hata: {str(e)}")
-                error_count += 1
-
-        print(f"Müşteri verisi içe aktarma tamamlandı. Başarılı: {success_count}, Hata: {error_count}")
-        return True
+                # Hatalı parça sadece kendi satırlarını geri alır
+                with transaction.atomic():
+                    result = self.upsert_chunk(model, df[~skipped], unique_field, kind, dry_run)
+            except DatabaseError as e:
+                print(f"🚨 {len(df)} satırlık parça yazılırken hata: {e}")
+                result = {'errors': int((~skipped).sum())}
+            for name, value in result.items():
+                totals[name] += value
+        return totals
 
-    @transaction.atomic
-    def seed_brands(self, sheet_name="Sayfa1"):
-        """Excel'den markaları Brand modeline aktarır"""
-        df = self.read_excel_file(self.excel_file_path, sheet_name)
-        if df is None:
-            return False
+    # İçe aktarma türü -> (model, benzersiz alan, normalize metodu, varsayılan sayfa)
+    KINDS = {
+        'customers': ('api.Customer', 'company_code', 'normalize_customers', 'cariler'),
+        'brands': ('api.Brand', 'name', 'normalize_brands', 'Sayfa1'),
+        'services': ('service.Service', 'name', 'normalize_services', 'Sayfa1'),
+    }
+
+    def kind_config(self, kind):
+        """``(model, benzersiz alan, normalize fonksiyonu, varsayılan sayfa)``"""
+        from django.apps import apps
+
+        model_label, unique_field, normalize, sheet_name = self.KINDS[kind]
+        return apps.get_model(model_label), unique_field, getattr(self, normalize), sheet_name
+
+    def normalize_customers(self, df):
+        # Excel sütun isimlerini modele uygun şekilde eşleştir
+        company_name = self.text_column(df, 'Firma Adı')
+        customers = pd.DataFrame({
+            'company_code': company_name,
+            'company_name': company_name,
+            'company_long_name': self.text_column(df, 'Ünvan'),
+            'address': self.text_column(df, 'Adres'),
+            'phone': self.text_column(df, 'Telefon'),
+            'email': self.text_column(df, 'E-Mail'),
+            'tax_number': self.text_column(df, 'Vergi No'),
+            'tax_office': self.text_column(df, 'Vergi Dairesi'),
+            'is_active': True,
+        })
+        # Toplu yazma save() çağırmaz; arama metni burada üretilir
+        customers['search_document'] = [
+            Customer.search_document_for(*parts)
+            for parts in zip(*(customers[name] for name in Customer.SEARCH_SOURCE_FIELDS))
+        ]
+        return customers
 
+    def normalize_brands(self, df):
         # Kolon ismini küçük harfe çevirerek kontrol et
-        columns = [col.lower() for col in df.columns]
+        columns = {str(col).lower(): col for col in df.columns}
         if "markalar" not in columns:
             print("❌ Excel dosyasında 'markalar' adında bir kolon bulunamadı.")
             print(f"Bulunan kolonlar: {df.columns.tolist()}")
-            return False
+            return None
+        return pd.DataFrame({
+            'name': self.text_column(df, columns['markalar']),
+            'description': '',
+            'is_active': True,
+        })
 
-        success_count = 0
-        error_count = 0
+    def normalize_services(self, df):
+        name = self.text_column(df, 'Servis Adı', 'servis_adi', 'name')
+        if not {'Servis Adı', 'servis_adi', 'name'} & set(df.columns) and len(df.columns):
+            # İlk sütunu servis adı olarak kabul et
+            name = self.text_column(df, df.columns[0])
+        email = self.text_column(df, 'E-posta', 'email', 'e_posta')
+        return pd.DataFrame({
+            'name': name,
+            'description': self.text_column(df, 'Açıklama', 'aciklama', 'description'),
+            'address': self.text_column(df, 'Adres', 'adres', 'address'),
+            'phone': self.text_column(df, 'Telefon', 'telefon', 'phone'),
+            # Email validasyonu (boşsa None yap)
+            'email': email.mask(email == '', None),
+            'is_active': True,
+        })
 
-        for _, row in df.iterrows():
-            try:
-                # Kolon ismini küçük harfe göre çek
-                brand_name = str(row.get('markalar', '')).strip()
+    def seed_kind(self, kind, sheet_name, dry_run=False):
+        """Sayfayı artımlı olarak içe aktarır; sadece yeni ve değişen satırlar yazılır."""
+        model, unique_field, normalize, _ = self.kind_config(kind)
+        try:
+            totals = self.seed_chunks(model, sheet_name, unique_field, normalize, kind, dry_run)
+        except Exception as e:
+            print(f"Excel dosyası okunurken hata oluştu: {e}")
+            return None
+        if totals is not None and dry_run:
+            self.print_diff(totals)
+        return totals
 
-                if not brand_name:
-                    print("⚠️ Boş marka adı atlanıyor.")
-                    continue
+    @staticmethod
+    def print_diff(totals, limit=20):
+        """Dry-run raporu: yeni/değişen anahtarlar (ilk ``limit`` tanesi) ve sayılar"""
+        print(
+            f"[dry-run] Yeni: {len(totals['new'])}, Değişen: {len(totals['changed'])}, "
+            f"Değişmeyen: {totals['unchanged']}, Hatalı: {totals['errors']}"
+        )
+        for label, keys in (('+', totals['new']), ('~', totals['changed'])):
+            for key in keys[:limit]:
+                print(f"  {label} {key}")
+            if len(keys) > limit:
+                print(f"  {label} ... {len(keys) - limit} satır daha")
 
-                # Marka varsa güncelle, yoksa oluştur
-                brand, created = Brand.objects.update_or_create(
-                    name=brand_name,
-                    defaults={
-                        "description": "",
-                        "is_active": True
-                    }
-                )
+    def seed_customers(self, sheet_name="cariler", dry_run=False):
+        """Müşteri verilerini içe aktar"""
+        result = self.seed_kind('customers', sheet_name, dry_run)
+        if result is None:
+            return False
 
-                success_count += 1
+        print(
+            f"Müşteri verisi içe aktarma tamamlandı. Başarılı: {result['written']}, "
+            f"Değişmeyen: {result['unchanged']}, Hata: {result['errors']}"
+        )
+        return True
 
-            except Exception as e:
-                print(f"🚨 Marka eklenirken hata oluştu: {str(e)}")
-                error_count += 1
+    def seed_brands(self, sheet_name="Sayfa1", dry_run=False):
+        """Excel'den markaları Brand modeline aktarır"""
+        result = self.seed_kind('brands', sheet_name, dry_run)
+        if result is None:
+            return False
 
-        print(f"✅ Marka aktarımı tamamlandı — Başarılı: {success_count}, Hatalı: {error_count}")
+        print(
+            f"✅ Marka aktarımı tamamlandı — Başarılı: {result['written']}, "
+            f"Değişmeyen: {result['unchanged']}, Hatalı: {result['errors']}"
+        )
         return True
 
 
-    @transaction.atomic
-    def seed_services(self, sheet_name="Sayfa1"):
+    def seed_services(self, sheet_name="Sayfa1", dry_run=False):
         """Excel'den servisleri Service modeline aktarır"""
-        # Servis modelini import et
-        from service.models import Service
-        
-        df = self.read_excel_file(self.excel_file_path, sheet_name)
-        if df is None:
+        result = self.seed_kind('services', sheet_name, dry_run)
+        if result is None:
             return False
 
-        success_count = 0
-        error_count = 0
-
-        # Excel kolonlarını yazdır (debug için)
-        print(f"Excel kolonları: {df.columns.tolist()}")
-
-        for _, row in df.iterrows():
-            try:
-                # Excel sütunlarından servis bilgilerini al
-                # Sütun isimlerini Excel dosyanıza göre ayarlayın
-                service_name = str(row.get('Servis Adı', row.get('servis_adi', row.get('name', '')))).strip()
-                
-                # Alternatif sütun isimleri
-                if not service_name:
-                    # İlk sütunu servis adı olarak kabul et
-                    service_name = str(row.iloc[0]).strip() if len(row) > 0 else ''
-
-                if not service_name or service_name == 'nan':
-                    print("⚠️ Boş servis adı atlanıyor.")
-                    continue
-
-                # Diğer servis bilgileri (varsa)
-                service_data = {
-                    'name': service_name,
-                    'description': str(row.get('Açıklama', row.get('aciklama', row.get('description', '')))).strip(),
-                    'address': str(row.get('Adres', row.get('adres', row.get('address', '')))).strip(),
-                    'phone': str(row.get('Telefon', row.get('telefon', row.get('phone', '')))).strip(),
-                    'email': str(row.get('E-posta', row.get('email', row.get('e_posta', '')))).strip(),
-                    'is_active': True
-                }
-
-                # 'nan' değerlerini boş string'e çevir
-                for key, value in service_data.items():
-                    if value == 'nan' or value == 'None':
-                        service_data[key] = ''
-
-                # Email validasyonu (boşsa None yap)
-                if not service_data['email'] or service_data['email'] == '':
-                    service_data['email'] = None
-
-                # Servis varsa güncelle, yoksa oluştur
-                service, created = Service.objects.update_or_create(
-                    name=service_data['name'],
-                    defaults=service_data
-                )
-
-                success_count += 1
-                
-                if created:
-                    print(f"✅ Yeni servis eklendi: {service_data['name']}")
-                else:
-                    print(f"🔄 Servis güncellendi: {service_data['name']}")
-
-            except Exception as e:
-                print(f"🚨 Servis eklenirken hata oluştu: {str(e)}")
-                print(f"Row data: {row.to_dict()}")
-                error_count += 1
-
-        print(f"✅ Servis aktarımı tamamlandı — Başarılı: {success_count}, Hatalı: {error_count}")
-        return True
\ No newline at end of file
+        print(
+            f"✅ Servis aktarımı tamamlandı — Başarılı: {result['written']}, "
+            f"Değişmeyen: {result['unchanged']}, Hatalı: {result['errors']}"
+        )
+        return True
@@ -0,0 +1,184 @@
+"""Servis kayıtlarının toplu oluşturulması/güncellenmesi.
+
+Tüm öğeler önce doğrulanır; ForeignKey'ler model başına tek ``in_bulk``
+ile çözülür. Hata yoksa kayıtlar, loglar ve özet sayaçları tek
+transaction içinde toplu sorgularla yazılır; hata varsa hiçbir şey
+yazılmaz ve öğe bazında hatalar döner.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from accounts import events
+from api.models import Brand, Customer
+from . import logcodec
+from .diff import FieldDiff
+from .models import Service, ServiceLog, ServiceRecord
+from .rollups import apply_rollup_deltas, rollup_key
+from .serializers import ServiceRecordBatchItemSerializer
+
+# Tek istekte işlenebilecek en fazla öğe
+BATCH_MAX_SIZE = 500
+
+class RecordBatchError(Exception):
+    """Geçersiz öğeler: ``errors`` = ``[{'index': sıra, 'errors': {...}}]``"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+# ForeignKey alanı -> model
+BATCH_RELATED_MODELS = {
+    'customer_id': Customer,
+    'brand_id': Brand,
+    'service_id': Service,
+}
+
+
+def validate_items(items):
+    """Öğeleri doğrular; ``(doğrulanmış veriler, {sıra: hatalar})`` döner."""
+    validated = []
+    errors = {}
+    for index, item in enumerate(items):
+        is_update = isinstance(item, dict) and 'id' in item
+        serializer = ServiceRecordBatchItemSerializer(data=item, partial=is_update)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+        else:
+            validated.append(None)
+            errors[index] = serializer.errors
+    return validated, errors
+
+
+def resolve_related(validated, errors, records=()):
+    """ForeignKey id'lerini model başına tek sorguyla çözer; bulunamayanları hataya ekler.
+
+    ``records`` güncellenecek kayıtlardır; değişmeyen ilişkileri de aynı
+    sorguda yüklenir (arama metni yeniden üretilirken gerekir).
+    """
+    related = {}
+    for field, model in BATCH_RELATED_MODELS.items():
+        ids = {data[field] for data in validated if data and data.get(field) is not None}
+        ids.update(getattr(record, field) for record in records if getattr(record, field) is not None)
+        related[field] = model.objects.in_bulk(ids) if ids else {}
+
+    for index, data in enumerate(validated):
+        if not data:
+            continue
+        for field in BATCH_RELATED_MODELS:
+            pk = data.get(field)
+            if pk is not None and pk not in related[field]:
+                errors.setdefault(index, {})[field] = [f'Geçersiz pk "{pk}" - nesne bulunamadı.']
+    return related
+
+
+def apply_values(instance, data, related):
+    for name, value in data.items():
+        if name == 'id':
+            continue
+        if name in BATCH_RELATED_MODELS:
+            # İlişkili nesne de atanır; arama metni ek sorgusuz üretilir
+            setattr(instance, name[:-len('_id')], related[name].get(value))
+        else:
+            setattr(instance, name, value)
+    instance.status = ServiceRecord.status_for_dates(
+        service_send_date=instance.service_send_date,
+        service_return_date=instance.service_return_date,
+        delivery_date=instance.delivery_date,
+    )
+
+
+@transaction.atomic
+def apply_record_batch(items, user):
+    """Öğeleri toplu olarak yazar; ``(oluşturulan kayıtlar, güncellenen kayıtlar)`` döner.
+
+    Herhangi bir öğe geçersizse hiçbir şey yazılmaz ve ``RecordBatchError``
+    yükselir; liste kendisi geçersizse ``ValidationError``.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValidationError({'records': ["Kayıt listesi boş olamaz."]})
+    if len(items) > BATCH_MAX_SIZE:
+        raise ValidationError({'records': [f"En fazla {BATCH_MAX_SIZE} kayıt gönderilebilir."]})
+
+    validated, errors = validate_items(items)
+    update_ids = [data['id'] for data in validated if data and 'id' in data]
+    existing = ServiceRecord.objects.in_bulk(update_ids) if update_ids else {}
+    related = resolve_related(validated, errors, existing.values())
+
+    for index, data in enumerate(validated):
+        if data and 'id' in data and data['id'] not in existing:
+            errors.setdefault(index, {})['id'] = [f"Kayıt bulunamadı: {data['id']}"]
+
+    if errors:
+        raise RecordBatchError([
+            {'index': index, 'errors': errors[index]} for index in sorted(errors)
+        ])
+
+    now = timezone.now()
+    rollup_deltas = Counter()
+    logs = []
+
+    # Yeni kayıtlar
+    created = []
+    for data in validated:
+        if 'id' in data:
+            continue
+        instance = ServiceRecord(created_user=user)
+        apply_values(instance, data, related)
+        instance.search_document = instance.build_search_document()
+        created.append(instance)
+    ServiceRecord.objects.bulk_create(created)
+    for instance in created:
+        logs.append(ServiceLog(
+            service_record=instance,
+            user=user,
+            changed_fields=logcodec.encode_snapshot({
+                field.name: getattr(instance, field.attname)
+                for field in instance._meta.concrete_fields
+            }),
+        ))
+        rollup_deltas[rollup_key(instance)] += 1
+
+    # Güncellemeler: sadece değişen kayıtlar ve kolonlar yazılır
+    updated = []
+    update_fields = set()
+    status_changes = []
+    for data in validated:
+        if 'id' not in data:
+            continue
+        instance = existing[data['id']]
+        old_key = rollup_key(instance)
+        diff = FieldDiff(instance)
+        apply_values(instance, data, related)
+        changes = diff.changes()
+        if not changes:
+            continue
+        if set(changes) & set(ServiceRecord.SEARCH_SOURCE_FIELDS):
+            # Değişmeyen ilişkiler de in_bulk sonuçlarından atanır
+            for field in BATCH_RELATED_MODELS:
+                setattr(instance, field[:-len('_id')], related[field].get(getattr(instance, field)))
+            instance.search_document = instance.build_search_document()
+            update_fields.add('search_document')
+        instance.updated_at = now
+        update_fields.update(changes)
+        updated.append(instance)
+        logs.append(ServiceLog(
+            service_record=instance,
+            user=user,
+            changed_fields=logcodec.encode_changes(changes),
+        ))
+        rollup_deltas[old_key] -= 1
+        rollup_deltas[rollup_key(instance)] += 1
+        if 'status' in changes:
+            status_changes.append((instance.id, *changes['status']))
+
+    if updated:
+        ServiceRecord.objects.bulk_update(updated, [*update_fields, 'updated_at'])
+
+    ServiceLog.objects.bulk_create(logs)
+    apply_rollup_deltas(rollup_deltas)
+    events.broadcast_status_changes(status_changes)
+    return created, updated
@@ -0,0 +1,244 @@
+"""Sıcak uç noktalar için gecikme ve SQL sorgu sayısı ölçümü.
+
+``python manage.py benchmark`` bu modülü kullanır: ayarlanabilir büyüklükte
+bir veri kümesi üretir, her senaryoyu ısınma turundan sonra birkaç kez
+çalıştırır ve en fazla sorgu sayısı ile medyan/p95 süreyi raporlar.
+Önbellekli uç noktalar her turdan önce (süreye katılmadan) önbellek
+sürümü artırılarak ölçülür; böylece önbellek isabeti değil, ıskalama
+durumundaki sorgu ve süre bütçelenir.
+Sonuçlar JSON baseline ile karşılaştırılır; sorgu sayısı bütçeyi aşarsa
+veya medyan süre toleransın üstüne çıkarsa senaryo başarısız sayılır.
+"""
+import contextlib
+import io
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.tasks import check_service_updates
+from api.cache import increment_reference_version
+from api.models import Brand, Customer
+from . import logcodec
+from .models import Service, ServiceLog, ServiceRecord
+from .rollups import rebuild_rollups
+
+DEFAULT_DATASET = {
+    'customers': 500,
+    'brands': 40,
+    'services': 10,
+    'records': 5000,
+}
+
+# Gecikme karşılaştırmasında küçük değerlerin gürültüsü için eklenen pay
+LATENCY_SLACK_MS = 5
+
+_WORDS = ['Bilgisayar', 'Işık', 'Elektronik', 'Ofis', 'Teknik', 'Çağrı', 'Yazılım', 'Ege', 'Anadolu', 'Şimşek']
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def seed_dataset(customers, brands, services, records, seed=0):
+    """Veri kümesini toplu sorgularla üretir; senaryoların kullandığı örnekleri döner.
+
+    Kayıtların beşte biri bir haftadan eski güncellenmiş olur, böylece
+    ``check_service_updates`` ve bildirim listesi de ölçülecek iş bulur.
+    """
+    rng = random.Random(seed)
+    user = User.objects.create_user('benchmark', password='benchmark', is_staff=True)
+
+    def name(index):
+        return f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {index}"
+
+    customer_rows = []
+    for index in range(customers):
+        company_name = name(index)
+        customer_rows.append(Customer(
+            company_code=f'B{index:06d}',
+            company_name=company_name,
+            tax_number=f'{1000000000 + index}',
+            search_document=Customer.search_document_for(company_name, None, f'B{index:06d}', f'{1000000000 + index}'),
+        ))
+    customer_rows = Customer.objects.bulk_create(customer_rows)
+    brand_rows = Brand.objects.bulk_create([Brand(name=f'Marka {name(index)}') for index in range(brands)])
+    service_rows = Service.objects.bulk_create([Service(name=f'Servis {name(index)}') for index in range(services)])
+
+    today = timezone.localdate()
+    record_rows = []
+    for index in range(records):
+        arrival_date = today - timedelta(days=rng.randrange(180))
+        record = ServiceRecord(
+            customer=rng.choice(customer_rows),
+            brand=rng.choice(brand_rows),
+            model=f'Model {index % 97}',
+            serial_number=f'SN{index:08d}',
+            arrival_date=arrival_date,
+            issue='Açılmıyor',
+            created_user=user,
+        )
+        stage = rng.randrange(4)
+        if stage >= 1:
+            record.service = rng.choice(service_rows)
+            record.service_send_date = arrival_date + timedelta(days=1)
+        if stage >= 2:
+            record.service_return_date = arrival_date + timedelta(days=5)
+        if stage >= 3:
+            record.delivery_date = arrival_date + timedelta(days=6)
+        record.status = ServiceRecord.status_for_dates(
+            service_send_date=record.service_send_date,
+            service_return_date=record.service_return_date,
+            delivery_date=record.delivery_date,
+        )
+        record.search_document = record.build_search_document()
+        record_rows.append(record)
+    record_rows = ServiceRecord.objects.bulk_create(record_rows, batch_size=1000)
+    ServiceLog.objects.bulk_create([
+        ServiceLog(
+            service_record=record,
+            user=user,
+            changed_fields=logcodec.encode_snapshot({
+                field.name: getattr(record, field.attname)
+                for field in record._meta.concrete_fields
+            }),
+        )
+        for record in record_rows
+    ], batch_size=1000)
+
+    record_ids = [record.id for record in record_rows]
+    stale_ids = record_ids[::5]
+    ServiceRecord.objects.filter(id__in=stale_ids).update(updated_at=timezone.now() - timedelta(days=10))
+    rebuild_rollups()
+    cache.clear()
+    run_quietly(check_service_updates)
+
+    sample_customer = customer_rows[len(customer_rows) // 2] if customer_rows else None
+    sample_brand = brand_rows[len(brand_rows) // 2] if brand_rows else None
+    return {
+        'user': user,
+        'record_id': record_ids[len(record_ids) // 2] if record_ids else None,
+        'customer_id': sample_customer.id if sample_customer else None,
+        'brand_id': sample_brand.id if sample_brand else None,
+        'customer_term': sample_customer.company_name[:4] if sample_customer else '',
+        'brand_term': sample_brand.name.split()[1][:3] if sample_brand else '',
+    }
+
+
+def run_quietly(func):
+    # Görevler ilerlemeyi print ile yazar; ölçüm çıktısına karışmasın
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func()
+
+
+def scenarios(data):
+    """Senaryo adı -> ``func(client, tur)``; HTTP senaryoları yanıt döner."""
+    record_list = reverse('kayit-list-create')
+    record_detail = reverse('kayit-detail', args=[data['record_id']])
+    return {
+        'records_list': lambda client, run: client.get(record_list),
+        'records_search': lambda client, run: client.get(record_list, {'search': data['customer_term']}),
+        'record_detail': lambda client, run: client.get(record_detail),
+        'record_create': lambda client, run: client.post(record_list, {
+            'customer_id': data['customer_id'],
+            'brand_id': data['brand_id'],
+            'model': f'Benchmark {run}',
+            'arrival_date': str(timezone.localdate()),
+        }, format='json'),
+        'record_update': lambda client, run: client.patch(record_detail, {'model': f'Benchmark {run}'}, format='json'),
+        'dashboard_stats': lambda client, run: client.get(reverse('dashboard-stats')),
+        'notifications': lambda client, run: client.get(reverse('notification_list')),
+        'customer_search': lambda client, run: client.get(
+            reverse('customer-list-create'), {'search': data['customer_term']}
+        ),
+        'customer_autocomplete': lambda client, run: client.get(
+            reverse('customer-autocomplete'), {'q': data['customer_term']}
+        ),
+        'brand_suggest': lambda client, run: client.get(reverse('brand-suggest'), {'q': data['brand_term']}),
+        'check_service_updates': lambda client, run: run_quietly(check_service_updates),
+    }
+
+
+def scenario_setups():
+    """Senaryo adı -> her turdan önce çalışan hazırlık; süreye ve sorgu sayısına katılmaz."""
+    customers = lambda: increment_reference_version(Customer._meta.label_lower)
+    return {
+        'customer_search': customers,
+        'customer_autocomplete': customers,
+        # Sürüm değişince süreç içi önek indeksi yeniden kurulur
+        'brand_suggest': lambda: increment_reference_version(Brand._meta.label_lower),
+    }
+
+
+def measure(func, client, iterations, warmup=1, setup=None):
+    for run in range(warmup):
+        if setup:
+            setup()
+        func(client, -1 - run)
+
+    timings = []
+    query_counts = []
+    for run in range(iterations):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = func(client, run)
+            elapsed = (time.perf_counter() - start) * 1000
+        status_code = getattr(response, 'status_code', 200)
+        if status_code >= 400:
+            raise BenchmarkError(f"HTTP {status_code}: {getattr(response, 'content', b'')[:200]!r}")
+        timings.append(elapsed)
+        query_counts.append(len(context.captured_queries))
+
+    timings.sort()
+    return {
+        'queries': max(query_counts),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+    }
+
+
+def run_benchmarks(data, iterations=20, names=None):
+    """Senaryoları çalıştırır: ``{ad: {'queries', 'median_ms', 'p95_ms'}}``"""
+    client = APIClient()
+    client.force_authenticate(data['user'])
+    setups = scenario_setups()
+    results = {}
+    for name, func in scenarios(data).items():
+        if names and name not in names:
+            continue
+        try:
+            results[name] = measure(func, client, iterations, setup=setups.get(name))
+        except BenchmarkError as e:
+            raise BenchmarkError(f"{name}: {e}") from e
+    return results
+
+
+def check_budgets(results, baseline, latency_tolerance=None):
+    """Aşılan bütçeleri açıklayan mesajlar; ``latency_tolerance`` verilmezse sadece sorgu sayısı.
+
+    Baseline'da olmayan senaryo da bildirilir; yeni senaryo eklenince baseline yeniden kaydedilmelidir.
+    """
+    violations = []
+    budgets = baseline.get('scenarios', {})
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if not budget:
+            violations.append(f"{name}: bütçe yok (baseline'ı --record ile güncelleyin)")
+            continue
+        if result['queries'] > budget['queries']:
+            violations.append(f"{name}: {result['queries']} sorgu (bütçe {budget['queries']})")
+        if latency_tolerance:
+            allowed = max(budget['median_ms'] * latency_tolerance, budget['median_ms'] + LATENCY_SLACK_MS)
+            if result['median_ms'] > allowed:
+                violations.append(f"{name}: medyan {result['median_ms']} ms (izin verilen {allowed:.2f} ms)")
+    return violations
@@ -0,0 +1,29 @@
+class FieldDiff:
+    """Bir model örneğinin alanlarındaki değişiklikleri izler.
+
+    Başlangıçta her alanın ham değeri (ForeignKey için sadece id) saklanır;
+    ``changes()`` mevcut değerlerle karşılaştırıp değişen alanları döner.
+    İlişkili nesneler yüklenmez; log için ``logcodec.encode_changes`` kullanılır.
+    """
+    # Karşılaştırmaya katılmayan alanlar (otomatik veya türetilmiş)
+    exclude = ('id', 'updated_at', 'search_document')
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.fields = [
+            field for field in instance._meta.concrete_fields
+            if field.name not in self.exclude
+        ]
+        self.initial = self._capture()
+
+    def _capture(self):
+        return {field.name: getattr(self.instance, field.attname) for field in self.fields}
+
+    def changes(self):
+        """Değişen alanlar: ``{alan_adı: (eski, yeni)}``"""
+        current = self._capture()
+        return {
+            name: (self.initial[name], value)
+            for name, value in current.items()
+            if self.initial[name] != value
+        }
@@ -0,0 +1,109 @@
+"""Servis kayıtlarının CSV/XLSX olarak dışa aktarılması.
+
+Kayıtlar ``values_list`` ile sadece gereken kolonlar seçilerek ve
+``iterator`` ile parça parça okunur; bellek kullanımı kayıt sayısından
+bağımsızdır. CSV yanıtı üretildikçe gönderilir (ASGI altında async
+iterator ile), XLSX openpyxl'in write-only modunda geçici dosyaya yazılır.
+"""
+import csv
+import datetime
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .models import ServiceRecord
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (sorgu yolu, başlık)
+EXPORT_COLUMNS = [
+    ('id', 'ID'),
+    ('customer__company_name', 'Müşteri'),
+    ('brand__name', 'Marka'),
+    ('model', 'Model'),
+    ('serial_number', 'Seri No'),
+    ('accessories', 'Aksesuar'),
+    ('arrival_date', 'Geliş Tarihi'),
+    ('issue', 'Arıza'),
+    ('service__name', 'Servis'),
+    ('service_send_date', 'Servise Gönderim Tarihi'),
+    ('service_operation', 'Yapılan İşlem'),
+    ('service_return_date', 'Servisten Geliş Tarihi'),
+    ('delivery_date', 'Teslim Tarihi'),
+    ('status', 'Durum'),
+    ('created_user__username', 'Oluşturan'),
+    ('updated_at', 'Güncellenme Tarihi'),
+]
+
+STATUS_LABELS = dict(ServiceRecord.STATUS_CHOICES)
+
+
+def export_rows(queryset):
+    """Başlıksız satırlar: durum etiketi çözülmüş, zaman damgaları yerel saatte."""
+    lookups = [lookup for lookup, _ in EXPORT_COLUMNS]
+    status_index = lookups.index('status')
+    for row in queryset.values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = list(row)
+        row[status_index] = STATUS_LABELS.get(row[status_index], row[status_index])
+        for index, value in enumerate(row):
+            if isinstance(value, datetime.datetime):
+                # Excel saat dilimi desteklemez
+                row[index] = timezone.localtime(value).replace(tzinfo=None)
+        yield row
+
+
+class _Echo:
+    """csv.writer için yazılanı geri döndüren sahte dosya"""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(queryset):
+    """CSV satırlarını üretildikçe döner (Excel'in Türkçe karakterleri tanıması için BOM ile)."""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow([title for _, title in EXPORT_COLUMNS])
+    for row in export_rows(queryset):
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def xlsx_file(queryset):
+    """Kayıtları write-only çalışma kitabına yazar; başa sarılmış geçici dosyayı döner."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Servis Kayıtları')
+    sheet.append([title for _, title in EXPORT_COLUMNS])
+    for row in export_rows(queryset):
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def csv_chunks(queryset):
+    """CSV satırlarını ``EXPORT_CHUNK_SIZE`` satırlık metin parçaları halinde döner."""
+    batch = []
+    for line in csv_stream(queryset):
+        batch.append(line)
+        if len(batch) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+async def csv_chunks_async(queryset):
+    """ASGI için ``csv_chunks``: her parça ``sync_to_async`` ile çekilir.
+
+    ``thread_sensitive`` çağrılar hep aynı iş parçacığında çalıştığından
+    sorgu imleci parçalar arasında korunur; Django senkron iterator'ı
+    ASGI altında önce listeye çevirirdi.
+    """
+    chunks = csv_chunks(queryset)
+    next_chunk = sync_to_async(lambda: next(chunks, None))
+    while (chunk := await next_chunk()) is not None:
+        yield chunk
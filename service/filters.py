@@ -0,0 +1,34 @@
+from django.db import connection
+from rest_framework import filters
+
+from api.text import fold_text
+
+
+class ServiceRecordSearchFilter(filters.SearchFilter):
+    """Servis kayıtlarında sunucu taraflı arama.
+
+    Müşteri adı, marka, model, seri no ve servis firması
+    ``ServiceRecord.search_document`` alanında katlanmış olarak tutulur.
+    Her arama kelimesi bu alanda aranır; PostgreSQL'de trigram indeksi
+    kullanılır ve sonuçlar benzerliğe göre sıralanır, SQLite'ta ise
+    düz LIKE ile en yeni kayıt önce gelir.
+    """
+    search_field = 'search_document'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = [fold_text(term) for term in self.get_search_terms(request)]
+        terms = [term for term in terms if term]
+        if not terms:
+            return queryset
+
+        for term in terms:
+            queryset = queryset.filter(**{f'{self.search_field}__contains': term})
+
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramWordSimilarity
+
+            queryset = queryset.annotate(
+                search_rank=TrigramWordSimilarity(' '.join(terms), self.search_field)
+            ).order_by('-search_rank', '-id')
+        return queryset
+
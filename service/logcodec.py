@@ -0,0 +1,183 @@
+"""ServiceLog.changed_fields için sıkıştırılmış kayıt biçimi.
+
+Sürüm 2 biçimi::
+
+    {"v": 2, "s": {"mo": "X1", "br": 3, ...}}          # oluşturma anındaki değerler
+    {"v": 2, "c": {"mo": ["X1", "X2"], "br": [3, 5]}}  # güncelleme: [eski, yeni]
+
+Alan adları kısa kodlarla, ForeignKey'ler sadece id ile saklanır; gösterim
+metinleri okuma anında toplu olarak çözülür. Uzun metinler zlib ile
+sıkıştırılıp ``{"z": "<base64>"}`` olarak yazılır.
+
+Sürüm bilgisi olmayan eski kayıtlar (alan adı -> değer veya
+``{'old': .., 'new': ..}``) olduğu gibi okunur.
+"""
+import base64
+import datetime
+import zlib
+
+LOG_FORMAT_VERSION = 2
+
+FIELD_CODES = {
+    'customer': 'cu',
+    'brand': 'br',
+    'model': 'mo',
+    'serial_number': 'sn',
+    'accessories': 'ac',
+    'arrival_date': 'ad',
+    'issue': 'is',
+    'service': 'sv',
+    'service_send_date': 'sd',
+    'service_operation': 'so',
+    'service_return_date': 'rd',
+    'delivery_date': 'dd',
+    'created_user': 'us',
+    'status': 'st',
+}
+CODE_FIELDS = {code: name for name, code in FIELD_CODES.items()}
+
+# Sadece id'si saklanan ForeignKey alanları
+RELATED_FIELDS = ('customer', 'brand', 'service', 'created_user')
+
+# Bu uzunluğun üzerindeki metinler sıkıştırılmayı dener
+COMPRESS_MIN_LENGTH = 200
+
+
+def is_compact(payload):
+    return isinstance(payload, dict) and payload.get('v') == LOG_FORMAT_VERSION
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, str) and len(value) >= COMPRESS_MIN_LENGTH:
+        packed = base64.b64encode(zlib.compress(value.encode('utf-8'), 9)).decode('ascii')
+        if len(packed) + 8 < len(value.encode('utf-8')):
+            return {'z': packed}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'z' in value:
+        return zlib.decompress(base64.b64decode(value['z'])).decode('utf-8')
+    return value
+
+
+def encode_snapshot(values):
+    """Oluşturma logu: ``{alan_adı: ham_değer}`` -> sürüm 2. Boş değerler yazılmaz."""
+    return {
+        'v': LOG_FORMAT_VERSION,
+        's': {
+            FIELD_CODES[name]: _encode_value(value)
+            for name, value in values.items()
+            if name in FIELD_CODES and value not in (None, '')
+        },
+    }
+
+
+def encode_changes(changes):
+    """Güncelleme logu: ``{alan_adı: (eski, yeni)}`` -> sürüm 2."""
+    return {
+        'v': LOG_FORMAT_VERSION,
+        'c': {
+            FIELD_CODES[name]: [_encode_value(old), _encode_value(new)]
+            for name, (old, new) in changes.items()
+            if name in FIELD_CODES
+        },
+    }
+
+
+def decode(payload):
+    """Sürüm 2 kaydı alan adlarıyla açar.
+
+    Dönen değer ``(tür, veri)``: tür ``'snapshot'`` ise veri
+    ``{alan: değer}``, ``'changes'`` ise ``{alan: (eski, yeni)}``.
+    ForeignKey değerleri id olarak kalır.
+    """
+    if 'c' in payload:
+        return 'changes', {
+            CODE_FIELDS.get(code, code): (_decode_value(old), _decode_value(new))
+            for code, (old, new) in payload['c'].items()
+        }
+    return 'snapshot', {
+        CODE_FIELDS.get(code, code): _decode_value(value)
+        for code, value in payload.get('s', {}).items()
+    }
+
+
+def related_models():
+    """ForeignKey alan adı -> ilişkili model"""
+    from .models import ServiceRecord
+
+    return {name: ServiceRecord._meta.get_field(name).related_model for name in RELATED_FIELDS}
+
+
+def resolve_labels(payloads):
+    """Birden fazla sürüm 2 kaydındaki ForeignKey id'lerini tek seferde çözer.
+
+    Her model için tek bir ``in_bulk`` sorgusu atılır; dönen değer
+    ``{alan_adı: {id: gösterim_metni}}``.
+    """
+    models = related_models()
+    related_codes = {FIELD_CODES[name]: name for name in RELATED_FIELDS}
+    wanted = {name: set() for name in RELATED_FIELDS}
+    for payload in payloads:
+        if not is_compact(payload):
+            continue
+        is_change = 'c' in payload
+        for code, value in payload.get('c' if is_change else 's', {}).items():
+            name = related_codes.get(code)
+            if name is None:
+                continue
+            values = value if is_change else (value,)
+            wanted[name].update(v for v in values if v is not None)
+
+    labels = {}
+    for name, ids in wanted.items():
+        if ids:
+            objects = models[name].objects.in_bulk(ids)
+            labels[name] = {pk: str(obj) for pk, obj in objects.items()}
+    return labels
+
+
+def to_display(payload, labels):
+    """Kaydı istemcinin beklediği eski biçime çevirir.
+
+    Güncellemeler ``{alan: {'old': .., 'new': ..}}``, oluşturma kayıtları
+    ``{alan: değer}`` olarak döner; ForeignKey'ler ``{'id', 'str'}`` olur.
+    """
+    if not is_compact(payload):
+        return payload
+
+    def label(name, pk):
+        if name not in RELATED_FIELDS or pk is None:
+            return pk
+        return {'id': pk, 'str': labels.get(name, {}).get(pk, str(pk))}
+
+    kind, data = decode(payload)
+    if kind == 'changes':
+        return {
+            name: {'old': label(name, old), 'new': label(name, new)}
+            for name, (old, new) in data.items()
+        }
+    return {name: label(name, value) for name, value in data.items()}
+
+
+def changed_field_names(payload):
+    """Logda geçen alan adları (sıkıştırılmış metinler açılmadan)."""
+    if is_compact(payload):
+        return [CODE_FIELDS.get(code, code) for code in payload.get('c' if 'c' in payload else 's', {})]
+    if isinstance(payload, dict):
+        return list(payload)
+    return []
+
+
+def field_filter(name, prefix='changed_fields'):
+    """Belirli bir alanı içeren logları bulan ``Q`` (eski ve yeni biçim)."""
+    from django.db.models import Q
+
+    condition = Q(**{f'{prefix}__has_key': name})
+    code = FIELD_CODES.get(name)
+    if code:
+        condition |= Q(**{f'{prefix}__c__has_key': code}) | Q(**{f'{prefix}__s__has_key': code})
+    return condition
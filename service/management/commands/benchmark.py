@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from service.benchmark import DEFAULT_DATASET, BenchmarkError, check_budgets, run_benchmarks, seed_dataset
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmark_baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Sıcak uç noktaların gecikmesini ve SQL sorgu sayısını ayrı bir test veritabanında "
+        "ölçer, baseline bütçeleriyle karşılaştırır"
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_DATASET.items():
+            parser.add_argument(f'--{name}', type=int, default=default, help=f"Üretilecek {name} sayısı")
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--scenario', action='append', dest='scenarios', help="Sadece bu senaryo(lar)")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            help="Karşılaştırma yapmadan sonuçları baseline dosyasına yaz",
+        )
+        parser.add_argument(
+            '--latency-tolerance',
+            type=float,
+            default=2.0,
+            help="Medyan süre baseline'ın bu katını aşarsa başarısız (0 = süreyi kontrol etme)",
+        )
+
+    def handle(self, *args, **options):
+        dataset = {name: options[name] for name in DEFAULT_DATASET}
+
+        # Geliştirme verisine dokunmamak için ölçüm ayrı test veritabanında yapılır
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        try:
+            vendor = connection.vendor
+            self.stdout.write(f"Veri kümesi üretiliyor ({vendor}): {dataset}")
+            data = seed_dataset(**dataset)
+            results = run_benchmarks(data, options['iterations'], options['scenarios'])
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'senaryo':<24}{'sorgu':>7}{'medyan ms':>12}{'p95 ms':>10}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24}{result['queries']:>7}{result['median_ms']:>12.2f}{result['p95_ms']:>10.2f}"
+            )
+
+        baseline_path = Path(options['baseline'])
+        if options['record']:
+            baseline = {
+                'database': vendor,
+                'dataset': dataset,
+                'iterations': options['iterations'],
+                'scenarios': results,
+            }
+            baseline_path.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Baseline yazıldı: {baseline_path}"))
+            return
+
+        if not baseline_path.exists():
+            raise CommandError(f"Baseline bulunamadı: {baseline_path} (önce --record ile oluşturun)")
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+
+        latency_tolerance = options['latency_tolerance']
+        if baseline.get('database') != vendor or baseline.get('dataset') != dataset:
+            # Farklı veritabanı/veri kümesinde süreler karşılaştırılamaz
+            self.stderr.write("Baseline farklı veritabanı veya veri kümesiyle alınmış; sadece sorgu sayıları kontrol ediliyor")
+            latency_tolerance = None
+
+        violations = check_budgets(results, baseline, latency_tolerance or None)
+        if violations:
+            for violation in violations:
+                self.stderr.write(violation)
+            raise CommandError(f"{len(violations)} bütçe aşıldı")
+        self.stdout.write(self.style.SUCCESS("Tüm senaryolar bütçe içinde"))
@@ -0,0 +1,71 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from service import logcodec
+from service.models import ServiceLog
+
+
+def legacy_to_compact(payload):
+    """Eski biçimdeki bir logu sürüm 2'ye çevirir; çevrilemiyorsa None döner."""
+    if not isinstance(payload, dict) or logcodec.is_compact(payload):
+        return None
+
+    def raw(value):
+        # Eski güncelleme loglarında ForeignKey {'id', 'str'} olarak saklanır
+        if isinstance(value, dict) and 'id' in value:
+            return value['id']
+        return value
+
+    is_change_log = payload and all(
+        isinstance(value, dict) and 'old' in value and 'new' in value
+        for value in payload.values()
+    )
+    if is_change_log:
+        return logcodec.encode_changes({
+            name: (raw(value['old']), raw(value['new']))
+            for name, value in payload.items()
+        })
+    return logcodec.encode_snapshot(payload)
+
+
+class Command(BaseCommand):
+    help = "Eski biçimdeki servis loglarını sıkıştırılmış (v2) biçime çevirir"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Değişiklik yapmadan kazanılacak alanı raporla",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        converted = 0
+        bytes_before = 0
+        bytes_after = 0
+        batch = []
+
+        queryset = ServiceLog.objects.only('id', 'changed_fields').order_by('id')
+        for log in queryset.iterator(chunk_size=batch_size):
+            compact = legacy_to_compact(log.changed_fields)
+            if compact is None:
+                continue
+            bytes_before += len(json.dumps(log.changed_fields, ensure_ascii=False))
+            bytes_after += len(json.dumps(compact, ensure_ascii=False))
+            converted += 1
+            log.changed_fields = compact
+            batch.append(log)
+            if len(batch) >= batch_size:
+                if not options['dry_run']:
+                    ServiceLog.objects.bulk_update(batch, ['changed_fields'])
+                batch = []
+
+        if batch and not options['dry_run']:
+            ServiceLog.objects.bulk_update(batch, ['changed_fields'])
+
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        self.stdout.write(
+            f"{prefix}{converted} log çevrildi: {bytes_before} -> {bytes_after} bayt"
+        )
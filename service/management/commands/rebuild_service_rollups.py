@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from service.rollups import duplicate_buckets, rebuild_rollups, verify_rollups
+
+
+class Command(BaseCommand):
+    help = "Servis kaydı özet tablosunu baştan oluşturur ve canlı sayılarla doğrular"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify-only',
+            action='store_true',
+            help="Tabloyu yeniden oluşturmadan sadece canlı sayılarla karşılaştır",
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            row_count = rebuild_rollups()
+            self.stdout.write(f"Özet tablosu yeniden oluşturuldu: {row_count} satır")
+
+        duplicates = duplicate_buckets()
+        for (day, status, brand_id, service_id), rows in sorted(duplicates.items(), key=str):
+            self.stderr.write(f"{day} {status} marka={brand_id} servis={service_id}: {rows} satır")
+        if duplicates:
+            raise CommandError(f"{len(duplicates)} anahtar için birden fazla özet satırı var; --verify-only olmadan çalıştırın")
+
+        mismatches = verify_rollups()
+        if mismatches:
+            for (day, status, brand_id, service_id), counts in sorted(mismatches.items(), key=str):
+                self.stderr.write(
+                    f"{day} {status} marka={brand_id} servis={service_id}: "
+                    f"canlı={counts['live']} özet={counts['rollup']}"
+                )
+            raise CommandError(f"{len(mismatches)} anahtarda özet ile canlı sayılar uyuşmuyor")
+
+        self.stdout.write(self.style.SUCCESS("Özet tablosu canlı sayılarla uyumlu"))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+from api.text import fold_text
+
+
+def populate_search_document(apps, schema_editor):
+    ServiceRecord = apps.get_model('service', 'ServiceRecord')
+    batch = []
+    queryset = ServiceRecord.objects.select_related('customer', 'brand', 'service')
+    for record in queryset.iterator(chunk_size=500):
+        parts = [
+            record.customer.company_name if record.customer else '',
+            record.brand.name if record.brand else '',
+            record.model,
+            record.serial_number,
+            record.service.name if record.service else '',
+        ]
+        record.search_document = ' '.join(fold_text(part) for part in parts if part)
+        batch.append(record)
+        if len(batch) >= 500:
+            ServiceRecord.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        ServiceRecord.objects.bulk_update(batch, ['search_document'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # Trigram indeksi yalnızca PostgreSQL'de; SQLite düz LIKE taramasıyla çalışır
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS service_record_search_trgm '
+        'ON service_servicerecord USING gin (search_document gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS service_record_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0002_service_remove_servicerecord_service_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicerecord',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
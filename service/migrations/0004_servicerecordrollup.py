@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_rollups(apps, schema_editor):
+    ServiceRecord = apps.get_model('service', 'ServiceRecord')
+    ServiceRecordRollup = apps.get_model('service', 'ServiceRecordRollup')
+    rows = ServiceRecord.objects.values(
+        'arrival_date', 'status', 'brand_id', 'service_id'
+    ).annotate(total=Count('id'))
+    ServiceRecordRollup.objects.bulk_create([
+        ServiceRecordRollup(
+            day=row['arrival_date'], status=row['status'],
+            brand_id=row['brand_id'], service_id=row['service_id'],
+            record_count=row['total'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        ('service', '0003_servicerecord_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceRecordRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=50)),
+                ('record_count', models.IntegerField(default=0)),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.brand')),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='service.service')),
+            ],
+            options={
+                'verbose_name': 'Servis Kaydı Özeti',
+                'verbose_name_plural': 'Servis Kaydı Özetleri',
+                'indexes': [models.Index(fields=['day', 'status'], name='service_ser_day_0bc961_idx')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:38
+
+from django.db import migrations
+from django.db.models import Count
+
+CANONICAL_STATUSES = ('pending', 'sent_to_service', 'returned_from_service', 'delivered')
+
+
+def status_from_dates(record):
+    # ServiceRecordSerializer.update ile aynı kural
+    if record.delivery_date:
+        return 'delivered'
+    if record.service_return_date:
+        return 'returned_from_service'
+    if record.service_send_date:
+        return 'sent_to_service'
+    return 'pending'
+
+
+def normalize_statuses(apps, schema_editor):
+    ServiceRecord = apps.get_model('service', 'ServiceRecord')
+    ServiceRecordRollup = apps.get_model('service', 'ServiceRecordRollup')
+
+    legacy_values = (
+        ServiceRecord.objects.exclude(status__in=CANONICAL_STATUSES)
+        .values_list('status', flat=True).distinct()
+    )
+    for value in list(legacy_values):
+        canonical = (value or '').strip().lower().replace(' ', '_')
+        legacy = ServiceRecord.objects.filter(status=value)
+        if canonical in CANONICAL_STATUSES:
+            legacy.update(status=canonical)
+            continue
+        # Tanınmayan değerler tarihlerden türetilir
+        for record in legacy.only('id', 'service_send_date', 'service_return_date', 'delivery_date'):
+            ServiceRecord.objects.filter(pk=record.pk).update(status=status_from_dates(record))
+
+    # Özet tablosu eski yazımları içerebilir; yeniden oluştur
+    ServiceRecordRollup.objects.all().delete()
+    rows = ServiceRecord.objects.values(
+        'arrival_date', 'status', 'brand_id', 'service_id'
+    ).annotate(total=Count('id'))
+    ServiceRecordRollup.objects.bulk_create([
+        ServiceRecordRollup(
+            day=row['arrival_date'], status=row['status'],
+            brand_id=row['brand_id'], service_id=row['service_id'],
+            record_count=row['total'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0004_servicerecordrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_statuses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0005_normalize_servicerecord_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='servicerecord',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sent_to_service', 'Sent to Service'), ('returned_from_service', 'Returned from Service'), ('delivered', 'Delivered')], default='pending', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='servicerecord',
+            index=models.Index(fields=['status', 'updated_at'], name='service_record_status_upd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerecord',
+            index=models.Index(fields=['status', 'arrival_date'], name='service_record_status_arr_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerecord',
+            index=models.Index(fields=['arrival_date'], name='service_record_arrival_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='servicerecord',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['pending', 'sent_to_service', 'returned_from_service', 'delivered'])), name='service_record_status_valid'),
+        ),
+    ]
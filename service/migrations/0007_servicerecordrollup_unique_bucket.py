@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:14
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    # Unique indeksten önce aynı anahtardaki satırlar tek satırda toplanır
+    ServiceRecordRollup = apps.get_model('service', 'ServiceRecordRollup')
+    duplicates = ServiceRecordRollup.objects.values(
+        'day', 'status', 'brand_id', 'service_id'
+    ).annotate(rows=Count('id'), keep_id=Min('id'), total=Sum('record_count')).filter(rows__gt=1)
+    for row in duplicates:
+        bucket = ServiceRecordRollup.objects.filter(
+            day=row['day'], status=row['status'],
+            brand_id=row['brand_id'], service_id=row['service_id'],
+        )
+        bucket.exclude(id=row['keep_id']).delete()
+        bucket.update(record_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_customer_search_document'),
+        ('service', '0006_servicerecord_status_constraints'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='servicerecordrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('brand__isnull', False), ('service__isnull', False)), fields=('day', 'status', 'brand', 'service'), name='service_rollup_bucket_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='servicerecordrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('brand__isnull', True), ('service__isnull', False)), fields=('day', 'status', 'service'), name='service_rollup_nobrand_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='servicerecordrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('brand__isnull', False), ('service__isnull', True)), fields=('day', 'status', 'brand'), name='service_rollup_noservice_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='servicerecordrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('brand__isnull', True), ('service__isnull', True)), fields=('day', 'status'), name='service_rollup_nofk_unique'),
+        ),
+    ]
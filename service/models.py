@@ -1,10 +1,11 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 import json
 from api.models import Customer, Brand
+from api.text import fold_text
 
 
 class Service(models.Model):
@@ -61,8 +62,205 @@ class ServiceRecord(models.Model):
     service_return_date = models.DateField(blank=True, null=True)
     delivery_date = models.DateField(blank=True, null=True)
     created_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='service_records')
-    status = models.CharField(max_length=50, default='Pending')
+    status = models.CharField(max_length=50, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Arama için katlanmış (Türkçe küçük harf, aksansız) birleşik metin
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    # search_document bu alanlardan üretilir
+    SEARCH_SOURCE_FIELDS = ('customer', 'brand', 'model', 'serial_number', 'service')
+    # Özet tablosunun (ServiceRecordRollup) anahtar alanları
+    ROLLUP_FIELDS = ('arrival_date', 'status', 'brand_id', 'service_id')
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(status__in=[
+                    'pending', 'sent_to_service', 'returned_from_service', 'delivered',
+                ]),
+                name='service_record_status_valid',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='service_record_status_upd_idx'),
+            models.Index(fields=['status', 'arrival_date'], name='service_record_status_arr_idx'),
+            models.Index(fields=['arrival_date'], name='service_record_arrival_idx'),
+        ]
 
     def __str__(self):
         return f"{self.customer} - {self.brand} {self.model}"
 
+    @classmethod
+    def status_for_dates(cls, service_send_date=None, service_return_date=None, delivery_date=None):
+        """Tarihlere göre durum: teslim > servisten dönüş > servise gönderim > beklemede"""
+        if delivery_date:
+            return cls.STATUS_DELIVERED
+        if service_return_date:
+            return cls.STATUS_RETURNED_FROM_SERVICE
+        if service_send_date:
+            return cls.STATUS_SENT_TO_SERVICE
+        return cls.STATUS_PENDING
+
+    def build_search_document(self):
+        parts = [
+            self.customer.company_name if self.customer else '',
+            self.brand.name if self.brand else '',
+            self.model,
+            self.serial_number,
+            self.service.name if self.service else '',
+        ]
+        return ' '.join(fold_text(part) for part in parts if part)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Veritabanındaki özet anahtarı; kaydetme/silmede sayaç farkı buna göre uygulanır
+        if all(field in instance.__dict__ for field in cls.ROLLUP_FIELDS):
+            instance._saved_rollup_key = tuple(getattr(instance, field) for field in cls.ROLLUP_FIELDS)
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.SEARCH_SOURCE_FIELDS):
+            self.search_document = self.build_search_document()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_document'}
+        super().save(*args, **kwargs)
+
+
+def refresh_search_documents(queryset, batch_size=500):
+    """Verilen kayıtların search_document alanını toplu olarak yeniden üretir."""
+    batch = []
+    queryset = queryset.select_related('customer', 'brand', 'service')
+    for record in queryset.iterator(chunk_size=batch_size):
+        document = record.build_search_document()
+        if document != record.search_document:
+            record.search_document = document
+            batch.append(record)
+        if len(batch) >= batch_size:
+            ServiceRecord.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        ServiceRecord.objects.bulk_update(batch, ['search_document'])
+
+
+# Model -> (kayıttaki ilişki adı, search_document'e giren ad alanı)
+SEARCH_RELATED_NAME_FIELDS = {
+    Customer: ('customer', 'company_name'),
+    Brand: ('brand', 'name'),
+    Service: ('service', 'name'),
+}
+
+
+@receiver(pre_save, sender=Customer)
+@receiver(pre_save, sender=Brand)
+@receiver(pre_save, sender=Service)
+def remember_search_name_change(sender, instance, update_fields=None, **kwargs):
+    """Ad alanı gerçekten değişiyorsa post_save için işaretler (tek sorgu)."""
+    name_field = SEARCH_RELATED_NAME_FIELDS[sender][1]
+    instance._search_name_changed = False
+    if instance.pk is None or (update_fields is not None and name_field not in update_fields):
+        return
+    old_name = sender.objects.filter(pk=instance.pk).values_list(name_field, flat=True).first()
+    instance._search_name_changed = old_name is not None and old_name != getattr(instance, name_field)
+
+
+# Müşteri/marka/servis adı değişince bağlı kayıtların arama metnini güncelle
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=Service)
+def refresh_related_search_documents(sender, instance, created, **kwargs):
+    if created or not getattr(instance, '_search_name_changed', False):
+        return
+    instance._search_name_changed = False
+    lookup = SEARCH_RELATED_NAME_FIELDS[sender][0]
+    refresh_search_documents(ServiceRecord.objects.filter(**{lookup: instance}))
+
+
+
+class ServiceRecordRollup(models.Model):
+    """Gün × durum × marka × servis firması bazında servis kaydı sayacı.
+
+    Kayıt oluşturma, güncelleme ve silme işlemlerinde aynı transaction
+    içinde artırılıp azaltılır (bkz. ``service.rollups``). Her anahtar için
+    tek satır vardır; marka/servis boş olabildiğinden tekillik, boş
+    kombinasyonların her biri için ayrı kısmi unique indeksle sağlanır.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=50)
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, null=True, blank=True)
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, null=True, blank=True)
+    record_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Servis Kaydı Özeti"
+        verbose_name_plural = "Servis Kaydı Özetleri"
+        indexes = [
+            models.Index(fields=['day', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'status', 'brand', 'service'],
+                condition=models.Q(brand__isnull=False, service__isnull=False),
+                name='service_rollup_bucket_unique',
+            ),
+            models.UniqueConstraint(
+                fields=['day', 'status', 'service'],
+                condition=models.Q(brand__isnull=True, service__isnull=False),
+                name='service_rollup_nobrand_unique',
+            ),
+            models.UniqueConstraint(
+                fields=['day', 'status', 'brand'],
+                condition=models.Q(brand__isnull=False, service__isnull=True),
+                name='service_rollup_noservice_unique',
+            ),
+            models.UniqueConstraint(
+                fields=['day', 'status'],
+                condition=models.Q(brand__isnull=True, service__isnull=True),
+                name='service_rollup_nofk_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.record_count}"
+
+
+# save() ile yapılan her yazma (API, admin, ORM) özet sayaçlarını günceller.
+# Toplu yollar (bulk_create/bulk_update/update) sinyal tetiklemez; onlar
+# farkları kendileri uygular (bkz. service/batch.py, service/transitions.py).
+@receiver(pre_save, sender=ServiceRecord)
+def remember_rollup_key(sender, instance, **kwargs):
+    if instance._state.adding or hasattr(instance, '_saved_rollup_key'):
+        return
+    # Kısmi yüklenmiş (only/defer) kayıt: eski anahtar veritabanından okunur
+    row = sender.objects.filter(pk=instance.pk).values_list(*sender.ROLLUP_FIELDS).first()
+    instance._saved_rollup_key = tuple(row) if row else None
+
+
+@receiver(post_save, sender=ServiceRecord)
+def move_rollup_on_save(sender, instance, created, update_fields=None, **kwargs):
+    from .rollups import rollup_key, track_rollup_change
+
+    old_key = None if created else getattr(instance, '_saved_rollup_key', None)
+    new_key = rollup_key(instance)
+    if old_key is not None and update_fields is not None:
+        # Yazılmayan alanlar veritabanında eski değerinde kalır
+        written = {name for field in update_fields for name in (field, f'{field}_id')}
+        new_key = tuple(
+            value if field in written else old
+            for field, value, old in zip(sender.ROLLUP_FIELDS, new_key, old_key)
+        )
+    track_rollup_change(old_key, new_key)
+    instance._saved_rollup_key = new_key
+
+
+@receiver(post_delete, sender=ServiceRecord)
+def decrement_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    from .rollups import apply_rollup_deltas, rollup_key
+
+    # Marka/servis silinirken kayıtların özet satırları da cascade ile silinir;
+    # azaltma o satırı silinen üst kayda bağlı olarak yeniden oluştururdu
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if issubclass(origin_model, (Brand, Service)):
+        return
+    key = getattr(instance, '_saved_rollup_key', None) or rollup_key(instance)
+    apply_rollup_deltas({key: -1})
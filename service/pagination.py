@@ -0,0 +1,51 @@
+from rest_framework.pagination import CursorPagination
+
+
+class BaseCursorPagination(CursorPagination):
+    """Sonsuz kaydırma için keyset (cursor) sayfalama.
+
+    OFFSET ve COUNT(*) kullanılmaz; her sayfa sıralama alanı üzerinden
+    indeksle bulunur. Aynı değere sahip satırlar ikinci alanla sıralanır.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        # ?ordering= (OrderingFilter) dikkate alınmaz: benzersiz olmayan bir alana
+        # göre sıralama sayfalar arasında satır atlatır/tekrarlatır
+        return tuple(self.ordering)
+
+
+class ServiceRecordCursorPagination(BaseCursorPagination):
+    ordering = ('-id',)
+
+
+class ServiceLogCursorPagination(BaseCursorPagination):
+    ordering = ('-change_date', '-id')
+
+
+class NotificationCursorPagination(BaseCursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class CursorPaginationOptInMixin:
+    """``?pagination=cursor`` ile istendiğinde cursor sayfalamaya geçer.
+
+    Parametre verilmezse view'ın varsayılan (sayfa numaralı) sayfalaması
+    kullanılır, böylece mevcut istemciler etkilenmez.
+    """
+    cursor_pagination_class = None
+
+    def wants_cursor_pagination(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or 'cursor' in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.cursor_pagination_class is not None and self.wants_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
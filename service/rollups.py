@@ -0,0 +1,97 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import ServiceRecord, ServiceRecordRollup
+
+ROLLUP_FIELDS = ServiceRecord.ROLLUP_FIELDS
+
+
+def rollup_key(record):
+    """Kaydın özet tablosundaki anahtarı: (gün, durum, marka id, servis id)."""
+    return tuple(getattr(record, field) for field in ROLLUP_FIELDS)
+
+
+def apply_rollup_deltas(deltas):
+    """``{anahtar: fark}`` sözlüğündeki farkları özet tablosuna uygular."""
+    # Kilit sırası sabit olsun diye anahtarlar sıralanır
+    for key, delta in sorted(deltas.items(), key=lambda item: str(item[0])):
+        if not delta:
+            continue
+        day, status, brand_id, service_id = key
+        lookup = {'day': day, 'status': status, 'brand_id': brand_id, 'service_id': service_id}
+        bucket = ServiceRecordRollup.objects.filter(**lookup)
+        if bucket.update(record_count=F('record_count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                ServiceRecordRollup.objects.create(record_count=delta, **lookup)
+        except IntegrityError:
+            # Aynı anda başka bir işlem satırı oluşturdu; unique indeks sayesinde artık var
+            bucket.update(record_count=F('record_count') + delta)
+
+
+def track_rollup_change(old_key, new_key):
+    """Güncellenen kayıt için eski anahtarı azaltıp yenisini artırır."""
+    if old_key == new_key:
+        return
+    deltas = Counter()
+    if old_key is not None:
+        deltas[old_key] -= 1
+    if new_key is not None:
+        deltas[new_key] += 1
+    apply_rollup_deltas(deltas)
+
+
+def live_counts():
+    rows = ServiceRecord.objects.values(*ROLLUP_FIELDS).annotate(total=Count('id'))
+    return {tuple(row[field] for field in ROLLUP_FIELDS): row['total'] for row in rows}
+
+
+def rollup_counts():
+    rows = ServiceRecordRollup.objects.values(
+        'day', 'status', 'brand_id', 'service_id'
+    ).annotate(total=Sum('record_count'))
+    return {
+        (row['day'], row['status'], row['brand_id'], row['service_id']): row['total']
+        for row in rows
+        if row['total']
+    }
+
+
+@transaction.atomic
+def rebuild_rollups():
+    """Özet tablosunu canlı kayıtlardan baştan oluşturur; satır sayısını döner."""
+    ServiceRecordRollup.objects.all().delete()
+    rows = [
+        ServiceRecordRollup(
+            day=day, status=status, brand_id=brand_id, service_id=service_id,
+            record_count=total,
+        )
+        for (day, status, brand_id, service_id), total in live_counts().items()
+    ]
+    ServiceRecordRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def duplicate_buckets():
+    """Birden fazla satırı olan anahtarlar: ``{anahtar: satır sayısı}``"""
+    rows = ServiceRecordRollup.objects.values(
+        'day', 'status', 'brand_id', 'service_id'
+    ).annotate(rows=Count('id')).filter(rows__gt=1)
+    return {
+        (row['day'], row['status'], row['brand_id'], row['service_id']): row['rows']
+        for row in rows
+    }
+
+
+def verify_rollups():
+    """Özet ile canlı sayıları karşılaştırır; uyuşmayan anahtarları döner."""
+    live = live_counts()
+    stored = rollup_counts()
+    return {
+        key: {'live': live.get(key, 0), 'rollup': stored.get(key, 0)}
+        for key in live.keys() | stored.keys()
+        if live.get(key, 0) != stored.get(key, 0)
+    }
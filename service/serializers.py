@@ -1,9 +1,12 @@
 ﻿from rest_framework import serializers
-import datetime
+from django.db import transaction
 
 from api.serializers import BrandSerializer, CustomerSerializer
 from .models import ServiceLog, ServiceRecord, Service
+from . import logcodec
+from .diff import FieldDiff
 from api.models import Brand, Customer
+from accounts import events
 
 
 # --- SERVICE SERIALIZER ---
@@ -16,19 +19,52 @@ class ServiceSerializer(serializers.ModelSerializer):
 
 
 # --- LOG SERIALIZER ---
+class ServiceLogListSerializer(serializers.ListSerializer):
+    """Loglardaki ForeignKey id'lerini tüm liste için tek seferde çözer."""
+
+    def to_representation(self, data):
+        logs = list(data.all() if hasattr(data, 'all') else data)
+        self.child.related_labels = logcodec.resolve_labels(log.changed_fields for log in logs)
+        return super().to_representation(logs)
+
+
 class ServiceLogSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField()  # kullanıcı adını göstermek için
+    changed_fields = serializers.SerializerMethodField()
 
     class Meta:
         model = ServiceLog
         fields = ['id', 'user', 'change_date', 'changed_fields']
         ref_name = "ServiceLogSerializer"
+        list_serializer_class = ServiceLogListSerializer
+
+    def get_changed_fields(self, obj):
+        # Sıkıştırılmış (v2) kayıtlar eski biçime açılır, eski kayıtlar aynen döner
+        labels = getattr(self, 'related_labels', None)
+        if labels is None:
+            labels = logcodec.resolve_labels([obj.changed_fields])
+        return logcodec.to_display(obj.changed_fields, labels)
+
+
+class ServiceLogSummarySerializer(serializers.ModelSerializer):
+    """Kayıt detayında son değişikliğin özeti: kim, ne zaman, hangi alanlar"""
+    user = serializers.StringRelatedField()
+    changed_field_names = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ServiceLog
+        fields = ['id', 'user', 'change_date', 'changed_field_names']
+        ref_name = "ServiceLogSummarySerializer"
+
+    def get_changed_field_names(self, obj):
+        return logcodec.changed_field_names(obj.changed_fields)
 
 
 # --- SERVICE RECORD SERIALIZER ---
 class ServiceRecordSerializer(serializers.ModelSerializer):
-    # Her servis kaydının loglarını dahil et
-    logs = serializers.SerializerMethodField()
+    # Loglar gömülmez; tam geçmiş için Services/<id>/timeline/ kullanılır
+    log_count = serializers.SerializerMethodField()
+    latest_change = serializers.SerializerMethodField()
     customer = CustomerSerializer(read_only=True)
     brand = BrandSerializer(read_only=True)
     service = ServiceSerializer(read_only=True)
@@ -70,15 +106,19 @@ class ServiceRecordSerializer(serializers.ModelSerializer):
             'created_user',             # kaydı oluşturan kullanıcı
             'status',                   # durum
             'updated_at',               # güncellenme tarihi
-            'logs',  # 🔹 Loglar burada eklendi
+            'log_count',                # log sayısı
+            'latest_change',            # son değişiklik özeti
 
         ]
 
 
 
+    @transaction.atomic
     def create(self, validated_data):
         try:
             user = self.context['request'].user
+            # Bildirim hedeflemesi kaydı oluşturan kullanıcıyı kullanır
+            validated_data.setdefault('created_user', user)
             
             # Teslim tarihi varsa otomatik olarak durumu 'delivered' yap
             if validated_data.get('delivery_date'):
@@ -86,23 +126,11 @@ class ServiceRecordSerializer(serializers.ModelSerializer):
             
             instance = super().create(validated_data)
 
-            # Tarihleri JSON formatına dönüştür
-            changed_fields = {}
-            for field in instance._meta.fields:
-                if field.name == "id":
-                    continue
-                value = getattr(instance, field.name)
-
-                # Eğer ManyToOne (ForeignKey) ise sadece id veya str(value) al
-                if hasattr(value, "id"):
-                    value = value.id  # veya str(value) istersen ismi alabilirsin
-                
-                # Tarihleri string formatına çevir
-                if isinstance(value, (datetime.date, datetime.datetime)):
-                    value = value.isoformat()
-                
-                changed_fields[field.name] = value
-
+            # Oluşturma anındaki değerler (ForeignKey için sadece id)
+            changed_fields = logcodec.encode_snapshot({
+                field.name: getattr(instance, field.attname)
+                for field in instance._meta.concrete_fields
+            })
 
             # Log kaydı oluştur
             ServiceLog.objects.create(
@@ -129,86 +157,36 @@ class ServiceRecordSerializer(serializers.ModelSerializer):
             })
 
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         try:
             user = self.context['request'].user
 
-            # Güncelleme öncesi eski değerleri al
-            eski_degerler = {}
-            for field in instance._meta.fields:
-                field_name = field.name
-                old_value = getattr(instance, field_name)
-                
-                # ForeignKey için obje referansını sakla
-                if hasattr(old_value, 'pk') and old_value is not None:
-                    eski_degerler[field_name] = {
-                        'id': old_value.pk,
-                        'str': str(old_value)
-                    }
-                else:
-                    eski_degerler[field_name] = old_value
-
-            # Otomatik durum güncellemesi
-            servise_gonderim_tarihi = validated_data.get("service_send_date")
-            servisten_gelis_tarihi = validated_data.get("service_return_date")
-            teslim_tarihi = validated_data.get("delivery_date")
-
-            if teslim_tarihi:
-                validated_data["status"] = ServiceRecord.STATUS_DELIVERED
-            elif servisten_gelis_tarihi:
-                validated_data["status"] = ServiceRecord.STATUS_RETURNED_FROM_SERVICE
-            elif servise_gonderim_tarihi:
-                validated_data["status"] = ServiceRecord.STATUS_SENT_TO_SERVICE
-            else:
-                validated_data["status"] = ServiceRecord.STATUS_PENDING
-
-            # Güncelle
-            instance = super().update(instance, validated_data)
-
-            # Değişen alanları bul
-            changed_fields = {}
-            for field in instance._meta.fields:
-                field_name = field.name
-                old_value = eski_degerler.get(field_name)
-                new_value = getattr(instance, field_name)
-
-                # ForeignKey kontrolü (customer, brand gibi)
-                if hasattr(new_value, 'pk'):
-                    old_val = old_value if old_value else None
-                    new_val = {'id': new_value.pk, 'str': str(new_value)} if new_value else None
-                    
-                    # Karşılaştırma için ID'leri kullan
-                    old_id = old_val['id'] if old_val and isinstance(old_val, dict) else None
-                    new_id = new_val['id'] if new_val else None
-                    
-                    if old_id != new_id:
-                        changed_fields[field_name] = {
-                            'old': old_val,
-                            'new': new_val
-                        }
-                else:
-                    # Tarihleri string formatına çevir
-                    old_val = old_value
-                    new_val = new_value
-                    
-                    if isinstance(old_val, (datetime.date, datetime.datetime)):
-                        old_val = old_val.isoformat()
-                    if isinstance(new_val, (datetime.date, datetime.datetime)):
-                        new_val = new_val.isoformat()
-
-                    if old_val != new_val:
-                        changed_fields[field_name] = {
-                            'old': old_val,
-                            'new': new_val
-                        }
-
-            # Sadece değişiklik varsa log kaydet
-            if changed_fields:
+            # Güncelleme öncesi ham değerleri al (ilişkili nesneler yüklenmez)
+            degisiklikler = FieldDiff(instance)
+
+            # Otomatik durum güncellemesi; kısmi güncellemede gönderilmeyen
+            # tarihler kayıttaki değerleriyle hesaba katılır
+            validated_data["status"] = ServiceRecord.status_for_dates(**{
+                field: validated_data.get(field, getattr(instance, field))
+                for field in ('service_send_date', 'service_return_date', 'delivery_date')
+            })
+
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+
+            # Sadece değişen kolonları yaz ve log kaydet; özet sayaçları
+            # kaydetme sinyaliyle kayar (bkz. service/models.py)
+            changes = degisiklikler.changes()
+            if changes:
+                instance.save(update_fields=[*changes, 'updated_at'])
                 ServiceLog.objects.create(
                     service_record=instance,
                     user=user,
-                    changed_fields=changed_fields
+                    changed_fields=logcodec.encode_changes(changes)
                 )
+            if 'status' in changes:
+                events.broadcast_status_changes([(instance.id, *changes['status'])])
 
             return instance
 
@@ -217,6 +195,91 @@ class ServiceRecordSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"error": "Kayıt güncellenirken bir hata oluştu."})
 
 
-    def get_logs(self, obj):
-        logs = obj.logs.order_by('-id')  # id'ye göre ters
-        return ServiceLogSerializer(logs, many=True).data
\ No newline at end of file
+    def get_log_count(self, obj):
+        # View tarafında annotate edilmişse ek sorgu atılmaz
+        log_count = getattr(obj, 'log_count', None)
+        return obj.logs.count() if log_count is None else log_count
+
+    def get_latest_change(self, obj):
+        latest = obj.logs.select_related('user').order_by('-change_date', '-id').first()
+        return ServiceLogSummarySerializer(latest).data if latest else None
+
+
+# --- SERVICE RECORD BATCH SERIALIZER ---
+class ServiceRecordBatchItemSerializer(serializers.ModelSerializer):
+    """Toplu oluşturma/güncelleme öğesi.
+
+    ``id`` varsa öğe o kaydın kısmi güncellemesidir. ForeignKey'ler sadece
+    id olarak doğrulanır; varlık kontrolü ``batch.apply_record_batch``
+    içinde model başına tek ``in_bulk`` ile yapılır.
+    """
+    id = serializers.IntegerField(required=False)
+    customer_id = serializers.IntegerField()
+    brand_id = serializers.IntegerField()
+    service_id = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = ServiceRecord
+        ref_name = "ServiceRecordBatchItemSerializer"
+        fields = [
+            'id', 'customer_id', 'brand_id', 'service_id',
+            'model', 'serial_number', 'accessories', 'arrival_date', 'issue',
+            'service_send_date', 'service_operation', 'service_return_date', 'delivery_date',
+        ]
+
+
+# --- SERVICE RECORD TRANSITION SERIALIZER ---
+class ServiceRecordTransitionSerializer(serializers.Serializer):
+    """Toplu durum geçişi: ``send`` (servise gönder), ``return`` (servisten döndü), ``deliver`` (teslim)"""
+    ids = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=1000)
+    transition = serializers.ChoiceField(choices=['send', 'return', 'deliver'])
+    date = serializers.DateField(required=False)
+    service_id = serializers.PrimaryKeyRelatedField(
+        queryset=Service.objects.all(),
+        source='service',
+        required=False,
+    )
+
+    def validate(self, attrs):
+        if attrs['transition'] == 'send' and not attrs.get('service'):
+            raise serializers.ValidationError({'service_id': "Servise gönderim için servis firması zorunlu."})
+        return attrs
+
+
+# --- SERVICE RECORD LIST SERIALIZER ---
+class ServiceRecordListSerializer(serializers.ModelSerializer):
+    """Liste görünümü için hafif serializer: loglar gömülmez.
+
+    İlişkili customer/brand/service alanları view'daki ``select_related``
+    ile tek sorguda gelir. ``log_count`` ve ``last_change`` yalnızca
+    queryset üzerinde annotate edilmişse çıktıya eklenir.
+    """
+    customer = CustomerSerializer(read_only=True)
+    brand = BrandSerializer(read_only=True)
+    service = ServiceSerializer(read_only=True)
+    log_count = serializers.IntegerField(read_only=True)
+    last_change = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = ServiceRecord
+        ref_name = "ServiceRecordListSerializer"
+        fields = [
+            'id',
+            'customer',
+            'brand',
+            'service',
+            'model',
+            'serial_number',
+            'accessories',
+            'arrival_date',
+            'issue',
+            'service_send_date',
+            'service_operation',
+            'service_return_date',
+            'delivery_date',
+            'created_user',
+            'status',
+            'updated_at',
+            'log_count',
+            'last_change',
+        ]
\ No newline at end of file
@@ -1,3 +1,664 @@
-from django.test import TestCase
+import io
+import json
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import Brand, Customer
+from . import logcodec
+from .benchmark import check_budgets, run_benchmarks, seed_dataset
+from .diff import FieldDiff
+from .models import Service, ServiceLog, ServiceRecord, ServiceRecordRollup
+from .rollups import apply_rollup_deltas, rebuild_rollups, verify_rollups
+
+
+class DashboardStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        customer = Customer.objects.create(company_code='C1', company_name='Müşteri')
+        acer = Brand.objects.create(name='Acer')
+        hp = Brand.objects.create(name='HP')
+        today = timezone.localdate()
+
+        def record(brand, status, arrival_date):
+            return ServiceRecord.objects.create(
+                customer=customer, brand=brand, model='M',
+                status=status, arrival_date=arrival_date,
+            )
+
+        record(acer, ServiceRecord.STATUS_PENDING, today)
+        record(acer, ServiceRecord.STATUS_PENDING, today - timedelta(days=3))
+        record(acer, ServiceRecord.STATUS_SENT_TO_SERVICE, today - timedelta(days=10))
+        record(hp, ServiceRecord.STATUS_RETURNED_FROM_SERVICE, today - timedelta(days=40))
+        record(hp, ServiceRecord.STATUS_DELIVERED, today - timedelta(days=400))
+        rebuild_rollups()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_dashboard_stats_uses_two_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard-stats'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_dashboard_stats_counts(self):
+        data = self.client.get(reverse('dashboard-stats')).data
+        today = timezone.localdate()
+        first_of_month = today.replace(day=1)
+        arrivals = [today, today - timedelta(days=3), today - timedelta(days=10),
+                    today - timedelta(days=40), today - timedelta(days=400)]
+
+        self.assertEqual(data['total_records'], 5)
+        self.assertEqual(data['weekly_records'], 2)
+        self.assertEqual(data['monthly_records'], sum(d >= first_of_month for d in arrivals))
+        self.assertEqual(data['status_summary'], {
+            'pending': 2,
+            'in_service': 1,
+            'waiting_delivery': 1,
+            'delivered': 1,
+        })
+        self.assertEqual(data['top_brands'][0], {'brand__name': 'Acer', 'count': 3})
+
+
+class ServiceRecordSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        cls.customer = Customer.objects.create(company_code='C1', company_name='Işık Bilgisayar')
+        other_customer = Customer.objects.create(company_code='C2', company_name='Ege Ofis')
+        cls.brand = Brand.objects.create(name='Acer')
+        cls.service = Service.objects.create(name='Çağrı Teknik')
+        cls.record = ServiceRecord.objects.create(
+            customer=cls.customer, brand=cls.brand, model='Aspire 5', serial_number='SN-001',
+            service=cls.service, arrival_date=timezone.localdate(),
+        )
+        ServiceRecord.objects.create(
+            customer=other_customer, brand=Brand.objects.create(name='HP'), model='ProBook',
+            serial_number='XY-999', arrival_date=timezone.localdate(),
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, term):
+        response = self.client.get(reverse('kayit-list-create'), {'search': term})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_matches_each_source_field(self):
+        # Büyük/küçük harf ve Türkçe karakterler katlanarak aranır
+        for term in ['ışık', 'ISIK', 'acer', 'aspire', 'sn-001', 'cagri', 'ışık aspire']:
+            self.assertEqual(self.search(term), [self.record.id], term)
+        self.assertEqual(self.search('yok'), [])
+
+    def test_renaming_related_objects_refreshes_documents(self):
+        self.customer.company_name = 'Anadolu Yazılım'
+        self.customer.save()
+        self.brand.name = 'Lenovo'
+        self.brand.save()
+        self.assertEqual(self.search('anadolu lenovo'), [self.record.id])
+        self.assertEqual(self.search('ışık'), [])
+
+    def test_saving_without_rename_does_not_rewrite_documents(self):
+        self.customer.phone = '555'
+        with CaptureQueriesContext(connection) as context:
+            self.customer.save()
+            self.brand.save()
+        self.assertFalse([q for q in context.captured_queries if 'service_servicerecord' in q['sql']])
+        # Ad alanı update_fields'ta yoksa eski ad da okunmaz
+        with CaptureQueriesContext(connection) as context:
+            self.service.save(update_fields=['phone'])
+        self.assertFalse([q for q in context.captured_queries if q['sql'].startswith('SELECT')])
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        customer = Customer.objects.create(company_code='C1', company_name='Müşteri')
+        brand = Brand.objects.create(name='Acer')
+        cls.records = [
+            ServiceRecord.objects.create(customer=customer, brand=brand, model=f'M{index}', arrival_date=timezone.localdate())
+            for index in range(12)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('kayit-list-create')
+
+    def test_page_number_pagination_stays_the_default(self):
+        data = self.client.get(self.url).data
+        self.assertEqual(data['count'], 12)
+        self.assertEqual(len(data['results']), 10)
+
+    def test_cursor_pages_are_stable_when_records_are_added(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 5})
+        self.assertNotIn('count', response.data)
+        ids = [item['id'] for item in response.data['results']]
+
+        # Sayfalar arasında eklenen kayıt sonraki sayfaları kaydırmaz
+        record = self.records[0]
+        ServiceRecord.objects.create(customer=record.customer, brand=record.brand, model='Yeni', arrival_date=record.arrival_date)
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            ids += [item['id'] for item in response.data['results']]
+            next_url = response.data['next']
+        self.assertEqual(ids, sorted((record.id for record in self.records), reverse=True))
+
+    def test_cursor_mode_ignores_ordering_parameter(self):
+        ServiceRecord.objects.filter(id__in=[record.id for record in self.records[::2]]).update(model='Aynı')
+        ids = []
+        next_url = f"{self.url}?pagination=cursor&page_size=4&ordering=model"
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.data['results']]
+            next_url = response.data['next']
+        self.assertEqual(ids, sorted((record.id for record in self.records), reverse=True))
+
+        # Sayfa numaralı modda sıralama parametresi çalışmaya devam eder
+        data = self.client.get(self.url, {'ordering': '-model'}).data
+        self.assertEqual(data['results'][0]['model'], 'M9')
+
+
+class ServiceLogTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='secret')
+        self.other = User.objects.create_user('other', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        customer = Customer.objects.create(company_code='C1', company_name='Müşteri')
+        self.brand = Brand.objects.create(name='Acer')
+        self.record = ServiceRecord.objects.create(
+            customer=customer, brand=self.brand, model='M1', arrival_date=timezone.localdate(),
+        )
+        self.detail = reverse('kayit-detail', args=[self.record.id])
+        self.timeline = reverse('kayit-timeline', args=[self.record.id])
+
+    def add_log(self, changes, user, days_ago=0):
+        log = ServiceLog.objects.create(
+            service_record=self.record, user=user, changed_fields=logcodec.encode_changes(changes),
+        )
+        ServiceLog.objects.filter(id=log.id).update(change_date=timezone.now() - timedelta(days=days_ago))
+        return log
+
+    def test_update_writes_only_changed_columns_and_skips_empty_logs(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(self.detail, {'model': 'M1'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.record.logs.exists())
+        self.assertFalse([q for q in context.captured_queries if q['sql'].startswith('UPDATE "service_servicerecord"')])
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.patch(self.detail, {'model': 'M2'}, format='json')
+        update, = [q['sql'] for q in context.captured_queries if q['sql'].startswith('UPDATE "service_servicerecord"')]
+        self.assertIn('"model"', update)
+        self.assertNotIn('"issue"', update)
+        log = self.record.logs.get()
+        self.assertEqual(log.changed_fields, {'v': 2, 'c': {'mo': ['M1', 'M2']}})
+
+    def test_partial_update_keeps_status_from_stored_dates(self):
+        ServiceRecord.objects.filter(id=self.record.id).update(
+            status=ServiceRecord.STATUS_DELIVERED, delivery_date=timezone.localdate(),
+        )
+        rebuild_rollups()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.detail, {'model': 'M2'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.status, ServiceRecord.STATUS_DELIVERED)
+        self.assertEqual(self.record.logs.get().changed_fields, {'v': 2, 'c': {'mo': ['M1', 'M2']}})
+        self.assertEqual(verify_rollups(), {})
+
+        # Tarih açıkça boşaltılırsa durum yeniden hesaplanır
+        self.client.patch(self.detail, {'delivery_date': None}, format='json')
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.status, ServiceRecord.STATUS_PENDING)
+        self.assertEqual(verify_rollups(), {})
+
+    def test_field_diff_reports_raw_changes(self):
+        diff = FieldDiff(self.record)
+        self.assertEqual(diff.changes(), {})
+        other_brand = Brand.objects.create(name='HP')
+        self.record.brand = other_brand
+        self.record.search_document = 'yok sayılır'
+        self.assertEqual(diff.changes(), {'brand': (self.brand.id, other_brand.id)})
+
+    def test_logcodec_round_trip(self):
+        long_issue = 'Ekran açılmıyor. ' * 30
+        day = timezone.localdate()
+        payload = logcodec.encode_changes({
+            'issue': ('', long_issue), 'delivery_date': (None, day), 'brand': (1, 2), 'unknown': (1, 2),
+        })
+        self.assertEqual(set(payload['c']), {'is', 'dd', 'br'})
+        self.assertIn('z', payload['c']['is'][1])
+        self.assertEqual(logcodec.decode(payload), ('changes', {
+            'issue': ('', long_issue), 'delivery_date': (None, day.isoformat()), 'brand': (1, 2),
+        }))
+
+        snapshot = logcodec.encode_snapshot({'model': 'M1', 'issue': '', 'serial_number': None})
+        self.assertEqual(snapshot, {'v': 2, 's': {'mo': 'M1'}})
+        self.assertEqual(logcodec.decode(snapshot), ('snapshot', {'model': 'M1'}))
+        self.assertEqual(logcodec.changed_field_names({'model': {'old': 'a', 'new': 'b'}}), ['model'])
+
+    def test_field_filter_matches_new_and_legacy_logs(self):
+        compact = self.add_log({'model': ('M1', 'M2')}, self.user)
+        legacy = ServiceLog.objects.create(
+            service_record=self.record, user=self.user, changed_fields={'model': {'old': 'M0', 'new': 'M1'}},
+        )
+        snapshot = ServiceLog.objects.create(
+            service_record=self.record, user=self.user, changed_fields=logcodec.encode_snapshot({'model': 'M0'}),
+        )
+        self.add_log({'issue': ('a', 'b')}, self.user)
+        matching = ServiceLog.objects.filter(logcodec.field_filter('model'))
+        self.assertEqual(set(matching), {compact, legacy, snapshot})
+
+    def test_timeline_filters(self):
+        model_change = self.add_log({'model': ('M1', 'M2')}, self.user, days_ago=10)
+        brand_change = self.add_log({'brand': (self.brand.id, self.brand.id)}, self.other, days_ago=5)
+        issue_change = self.add_log({'issue': ('a', 'b')}, self.user)
+
+        def ids(**params):
+            response = self.client.get(self.timeline, params)
+            self.assertEqual(response.status_code, 200, response.data)
+            results = response.data['results'] if isinstance(response.data, dict) else response.data
+            return [item['id'] for item in results]
+
+        self.assertEqual(ids(), [issue_change.id, brand_change.id, model_change.id])
+        self.assertEqual(ids(field='model,brand'), [brand_change.id, model_change.id])
+        self.assertEqual(ids(user='other'), [brand_change.id])
+        self.assertEqual(ids(user=str(self.user.id)), [issue_change.id, model_change.id])
+        since = (timezone.localdate() - timedelta(days=6)).isoformat()
+        until = (timezone.localdate() - timedelta(days=1)).isoformat()
+        self.assertEqual(ids(since=since), [issue_change.id, brand_change.id])
+        self.assertEqual(ids(since=since, until=until), [brand_change.id])
+        self.assertEqual(ids(last='2'), [issue_change.id, brand_change.id])
+        self.assertEqual(ids(pagination='cursor', page_size='1'), [issue_change.id])
+
+        response = self.client.get(self.timeline, {'field': 'brand'})
+        self.assertEqual(response.data['results'][0]['changed_fields']['brand']['new'], {'id': self.brand.id, 'str': str(self.brand)})
+
+    def test_timeline_rejects_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.timeline, {'since': '2026-13-45'}).status_code, 400)
+        self.assertEqual(self.client.get(self.timeline, {'until': 'dün'}).status_code, 400)
+        self.assertEqual(self.client.get(self.timeline, {'last': '-1'}).status_code, 400)
+        missing = reverse('kayit-timeline', args=[self.record.id + 100])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+
+class ServiceRecordRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.customer = Customer.objects.create(company_code='C1', company_name='Müşteri')
+        self.brand = Brand.objects.create(name='Acer')
+
+    def test_rollup_follows_create_update_and_delete(self):
+        response = self.client.post(reverse('kayit-list-create'), {
+            'customer_id': self.customer.id,
+            'brand_id': self.brand.id,
+            'model': 'M',
+            'arrival_date': '2026-01-05',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(verify_rollups(), {})
+
+        detail = reverse('kayit-detail', args=[response.data['id']])
+        self.client.patch(detail, {'service_send_date': '2026-01-06'}, format='json')
+        self.assertEqual(verify_rollups(), {})
+
+        self.client.delete(detail)
+        self.assertEqual(verify_rollups(), {})
+
+    def test_batch_create_and_update_keep_rollups(self):
+        records = [
+            {'customer_id': self.customer.id, 'brand_id': self.brand.id,
+             'model': f'M{i}', 'arrival_date': '2026-01-05'}
+            for i in range(3)
+        ]
+        response = self.client.post(reverse('kayit-batch'), {'records': records}, format='json')
+        self.assertEqual(response.status_code, 201)
+        created = response.data['created']
+        self.assertEqual(len(created), 3)
+        self.assertEqual(verify_rollups(), {})
+
+        response = self.client.post(reverse('kayit-batch'), {'records': [
+            {'id': created[0], 'delivery_date': '2026-01-09'},
+            {'id': created[1], 'brand_id': 0},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertEqual(ServiceRecord.objects.get(id=created[0]).status, ServiceRecord.STATUS_PENDING)
+
+        response = self.client.post(reverse('kayit-batch'), {'records': [
+            {'id': created[0], 'delivery_date': '2026-01-09'},
+        ]}, format='json')
+        self.assertEqual(response.data['updated'], [created[0]])
+        self.assertEqual(ServiceRecord.objects.get(id=created[0]).status, ServiceRecord.STATUS_DELIVERED)
+        self.assertEqual(verify_rollups(), {})
+
+    def test_orm_and_admin_writes_keep_rollups(self):
+        record = ServiceRecord.objects.create(
+            customer=self.customer, brand=self.brand, model='M', arrival_date=timezone.localdate(),
+        )
+        self.assertEqual(verify_rollups(), {})
+
+        # Sadece bazı alanları yazan ve kısmi yüklenmiş kayıtlar da özet anahtarını kaydırır
+        record.status = ServiceRecord.STATUS_DELIVERED
+        record.model = 'yazılmaz'
+        record.save(update_fields=['status'])
+        self.assertEqual(verify_rollups(), {})
+        partial = ServiceRecord.objects.only('id', 'model').get(pk=record.pk)
+        partial.arrival_date = timezone.localdate() - timedelta(days=3)
+        partial.save()
+        self.assertEqual(verify_rollups(), {})
+
+        admin = User.objects.create_superuser('admin', password='secret')
+        self.client.force_login(admin)
+        response = self.client.post(reverse('admin:service_servicerecord_change', args=[record.id]), {
+            'customer': self.customer.id, 'brand': self.brand.id, 'model': 'M',
+            'arrival_date': str(timezone.localdate()), 'status': ServiceRecord.STATUS_PENDING,
+        })
+        self.assertEqual(response.status_code, 302)
+        record.refresh_from_db()
+        self.assertEqual(record.status, ServiceRecord.STATUS_PENDING)
+        self.assertEqual(verify_rollups(), {})
+
+    def test_orm_created_record_deleted_through_api(self):
+        record = ServiceRecord.objects.create(
+            customer=self.customer, brand=self.brand, model='M', arrival_date=timezone.localdate(),
+        )
+        response = self.client.delete(reverse('kayit-detail', args=[record.id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(verify_rollups(), {})
+        self.assertFalse(ServiceRecordRollup.objects.filter(record_count__lt=0).exists())
+        self.assertEqual(self.client.get(reverse('dashboard-stats')).data['total_records'], 0)
+
+    def test_rollup_follows_status_brand_and_day_changes(self):
+        other_brand = Brand.objects.create(name='HP')
+        service = Service.objects.create(name='Servis')
+        response = self.client.post(reverse('kayit-list-create'), {
+            'customer_id': self.customer.id,
+            'brand_id': self.brand.id,
+            'model': 'M',
+            'arrival_date': '2026-01-05',
+        }, format='json')
+        detail = reverse('kayit-detail', args=[response.data['id']])
+
+        for change in (
+            {'service_id': service.id, 'service_send_date': '2026-01-06'},
+            {'brand_id': other_brand.id},
+            {'arrival_date': '2026-01-02'},
+            {'delivery_date': '2026-01-09'},
+        ):
+            self.assertEqual(self.client.patch(detail, change, format='json').status_code, 200)
+            self.assertEqual(verify_rollups(), {})
+        self.assertEqual(ServiceRecordRollup.objects.filter(record_count__gt=0).count(), 1)
+
+    def test_deleting_brand_or_service_with_records_keeps_rollups(self):
+        service = Service.objects.create(name='Servis')
+        for service_id in (None, service.id):
+            ServiceRecord.objects.create(
+                customer=self.customer, brand=self.brand, service_id=service_id,
+                model='M', arrival_date='2026-01-05',
+                service_send_date='2026-01-06' if service_id else None,
+            )
+        rebuild_rollups()
+
+        service.delete()
+        self.assertEqual(verify_rollups(), {})
+        self.brand.delete()
+        self.assertEqual(verify_rollups(), {})
+        self.assertFalse(ServiceRecordRollup.objects.exists())
+
+    def test_bucket_is_unique_even_with_empty_service(self):
+        key = (timezone.localdate(), ServiceRecord.STATUS_PENDING, self.brand.id, None)
+        apply_rollup_deltas({key: 1})
+        apply_rollup_deltas({key: 1})
+        self.assertEqual(ServiceRecordRollup.objects.get().record_count, 2)
+        with self.assertRaises(IntegrityError):
+            ServiceRecordRollup.objects.create(day=key[0], status=key[1], brand=self.brand, record_count=1)
+
+    def test_rebuild_command_verifies_and_repairs(self):
+        ServiceRecord.objects.create(
+            customer=self.customer, brand=self.brand, model='M', arrival_date='2026-01-05',
+        )
+        call_command('rebuild_service_rollups', stdout=io.StringIO())
+        call_command('rebuild_service_rollups', '--verify-only', stdout=io.StringIO())
+
+        ServiceRecordRollup.objects.update(record_count=5)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_service_rollups', '--verify-only', stdout=io.StringIO(), stderr=io.StringIO())
+        call_command('rebuild_service_rollups', stdout=io.StringIO())
+        self.assertEqual(verify_rollups(), {})
+
+class ServiceRecordTransitionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        customer = Customer.objects.create(company_code='C1', company_name='Müşteri')
+        brand = Brand.objects.create(name='Acer')
+        self.service = Service.objects.create(name='Servis')
+        today = timezone.localdate()
+        self.pending = ServiceRecord.objects.create(
+            customer=customer, brand=brand, model='M1', arrival_date=today,
+        )
+        self.delivered = ServiceRecord.objects.create(
+            customer=customer, brand=brand, model='M2', arrival_date=today,
+            status=ServiceRecord.STATUS_DELIVERED, delivery_date=today,
+        )
+        rebuild_rollups()
+        self.url = reverse('kayit-transition')
+
+    def test_send_updates_eligible_and_skips_the_rest(self):
+        missing_id = self.delivered.id + 100
+        response = self.client.post(self.url, {
+            'ids': [self.pending.id, self.delivered.id, missing_id],
+            'transition': 'send',
+            'service_id': self.service.id,
+            'date': '2026-10-01',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], [self.pending.id])
+        self.assertEqual([item['id'] for item in response.data['skipped']], [self.delivered.id, missing_id])
+
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.status, ServiceRecord.STATUS_SENT_TO_SERVICE)
+        self.assertEqual(self.pending.service, self.service)
+        self.assertEqual(str(self.pending.service_send_date), '2026-10-01')
+        self.assertIn('servis', self.pending.search_document)
+        self.assertEqual(self.pending.logs.count(), 1)
+        self.delivered.refresh_from_db()
+        self.assertEqual(self.delivered.status, ServiceRecord.STATUS_DELIVERED)
+
+        # Özet tablo canlı sayılarla aynı kalır
+        self.assertEqual(verify_rollups(), {})
+        summary = self.client.get(reverse('dashboard-stats')).data['status_summary']
+        self.assertEqual(summary['pending'], 0)
+        self.assertEqual(summary['in_service'], 1)
+        self.assertEqual(summary['delivered'], 1)
+
+    def test_repeating_a_transition_changes_nothing(self):
+        body = {'ids': [self.pending.id], 'transition': 'deliver'}
+        self.assertEqual(self.client.post(self.url, body, format='json').data['updated'], [self.pending.id])
+        response = self.client.post(self.url, body, format='json')
+        self.assertEqual(response.data['updated'], [])
+        self.assertEqual(len(response.data['skipped']), 1)
+        self.assertEqual(verify_rollups(), {})
+
+    def test_send_requires_service(self):
+        response = self.client.post(self.url, {'ids': [self.pending.id], 'transition': 'send'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('service_id', response.data)
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.status, ServiceRecord.STATUS_PENDING)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.customer = Customer.objects.create(company_code='C1', company_name='Müşteri')
+        self.record = ServiceRecord.objects.create(
+            customer=self.customer, brand=Brand.objects.create(name='Acer'),
+            model='M', arrival_date=timezone.localdate(),
+        )
+
+    def test_list_returns_304_until_embedded_customer_changes(self):
+        url = reverse('kayit-list-create')
+        etag = self.client.get(url, {'log_stats': 1})['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'log_stats': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Tek toplama sorgusu, JOIN'siz
+        query, = context.captured_queries
+        self.assertNotIn('JOIN', query['sql'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.company_name = 'Yeni Ad'
+            self.customer.save()
+        self.assertEqual(self.client.get(url, {'log_stats': 1}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_changes_when_a_record_is_replaced(self):
+        url = reverse('kayit-list-create')
+        etag = self.client.get(url)['ETag']
+        ServiceRecord.objects.create(
+            customer=self.customer, brand=self.record.brand, model='M2', arrival_date=self.record.arrival_date,
+        )
+        # Aynı satır sayısı, ama en büyük id değişti
+        ServiceRecord.objects.filter(id=self.record.id).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_decides_304_even_within_the_same_second(self):
+        url = reverse('kayit-detail', args=[self.record.id])
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Aynı saniyede ikinci yazma: Last-Modified değişmeyebilir, ETag değişir
+        ServiceRecord.objects.filter(id=self.record.id).update(
+            model='M2', updated_at=self.record.updated_at.replace(microsecond=999999),
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['model'], 'M2')
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+
+class BenchmarkTests(TestCase):
+    def test_small_run_reports_queries_and_flags_exceeded_budgets(self):
+        data = seed_dataset(customers=5, brands=2, services=2, records=20)
+        results = run_benchmarks(data, iterations=1, names=['records_list', 'record_detail'])
+        self.assertEqual(set(results), {'records_list', 'record_detail'})
+
+        baseline = {'scenarios': {
+            'records_list': {'queries': results['records_list']['queries'], 'median_ms': 0},
+            'record_detail': {'queries': 0, 'median_ms': 0},
+        }}
+        self.assertEqual(len(check_budgets(results, baseline)), 1)
+        self.assertEqual(check_budgets(results, {'scenarios': {}}), [
+            "records_list: bütçe yok (baseline'ı --record ile güncelleyin)",
+            "record_detail: bütçe yok (baseline'ı --record ile güncelleyin)",
+        ])
+
+    def test_cached_endpoints_are_measured_on_cache_miss(self):
+        data = seed_dataset(customers=5, brands=3, services=2, records=5)
+        names = ['customer_search', 'customer_autocomplete', 'brand_suggest']
+        results = run_benchmarks(data, iterations=2, names=names)
+        for name in names:
+            self.assertGreater(results[name]['queries'], 0, name)
+
+
+class SQLInstrumentationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('tester', password='secret'))
+
+    def test_server_timing_header_and_log_line(self):
+        with self.assertLogs('backend.sql', 'INFO') as logs:
+            response = self.client.get(reverse('kayit-list-create'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], reverse('kayit-list-create'))
+        self.assertNotIn('n_plus_one', record)
+
+    @override_settings(SQL_N_PLUS_ONE_THRESHOLD=1)
+    def test_repeated_statements_are_flagged(self):
+        with self.assertLogs('backend.sql', 'WARNING') as logs:
+            self.client.get(reverse('kayit-list-create'))
+        self.assertIn('n_plus_one', json.loads(logs.records[0].getMessage()))
+
+    @override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('kayit-list-create')))
+
+    @override_settings(SQL_SERVER_TIMING_HEADER=False)
+    def test_server_timing_header_is_opt_in(self):
+        with self.assertLogs('backend.sql', 'INFO') as logs:
+            response = self.client.get(reverse('kayit-list-create'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertGreater(json.loads(logs.records[0].getMessage())['queries'], 0)
+
+    async def test_async_requests_count_queries_of_sync_views(self):
+        user = await User.objects.acreate(username='async')
+        token = AccessToken.for_user(user)
+        with self.assertLogs('backend.sql', 'INFO') as logs:
+            response = await self.async_client.get(
+                reverse('kayit-list-create'), headers={'Authorization': f'Bearer {token}'}
+            )
+        self.assertEqual(response.status_code, 200)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertGreater(record['queries'], 0)
+        self.assertIn(f'desc="{record["queries"]} queries"', response['Server-Timing'])
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='secret')
+        customer = Customer.objects.create(company_code='C1', company_name='Müşteri')
+        brand = Brand.objects.create(name='Acer')
+        ServiceRecord.objects.create(customer=customer, brand=brand, model='Bekleyen', arrival_date='2026-01-05')
+        ServiceRecord.objects.create(
+            customer=customer, brand=brand, model='Teslim', arrival_date='2026-01-05',
+            delivery_date='2026-01-07', status=ServiceRecord.STATUS_DELIVERED,
+        )
+
+    def test_csv_is_streamed_and_honours_filters(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse('kayit-export'), {'status': ServiceRecord.STATUS_PENDING})
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        self.assertIn('Bekleyen', content)
+        self.assertNotIn('Teslim,', content)
+
+    async def test_csv_uses_async_iterator_under_asgi(self):
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        response = await self.async_client.get(
+            reverse('kayit-export'), {'status': ServiceRecord.STATUS_DELIVERED},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8-sig')
+        self.assertIn('Teslim', content)
+        self.assertNotIn('Bekleyen', content)
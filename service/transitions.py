@@ -0,0 +1,102 @@
+"""Birden fazla servis kaydının durumunu tek seferde ilerletir.
+
+Geçiş bir tarih alanını (ve servise gönderimde servis firmasını) ayarlar;
+durum ``ServiceRecord.status_for_dates`` ile tek kayıt güncellemesindeki
+kuralla hesaplanır. Sonucu hedef durum olmayan (ör. teslim edilmiş kaydı
+servise gönderme) veya hiçbir şeyi değiştirmeyen kayıtlar atlanır.
+Uygun kayıtlar tek bir UPDATE ile yazılır, loglar toplu eklenir.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from accounts import events
+from . import logcodec
+from .models import ServiceLog, ServiceRecord, refresh_search_documents
+from .rollups import ROLLUP_FIELDS, apply_rollup_deltas
+
+# geçiş -> (ayarlanan tarih alanı, hedef durum)
+TRANSITIONS = {
+    'send': ('service_send_date', ServiceRecord.STATUS_SENT_TO_SERVICE),
+    'return': ('service_return_date', ServiceRecord.STATUS_RETURNED_FROM_SERVICE),
+    'deliver': ('delivery_date', ServiceRecord.STATUS_DELIVERED),
+}
+
+DATE_FIELDS = ('service_send_date', 'service_return_date', 'delivery_date')
+
+
+@transaction.atomic
+def apply_transition(ids, transition, date, user, service=None):
+    """Geçişi uygular; ``(güncellenen id'ler, atlananlar)`` döner.
+
+    Atlananlar ``[{'id': .., 'reason': ..}]`` biçimindedir.
+    """
+    date_field, target_status = TRANSITIONS[transition]
+    values = {date_field: date}
+    if transition == 'send':
+        values['service'] = service.pk if service else None
+
+    columns = {'id', 'status', *DATE_FIELDS, *ROLLUP_FIELDS, 'service_id'}
+    rows = {
+        row['id']: row
+        for row in ServiceRecord.objects.select_for_update().filter(id__in=ids).values(*columns)
+    }
+
+    updated = []
+    skipped = []
+    logs = []
+    rollup_deltas = Counter()
+    status_changes = []
+    for record_id in dict.fromkeys(ids):
+        row = rows.get(record_id)
+        if row is None:
+            skipped.append({'id': record_id, 'reason': "Kayıt bulunamadı"})
+            continue
+
+        dates = {name: row[name] for name in DATE_FIELDS}
+        dates[date_field] = date
+        if ServiceRecord.status_for_dates(**dates) != target_status:
+            skipped.append({'id': record_id, 'reason': f"Durum uygun değil: {row['status']}"})
+            continue
+
+        changes = {}
+        for name, value in values.items():
+            attname = 'service_id' if name == 'service' else name
+            if row[attname] != value:
+                changes[name] = (row[attname], value)
+        if row['status'] != target_status:
+            changes['status'] = (row['status'], target_status)
+            status_changes.append((record_id, row['status'], target_status))
+        if not changes:
+            skipped.append({'id': record_id, 'reason': "Değişiklik yok"})
+            continue
+
+        updated.append(record_id)
+        logs.append(ServiceLog(
+            service_record_id=record_id,
+            user=user,
+            changed_fields=logcodec.encode_changes(changes),
+        ))
+        new_row = {**row, 'status': target_status}
+        if 'service' in values:
+            new_row['service_id'] = values['service']
+        rollup_deltas[tuple(row[field] for field in ROLLUP_FIELDS)] -= 1
+        rollup_deltas[tuple(new_row[field] for field in ROLLUP_FIELDS)] += 1
+
+    if updated:
+        update_values = {
+            ('service_id' if name == 'service' else name): value
+            for name, value in values.items()
+        }
+        ServiceRecord.objects.filter(id__in=updated).update(
+            status=target_status, updated_at=timezone.now(), **update_values
+        )
+        ServiceLog.objects.bulk_create(logs)
+        apply_rollup_deltas(rollup_deltas)
+        if 'service' in values:
+            # Servis firması arama metninde yer alır
+            refresh_search_documents(ServiceRecord.objects.filter(id__in=updated))
+        events.broadcast_status_changes(status_changes)
+
+    return updated, skipped
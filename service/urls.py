@@ -1,13 +1,19 @@
 ﻿from django.urls import path
-from .views import KayitRetrieveUpdateDestroyAPIView, ServiceRecordViewSet, ServiceViewSet
+from .views import KayitRetrieveUpdateDestroyAPIView, ServiceLogTimelineView, ServiceRecordViewSet, ServiceViewSet
 
 urlpatterns = [
     # Servis Kayıtları
     path('Services/', ServiceRecordViewSet.as_view({'get': 'list', 'post': 'create'}), name='kayit-list-create'),
     path('Services/dashboard_stats/', ServiceRecordViewSet.as_view({'get': 'dashboard_stats'}), name='dashboard-stats'),
+    path('Services/batch/', ServiceRecordViewSet.as_view({'post': 'batch'}), name='kayit-batch'),
+    path('Services/transition/', ServiceRecordViewSet.as_view({'post': 'transition'}), name='kayit-transition'),
+    path('Services/export/', ServiceRecordViewSet.as_view({'get': 'export'}), name='kayit-export'),
     path('Services/<int:pk>/', ServiceRecordViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='kayit-detail'),
+    path('Services/<int:pk>/logs/', ServiceRecordViewSet.as_view({'get': 'logs'}), name='kayit-logs'),
+    path('Services/<int:pk>/timeline/', ServiceLogTimelineView.as_view(), name='kayit-timeline'),
     
     # Servis Firmaları
     path('ServiceCompanies/', ServiceViewSet.as_view({'get': 'list', 'post': 'create'}), name='service-list-create'),
+    path('ServiceCompanies/suggest/', ServiceViewSet.as_view({'get': 'suggest'}), name='service-suggest'),
     path('ServiceCompanies/<int:pk>/', ServiceViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='service-detail'),
 ]
@@ -1,14 +1,31 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import generics, viewsets
-from .models import ServiceLog, ServiceRecord, Service
-from .serializers import ServiceRecordSerializer, ServiceLogSerializer, ServiceSerializer
+from rest_framework import filters, generics, viewsets
+from django_filters.rest_framework import DjangoFilterBackend
+from .models import ServiceLog, ServiceRecord, ServiceRecordRollup, Service
+from .serializers import ServiceRecordSerializer, ServiceRecordListSerializer, ServiceRecordTransitionSerializer, ServiceLogSerializer, ServiceSerializer
+from .filters import ServiceRecordSearchFilter
+from api.cache import ReferenceCacheMixin
+from api.conditional import ConditionalGetMixin
+from api.prefix_index import parse_limit, suggest
+from .pagination import CursorPaginationOptInMixin, ServiceRecordCursorPagination, ServiceLogCursorPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Count, Max, Q, Sum
 from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, StreamingHttpResponse
+from rest_framework import status
+from . import export, logcodec
+from .batch import RecordBatchError, apply_record_batch
+from .transitions import apply_transition
 
 # Tüm kayıtları listele ve yeni kayıt ekle
 # class KayitListCreateAPIView(generics.ListCreateAPIView):
@@ -26,89 +43,264 @@ class KayitRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = []
 
 
-class ServiceRecordViewSet(viewsets.ModelViewSet):
+class ServiceRecordViewSet(ConditionalGetMixin, CursorPaginationOptInMixin, viewsets.ModelViewSet):
     queryset = ServiceRecord.objects.all().order_by('-id')  
     serializer_class = ServiceRecordSerializer
     permission_classes = [IsAuthenticated]
+    # Liste/detay ETag'i gömülü müşteri, marka ve servis değişikliklerini de kapsar
+    conditional_related = ('customer', 'brand', 'service')
+    # ?pagination=cursor ile COUNT/OFFSET'siz sayfalama
+    cursor_pagination_class = ServiceRecordCursorPagination
+    # ?search= müşteri, marka, model, seri no ve servis firmasında arar
+    filter_backends = [DjangoFilterBackend, ServiceRecordSearchFilter, filters.OrderingFilter]
+    # Liste ve dışa aktarma için alan filtreleri (?status=..&arrival_date__gte=..)
+    filterset_fields = {
+        'status': ['exact'],
+        'customer': ['exact'],
+        'brand': ['exact'],
+        'service': ['exact'],
+        'arrival_date': ['gte', 'lte'],
+    }
+
+    # İlişkili nesneler tek sorguda (JOIN) gelsin
+    related_fields = ('customer', 'brand', 'service', 'created_user')
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related(*self.related_fields)
+
+        if self.action == 'list':
+            # ?log_stats=1 ile log sayısı ve son değişiklik tarihi eklenir
+            if self.request.query_params.get('log_stats') in ('1', 'true'):
+                queryset = queryset.annotate(
+                    log_count=Count('logs'),
+                    last_change=Max('logs__change_date'),
+                )
+            return queryset
+
+        if self.action == 'retrieve':
+            # Detay görünümü loglar yerine sadece log sayısını taşır
+            queryset = queryset.annotate(log_count=Count('logs'))
+        return queryset
+
+    def get_conditional_queryset(self):
+        # ETag toplaması JOIN'siz yapılsın; log sayısı gibi annotate'ler gerekmez
+        return ServiceRecord.objects.all()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ServiceRecordListSerializer
+        return super().get_serializer_class()
 
     @action(detail=True, methods=['get'])
     def logs(self, request, pk=None):
         service_record = self.get_object()
-        logs = ServiceLog.objects.filter(service_record=service_record).order_by('-change_date')
+        logs = ServiceLog.objects.filter(service_record=service_record).select_related('user').order_by('-change_date', '-id')
+
+        if self.wants_cursor_pagination():
+            paginator = ServiceLogCursorPagination()
+            page = paginator.paginate_queryset(logs, request)
+            serializer = ServiceLogSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         serializer = ServiceLogSerializer(logs, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Birden fazla kaydı tek istekte oluşturur/günceller.
+
+        Gövde: ``{"records": [{...}, {"id": 5, ...}]}``; ``id`` içeren öğeler
+        kısmi güncellemedir. Tüm öğeler tek transaction'da yazılır; bir öğe
+        bile geçersizse hiçbiri yazılmaz ve öğe bazında hatalar döner.
+        """
+        records = request.data.get('records') if isinstance(request.data, dict) else request.data
+        try:
+            created, updated = apply_record_batch(records, request.user)
+        except RecordBatchError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                'created': [record.id for record in created],
+                'updated': [record.id for record in updated],
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=['post'])
+    def transition(self, request):
+        """Seçilen kayıtları topluca servise gönderir, servisten döndü veya teslim edildi yapar.
+
+        Gövde: ``{"ids": [..], "transition": "send", "service_id": 3, "date": "2026-10-18"}``
+        (tarih verilmezse bugün). Uygun olmayan kayıtlar ``skipped`` içinde döner.
+        """
+        serializer = ServiceRecordTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        updated, skipped = apply_transition(
+            data['ids'],
+            data['transition'],
+            data.get('date') or timezone.localdate(),
+            request.user,
+            service=data.get('service'),
+        )
+        return Response({'updated': updated, 'skipped': skipped})
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Listedeki filtre/arama/sıralama ile kayıtları dışa aktarır.
+
+        ``?export_format=csv`` (varsayılan) yanıtı akış halinde gönderir,
+        ``?export_format=xlsx`` Excel dosyası döner. Sayfalama uygulanmaz.
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in ('csv', 'xlsx'):
+            raise ValidationError({'export_format': "Geçerli değerler: csv, xlsx"})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        filename = f"servis_kayitlari_{timezone.localdate():%Y%m%d}.{export_format}"
+        if export_format == 'xlsx':
+            return FileResponse(
+                export.xlsx_file(queryset),
+                as_attachment=True,
+                filename=filename,
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
+
+        # ASGI altında senkron iterator tamamen belleğe alınarak tüketilir
+        if isinstance(request._request, ASGIRequest):
+            chunks = export.csv_chunks_async(queryset)
+        else:
+            chunks = export.csv_chunks(queryset)
+        response = StreamingHttpResponse(chunks, content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
-        """Dashboard için servis kayıt istatistikleri"""
-        
-        # Durum bazında sayılar
-        status_counts = ServiceRecord.objects.values('status').annotate(count=Count('id'))
-        
-        # Toplam kayıt sayısı
-        total_records = ServiceRecord.objects.count()
-        
-        # Bu ay eklenen kayıtlar
-        from datetime import datetime, timedelta
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        monthly_records = ServiceRecord.objects.filter(
-            arrival_date__month=current_month,
-            arrival_date__year=current_year
-        ).count()
-        
-        # Son 7 gün eklenen kayıtlar
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        weekly_records = ServiceRecord.objects.filter(
-            arrival_date__gte=seven_days_ago.date()
-        ).count()
-        
-        # Serviste olanlar (servise gitti ama henüz dönmedi)
-        in_service_count = ServiceRecord.objects.filter(
-            Q(status=ServiceRecord.STATUS_SENT_TO_SERVICE) | Q(status='sent_to_service')
-        ).count()
-        
-        # Teslim bekleyenler (servisten geldi ama henüz teslim edilmedi)
-        waiting_delivery_count = ServiceRecord.objects.filter(
-            Q(status=ServiceRecord.STATUS_RETURNED_FROM_SERVICE) | Q(status='returned_from_service')
-        ).count()
-        
-        # Beklemede olanlar
-        pending_count = ServiceRecord.objects.filter(
-            Q(status=ServiceRecord.STATUS_PENDING) | Q(status='pending') | Q(status='Pending')
-        ).count()
-        
-        # Teslim edilenler
-        delivered_count = ServiceRecord.objects.filter(
-            Q(status=ServiceRecord.STATUS_DELIVERED) | Q(status='delivered')
-        ).count()
-        
+        """Dashboard için servis kayıt istatistikleri
+
+        Sayaçlar ``ServiceRecordRollup`` özet tablosundan tek bir koşullu
+        toplama sorgusuyla okunur; tablo kayıt değil gün sayısıyla büyür.
+        En çok kayıt alan markalar ikinci sorguda gelir.
+        """
+        today = timezone.localdate()
+        first_of_month = today.replace(day=1)
+        seven_days_ago = today - timedelta(days=7)
+
+        totals = ServiceRecordRollup.objects.aggregate(
+            total_records=Sum('record_count', default=0),
+            monthly_records=Sum('record_count', filter=Q(day__gte=first_of_month), default=0),
+            weekly_records=Sum('record_count', filter=Q(day__gte=seven_days_ago), default=0),
+            **{
+                durum: Sum('record_count', filter=Q(status=durum), default=0)
+                for durum, _ in ServiceRecord.STATUS_CHOICES
+            }
+        )
+
         # Marka bazında sayılar (en çok servis verilen markalar)
-        brand_counts = ServiceRecord.objects.values(
+        brand_counts = ServiceRecordRollup.objects.values(
             'brand__name'
         ).annotate(
-            count=Count('id')
-        ).order_by('-count')[:5]  # Top 5 marka
-        
+            count=Sum('record_count')
+        ).filter(count__gt=0).order_by('-count')[:5]  # Top 5 marka
+
         data = {
-            'total_records': total_records,
-            'monthly_records': monthly_records,
-            'weekly_records': weekly_records,
+            'total_records': totals['total_records'],
+            'monthly_records': totals['monthly_records'],
+            'weekly_records': totals['weekly_records'],
             'status_summary': {
-                'pending': pending_count,
-                'in_service': in_service_count,
-                'waiting_delivery': waiting_delivery_count,
-                'delivered': delivered_count
+                'pending': totals[ServiceRecord.STATUS_PENDING],
+                'in_service': totals[ServiceRecord.STATUS_SENT_TO_SERVICE],
+                'waiting_delivery': totals[ServiceRecord.STATUS_RETURNED_FROM_SERVICE],
+                'delivered': totals[ServiceRecord.STATUS_DELIVERED],
             },
-            'status_counts': list(status_counts),
+            'status_counts': [
+                {'status': durum, 'count': totals[durum]}
+                for durum, _ in ServiceRecord.STATUS_CHOICES
+            ],
             'top_brands': list(brand_counts)
         }
-        
+
         return Response(data)
 
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceLogTimelineView(CursorPaginationOptInMixin, generics.ListAPIView):
+    """Bir servis kaydının sayfalı değişiklik geçmişi
+
+    Filtreler:
+    - ``field``: değişen alan adı (virgülle birden fazla verilebilir)
+    - ``user``: değişikliği yapan kullanıcının id'si veya kullanıcı adı
+    - ``since`` / ``until``: tarih (YYYY-AA-GG) veya tarih-saat aralığı
+    - ``last``: sadece son N değişikliği sayfalamadan döndür
+    """
+    serializer_class = ServiceLogSerializer
+    permission_classes = [IsAuthenticated]
+    cursor_pagination_class = ServiceLogCursorPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        get_object_or_404(ServiceRecord.objects.only('id'), pk=self.kwargs['pk'])
+        params = self.request.query_params
+        queryset = ServiceLog.objects.filter(
+            service_record_id=self.kwargs['pk']
+        ).select_related('user').order_by('-change_date', '-id')
+
+        fields = [name.strip() for name in params.get('field', '').split(',') if name.strip()]
+        if fields:
+            condition = Q()
+            for name in fields:
+                condition |= logcodec.field_filter(name)
+            queryset = queryset.filter(condition)
+
+        user = params.get('user')
+        if user:
+            queryset = queryset.filter(user_id=user) if user.isdigit() else queryset.filter(user__username=user)
+
+        since = self._parse_bound(params.get('since'))
+        if since:
+            queryset = queryset.filter(change_date__gte=since)
+        until = self._parse_bound(params.get('until'), end_of_day=True)
+        if until:
+            queryset = queryset.filter(change_date__lt=until)
+        return queryset
+
+    def _parse_bound(self, value, end_of_day=False):
+        if not value:
+            return None
+        try:
+            day = parse_date(value)
+            moment = None if day else parse_datetime(value)
+        except ValueError:
+            day = moment = None
+        if day is not None:
+            # Sadece tarih verilmişse günün tamamı aralığa dahil edilir
+            if end_of_day:
+                day += timedelta(days=1)
+            moment = datetime.combine(day, time.min)
+        if moment is None:
+            raise ValidationError({'detail': f"Geçersiz tarih: {value}"})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def list(self, request, *args, **kwargs):
+        last = request.query_params.get('last')
+        if last is None:
+            return super().list(request, *args, **kwargs)
+        if not last.isdigit():
+            raise ValidationError({'last': "Pozitif bir sayı olmalı."})
+        logs = self.get_queryset()[:min(int(last), 100)]
+        return Response(self.get_serializer(logs, many=True).data)
+
+
+class ServiceViewSet(ReferenceCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """Servis firmaları için ViewSet"""
     queryset = Service.objects.all().order_by('name')
     serializer_class = ServiceSerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """Servis firması önerileri (``?q=terim&limit=10``); süreç içi önek indeksinden."""
+        params = request.query_params
+        return Response(suggest(Service, params.get('q', ''), parse_limit(params.get('limit'))))